@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the Schema Extractor.
+
+Usage:
+    python benchmark_schema_extractor.py [records]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from lxml import etree
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+# Add the current directory to Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from schema_extractor.extractors.json_extractor import JSONExtractor
+from schema_extractor.extractors.xml_extractor import XMLExtractor
+from schema_extractor.models.schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNode, DataNodeTable
+from schema_extractor.utils.batch import BatchStats, expand_inputs, extract_batch, merge_schema_files, validate_batch
+from schema_extractor.utils.helpers import save_schema, load_json, loads_json, validate_schema
+from schema_extractor.utils.mapped import MappedFile
+from schema_extractor import SchemaExtractor
+from schema_extractor.validators import CompiledValidator
+from jsonschema import validate as jsonschema_validate
+from schema_extractor.extractors.merge import merge_schemas
+
+
+def generate_json_sample(file_path: str, records: int) -> None:
+    """Write a JSON document with `records` nested employee records."""
+    employees = []
+    for i in range(records):
+        employees.append({
+            "id": i,
+            "name": f"Employee {i}",
+            "salary": 50000 + i * 1.5,
+            "start_date": "2020-01-15",
+            "active": i % 2 == 0,
+            "skills": ["Python", "SQL", "Docker"],
+            "address": {"city": "Springfield", "zip": f"{i:05d}"},
+        })
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({"company": {"name": "TechCorp", "employees": employees}}, f)
+
+
+def generate_jsonl_sample(file_path: str, records: int) -> None:
+    """Write a JSON Lines file of `records` event records with optional fields."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for i in range(records):
+            record = {
+                "id": i,
+                "event": "click" if i % 2 else "view",
+                "timestamp": "2024-01-15T10:30:00",
+                "user": {"id": i % 1000, "name": f"User {i % 1000}"},
+            }
+            if i % 3:
+                record["score"] = i * 0.5
+            if i % 7 == 0:
+                record["tags"] = ["a", "b"]
+            f.write(json.dumps(record) + "\n")
+
+
+def generate_xml_sample(file_path: str, records: int) -> None:
+    """Write an XML document with `records` book elements."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<library>\n')
+        for i in range(records):
+            f.write(
+                f'  <book id="{i}" published="{1990 + i % 30}">'
+                f'<title>Book {i}</title><author><name>Author {i}</name></author>'
+                f'<price>{i % 100}.99</price><available>true</available>'
+                f'<tags><tag>a</tag><tag>b</tag></tags></book>\n'
+            )
+        f.write('</library>\n')
+
+
+def generate_wide_json_sample(file_path: str, records: int, width: int = 200) -> None:
+    """Write a JSON array of `records` objects whose keys mostly differ between objects."""
+    items = [{f"field_{(i * 7 + j) % (width * 10)}": j for j in range(width)} for i in range(records)]
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(items, f)
+
+
+def generate_deep_json_sample(file_path: str, depth: int) -> None:
+    """Write a JSON document nested `depth` levels deep, alternating objects and arrays."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        closers = []
+        for level in range(depth):
+            if level % 3 == 2:
+                f.write('[')
+                closers.append(']')
+            else:
+                f.write(f'{{"level": {level}, "child": ')
+                closers.append('}')
+        f.write('"leaf"')
+        f.write(''.join(reversed(closers)))
+
+
+def generate_deep_xml_sample(file_path: str, depth: int) -> None:
+    """Write an XML document nested `depth` levels deep (libxml2 caps this at 2048)."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        for level in range(depth):
+            f.write(f'<n{level % 4} level="{level}">')
+        f.write('leaf')
+        for level in reversed(range(depth)):
+            f.write(f'</n{level % 4}>')
+
+
+def best_time(func, *args, repeat: int = 3) -> float:
+    """Return the best wall-clock time of `repeat` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# ---------------------------------------------------------------------------
+# Three-pass extract() used before the fused traversal, kept as a reference
+# ---------------------------------------------------------------------------
+
+def legacy_json_extract(extractor: JSONExtractor, file_path: str) -> Schema:
+    """Schema inference, data nodes and max depth as three separate passes."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    counts = defaultdict(int)
+
+    def element_schema(value, name):
+        data_type = extractor._determine_data_type(value)
+        element = SchemaElement(name=name, data_type=data_type, description=f"Property: {name}")
+        if data_type == DataType.OBJECT:
+            for key, child in value.items():
+                counts[key] += 1
+                element.properties[key] = element_schema(child, key)
+        elif data_type == DataType.ARRAY and value:
+            element.array_type = element_schema(value[0], "item")
+            element.occurrences = len(value)
+            for item in value[1:]:
+                if extractor._determine_data_type(item) != element.array_type.data_type:
+                    element.array_type.data_type = DataType.UNKNOWN
+                    break
+        elif data_type in [DataType.STRING, DataType.INTEGER, DataType.FLOAT, DataType.BOOLEAN]:
+            element.examples = [value]
+        elif data_type == DataType.NULL:
+            element.description = f"Property: {name} (nullable)"
+        return element
+
+    def data_nodes(value, path, depth=0, parent_path=None):
+        data_type = extractor._determine_data_type(value)
+        nodes = [DataNode(
+            path=path,
+            name=path.split('.')[-1] if '.' in path else path,
+            value=value,
+            data_type=data_type,
+            depth=depth,
+            parent_path=parent_path,
+            is_leaf=data_type not in [DataType.OBJECT, DataType.ARRAY],
+            description=f"Data node at path: {path}"
+        )]
+        if data_type == DataType.OBJECT:
+            for key, child in value.items():
+                child_path = f"{path}.{key}" if path != "root" else key
+                nodes.extend(data_nodes(child, child_path, depth + 1, path))
+        elif data_type == DataType.ARRAY:
+            for i, item in enumerate(value):
+                nodes.extend(data_nodes(item, f"{path}[{i}]", depth + 1, path))
+        return nodes
+
+    def max_depth(value, depth=0):
+        children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+        return max([depth] + [max_depth(child, depth + 1) for child in children])
+
+    schema = Schema(name="legacy", file_type="json")
+    schema.root_element = element_schema(data, "root")
+    schema.data_nodes = data_nodes(data, "root")
+    schema.total_data_nodes = len(schema.data_nodes)
+    schema.total_elements = len(counts)
+    schema.max_depth = max_depth(data)
+    return schema
+
+
+def legacy_xml_extract(extractor: XMLExtractor, file_path: str) -> Schema:
+    """Schema inference, data nodes and max depth as three separate passes."""
+    from lxml import etree
+
+    root = etree.parse(file_path).getroot()
+    element_counts = defaultdict(int)
+    attribute_counts = defaultdict(int)
+
+    def element_schema(element):
+        element_counts[element.tag] += 1
+        data_type = extractor._determine_element_type(element)
+        schema_element = SchemaElement(name=element.tag, data_type=data_type, description=f"Element: {element.tag}")
+        for attr_name, attr_value in element.attrib.items():
+            schema_element.attributes[attr_name] = SchemaAttribute(
+                name=attr_name,
+                data_type=extractor._determine_data_type(attr_value),
+                required=True,
+                default_value=attr_value if attr_value else None
+            )
+            attribute_counts[attr_name] += 1
+        if data_type == DataType.OBJECT:
+            groups = defaultdict(list)
+            for child in element:
+                groups[child.tag].append(child)
+            for tag, children in groups.items():
+                child_schema = element_schema(children[0])
+                if len(children) > 1:
+                    child_schema = SchemaElement(
+                        name=tag, data_type=DataType.ARRAY, array_type=child_schema, occurrences=len(children)
+                    )
+                schema_element.properties[tag] = child_schema
+        if element.text and element.text.strip():
+            text_type = extractor._determine_data_type(element.text.strip())
+            if text_type != DataType.STRING:
+                schema_element.properties["text"] = SchemaElement(
+                    name="text", data_type=text_type, examples=[element.text.strip()]
+                )
+        return schema_element
+
+    def data_nodes(element, path, depth=0, parent_path=None):
+        text = element.text.strip() if element.text and element.text.strip() else None
+        nodes = [DataNode(
+            path=path,
+            name=element.tag,
+            value=text,
+            data_type=extractor._determine_element_type(element),
+            depth=depth,
+            parent_path=parent_path,
+            is_leaf=len(element) == 0 and text is None,
+            description=f"XML element: {element.tag}"
+        )]
+        for attr_name, attr_value in element.attrib.items():
+            nodes.append(DataNode(
+                path=f"{path}@{attr_name}",
+                name=attr_name,
+                value=attr_value,
+                data_type=extractor._determine_data_type(attr_value),
+                depth=depth + 1,
+                parent_path=path,
+                description=f"Attribute: {attr_name}"
+            ))
+        if text is not None:
+            nodes.append(DataNode(
+                path=f"{path}#text",
+                name="text",
+                value=text,
+                data_type=extractor._determine_data_type(text),
+                depth=depth + 1,
+                parent_path=path,
+                description=f"Text content of {element.tag}"
+            ))
+        for child in element:
+            nodes.extend(data_nodes(child, f"{path}.{child.tag}", depth + 1, path))
+        return nodes
+
+    def max_depth(element, depth=0):
+        return max([depth] + [max_depth(child, depth + 1) for child in element])
+
+    schema = Schema(name="legacy", file_type="xml")
+    schema.root_element = element_schema(root)
+    schema.data_nodes = data_nodes(root, root.tag)
+    schema.total_data_nodes = len(schema.data_nodes)
+    schema.total_elements = len(element_counts)
+    schema.total_attributes = len(attribute_counts)
+    schema.max_depth = max_depth(root)
+    return schema
+
+
+def legacy_merge_elements(elements: list) -> SchemaElement:
+    """Pairwise element merge with model_copy at every level (reference)."""
+    if len(elements) == 1:
+        return elements[0]
+    merged_element = elements[0].model_copy()
+    all_properties = {}
+    for element in elements:
+        for prop_name, prop_schema in element.properties.items():
+            if prop_name in all_properties:
+                all_properties[prop_name] = legacy_merge_elements([all_properties[prop_name], prop_schema])
+            else:
+                all_properties[prop_name] = prop_schema
+    merged_element.properties = all_properties
+    return merged_element
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_fused_traversal(work_dir: str, records: int) -> None:
+    """Compare the fused single-pass extract() with the three-pass version."""
+    print(f"\nFused traversal vs three-pass extraction ({records} records)")
+
+    json_file = os.path.join(work_dir, "bench.json")
+    xml_file = os.path.join(work_dir, "bench.xml")
+    generate_json_sample(json_file, records)
+    generate_xml_sample(xml_file, records)
+
+    json_extractor = JSONExtractor()
+    xml_extractor = XMLExtractor()
+    cases = [
+        ("json", json_file, lambda: legacy_json_extract(json_extractor, json_file),
+         lambda: json_extractor.extract(json_file)),
+        ("xml", xml_file, lambda: legacy_xml_extract(xml_extractor, xml_file),
+         lambda: xml_extractor.extract(xml_file)),
+    ]
+
+    for label, file_path, legacy, fused in cases:
+        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        legacy_time = best_time(legacy)
+        fused_time = best_time(fused)
+        print(f"  {label:<5} {size_mb:6.1f} MB  three-pass {legacy_time:7.3f}s  "
+              f"fused {fused_time:7.3f}s  speedup {legacy_time / fused_time:4.2f}x")
+
+
+def bench_array_sampling(work_dir: str, records: int, sample_size: int = 1000) -> None:
+    """Compare full-array inference with reservoir-sampled inference."""
+    print(f"\nFull-array vs sampled inference ({records} records, sample {sample_size})")
+
+    json_file = os.path.join(work_dir, "bench.json")
+    xml_file = os.path.join(work_dir, "bench.xml")
+    generate_json_sample(json_file, records)
+    generate_xml_sample(xml_file, records)
+
+    for label, file_path, extractor_class in [("json", json_file, JSONExtractor), ("xml", xml_file, XMLExtractor)]:
+        full = extractor_class()
+        sampled = extractor_class(array_sample_size=sample_size, sample_seed=0)
+        for mode, streaming in [("tree", False), ("stream", True)]:
+            full_time = best_time(full.extract, file_path, streaming)
+            sampled_time = best_time(sampled.extract, file_path, streaming)
+            print(f"  {label:<5} {mode:<7} full {full_time:7.3f}s  sampled {sampled_time:7.3f}s  "
+                  f"speedup {full_time / sampled_time:4.2f}x")
+
+
+def traced_peak(func, *args) -> float:
+    """Return the peak traced memory of one call in MB, keeping its result alive."""
+    tracemalloc.start()
+    result = func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / (1024 * 1024)
+
+
+def bench_node_store(work_dir: str, records: int) -> None:
+    """Compare the memory of a List[DataNode] with the columnar DataNodeTable."""
+    print(f"\nData node memory: List[DataNode] vs DataNodeTable ({records} records)")
+
+    json_file = os.path.join(work_dir, "bench.json")
+    xml_file = os.path.join(work_dir, "bench.xml")
+    generate_json_sample(json_file, records)
+    generate_xml_sample(xml_file, records)
+
+    from lxml import etree
+    json_extractor = JSONExtractor()
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    xml_extractor = XMLExtractor()
+    root = etree.parse(xml_file).getroot()
+
+    def json_table():
+        table = DataNodeTable()
+        json_extractor._visit(data, "root", "root", 0, -1, table)
+        return table
+
+    def xml_table():
+        table = DataNodeTable()
+        xml_extractor._visit(root, root.tag, 0, -1, table)
+        return table
+
+    cases = [
+        ("json", lambda: list(json_extractor._iter_value_nodes(data)), json_table),
+        ("xml", lambda: list(xml_extractor.iter_nodes(xml_file)), xml_table),
+    ]
+    for label, as_list, as_table in cases:
+        nodes = len(as_table())
+        list_mb = traced_peak(as_list)
+        table_mb = traced_peak(as_table)
+        print(f"  {label:<5} {nodes:>8} nodes  list {list_mb:7.1f} MB  table {table_mb:7.1f} MB  "
+              f"({list_mb * 1024 * 1024 / nodes:5.0f} vs {table_mb * 1024 * 1024 / nodes:4.0f} bytes/node)")
+
+
+def bench_trusted_construction(work_dir: str, records: int) -> None:
+    """Compare unvalidated model construction with pydantic-validated construction."""
+    records = max(records // 20, 1)
+    print(f"\nTrusted vs validated model construction ({records} wide records)")
+
+    wide_file = os.path.join(work_dir, "wide.json")
+    generate_wide_json_sample(wide_file, records)
+    extractor = JSONExtractor()
+
+    def extract_and_materialize():
+        schema = extractor.extract(wide_file)
+        return sum(1 for _ in schema.data_nodes)
+
+    trusted_time = best_time(extract_and_materialize)
+    trusted = {model: model.__dict__["trusted"] for model in (DataNode, SchemaElement, SchemaAttribute)}
+    try:
+        for model in trusted:
+            model.trusted = classmethod(lambda cls, **fields: cls(**fields))
+        validated_time = best_time(extract_and_materialize)
+    finally:
+        for model, method in trusted.items():
+            model.trusted = method
+    print(f"  json  validated {validated_time:7.3f}s  trusted {trusted_time:7.3f}s  "
+          f"speedup {validated_time / trusted_time:4.2f}x")
+
+
+def bench_deep_nesting(work_dir: str, json_depth: int = 100000, xml_depth: int = 2000) -> None:
+    """Extract documents nested far deeper than the recursion limit."""
+    print(f"\nDeep nesting (JSON depth {json_depth}, XML depth {xml_depth})")
+
+    json_file = os.path.join(work_dir, "deep.json")
+    xml_file = os.path.join(work_dir, "deep.xml")
+    generate_deep_json_sample(json_file, json_depth)
+    generate_deep_xml_sample(xml_file, xml_depth)
+
+    for label, file_path, extractor in [("json", json_file, JSONExtractor()), ("xml", xml_file, XMLExtractor())]:
+        for mode, streaming in [("tree", False), ("stream", True)]:
+            start = time.perf_counter()
+            schema = extractor.extract(file_path, streaming)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<5} {mode:<7} max depth {schema.max_depth:>6}  {elapsed:7.3f}s")
+
+
+def bench_batch_extraction(work_dir: str, records: int, files: int = 200) -> None:
+    """Compare batch extraction throughput in one process and over a process pool."""
+    records = max(records // files, 1)
+    workers = os.cpu_count() or 1
+    print(f"\nBatch extraction ({files} files of {records} records, {workers} workers)")
+
+    batch_dir = os.path.join(work_dir, "batch")
+    os.makedirs(batch_dir, exist_ok=True)
+    for i in range(files):
+        generate_json_sample(os.path.join(batch_dir, f"doc{i}.json"), records)
+    file_paths = expand_inputs([batch_dir])
+
+    for label, count in [("serial", 1), ("pool", workers)]:
+        stats = BatchStats()
+        for _ in stats.count(extract_batch(file_paths, workers=count)):
+            pass
+        print(f"  {label:6} {stats.elapsed:7.3f}s  {stats.files_per_second:8.1f} files/s  "
+              f"{stats.mb_per_second:7.2f} MB/s")
+
+
+def bench_schema_merge(work_dir: str, records: int, schemas: int = 2000) -> None:
+    """Compare the pairwise model_copy merge with the merge kernel and parallel reduction."""
+    width = max(records // 400, 1)
+    workers = os.cpu_count() or 1
+    print(f"\nSchema merge ({schemas} schemas of {width} nested objects, {workers} workers)")
+
+    extractor = JSONExtractor()
+    parts = []
+    for i in range(schemas):
+        document = {f"field_{j}": {"value": i, "label": f"item {j}", "extra": {"flag": True}}
+                    for j in range(i % 7, width)}
+        parts.append(extractor.extract_from_string(json.dumps(document)))
+
+    def legacy_merge():
+        merged = parts[0].root_element
+        for schema in parts[1:]:
+            merged = legacy_merge_elements([merged, schema.root_element])
+        return merged
+
+    legacy_time = best_time(legacy_merge, repeat=1)
+    kernel_time = best_time(merge_schemas, parts, repeat=1)
+    print(f"  pairwise {legacy_time:7.3f}s  kernel {kernel_time:7.3f}s  "
+          f"speedup {legacy_time / kernel_time:4.2f}x")
+
+    schema_dir = os.path.join(work_dir, "schemas")
+    os.makedirs(schema_dir, exist_ok=True)
+    file_paths = []
+    for i, schema in enumerate(parts[:500]):
+        file_paths.append(os.path.join(schema_dir, f"schema{i}.json"))
+        save_schema(schema, file_paths[-1])
+    for label, count in [("serial", 1), ("pool", workers)]:
+        elapsed = best_time(merge_schema_files, file_paths, count, repeat=2)
+        print(f"  files {label:6} {elapsed:7.3f}s  {len(file_paths) / elapsed:8.1f} schemas/s")
+
+
+def bench_jsonl_extraction(work_dir: str, records: int) -> None:
+    """Compare JSON Lines extraction in one process and split across processes."""
+    records *= 10
+    workers = os.cpu_count() or 1
+    jsonl_file = os.path.join(work_dir, "events.jsonl")
+    generate_jsonl_sample(jsonl_file, records)
+    size = os.path.getsize(jsonl_file) / (1024 * 1024)
+    print(f"\nJSON Lines extraction ({records} records, {size:.1f} MB, {workers} workers)")
+
+    extractor = JSONExtractor()
+    for label, count in [("serial", 1), ("split", workers)]:
+        elapsed = best_time(extractor.extract_jsonl, jsonl_file, count, repeat=1)
+        print(f"  {label:6} {elapsed:7.3f}s  {records / elapsed:10.0f} records/s  {size / elapsed:7.2f} MB/s")
+
+
+def bench_mapped_input(work_dir: str, records: int) -> None:
+    """Compare parsing from buffered file reads with parsing from a memory mapping."""
+    json_file = os.path.join(work_dir, "mapped.json")
+    xml_file = os.path.join(work_dir, "mapped.xml")
+    generate_json_sample(json_file, records)
+    generate_xml_sample(xml_file, records)
+    print(f"\nBuffered reads vs memory-mapped input ({records} records)")
+
+    def json_buffered():
+        with open(json_file, 'r', encoding='utf-8') as f:
+            return load_json(f)
+
+    def json_mapped():
+        with MappedFile(json_file) as source:
+            return loads_json(source.text())
+
+    def xml_buffered():
+        return etree.parse(xml_file, etree.XMLParser(huge_tree=True)).getroot()
+
+    def xml_mapped():
+        with MappedFile(xml_file) as source, source.view() as view:
+            return etree.fromstring(view, etree.XMLParser(huge_tree=True))
+
+    for label, buffered, mapped in [("JSON parse", json_buffered, json_mapped),
+                                    ("XML parse", xml_buffered, xml_mapped)]:
+        buffered_time = best_time(buffered)
+        mapped_time = best_time(mapped)
+        print(f"  {label:10} buffered {buffered_time:7.3f}s  mapped {mapped_time:7.3f}s  "
+              f"speedup {buffered_time / mapped_time:5.2f}x")
+
+
+def bench_compiled_validation(work_dir: str, records: int) -> None:
+    """Compare per-call jsonschema validation with validators compiled once per schema."""
+    records = max(records // 4, 1)
+    jsonl_file = os.path.join(work_dir, "validate.jsonl")
+    generate_jsonl_sample(jsonl_file, records)
+    schema = JSONExtractor().extract_jsonl(jsonl_file)
+    with open(jsonl_file, 'r', encoding='utf-8') as f:
+        documents = [json.loads(line) for line in f]
+    # Every tenth document breaks the schema in two places
+    invalid = [dict(doc, id=str(doc["id"]), user={}) if i % 10 == 0 else doc for i, doc in enumerate(documents)]
+    print(f"\nValidation throughput ({records} documents)")
+
+    json_schema = schema.to_json_schema()
+    cached = CompiledValidator(schema, backend="jsonschema")
+    native = CompiledValidator(schema)
+    sample = documents[:max(records // 20, 1)]
+
+    def per_call():
+        for doc in sample:
+            jsonschema_validate(instance=doc, schema=json_schema)
+
+    def run(check, docs):
+        for doc in docs:
+            check(doc)
+
+    per_call_rate = len(sample) / best_time(per_call, repeat=1)
+    print(f"  {'jsonschema.validate per document':36} {per_call_rate:10.0f} docs/s")
+    for label, check, docs in [
+        ("cached jsonschema validator", cached.is_valid, documents),
+        ("compiled validator", native.is_valid, documents),
+        ("compiled, collecting errors", native.errors, invalid),
+    ]:
+        rate = len(docs) / best_time(run, check, docs)
+        print(f"  {label:36} {rate:10.0f} docs/s  speedup {rate / per_call_rate:7.1f}x")
+
+
+def bench_streaming_json_validation(work_dir: str, records: int) -> None:
+    """Compare time and peak memory of validating a loaded and a streamed JSON document."""
+    json_file = os.path.join(work_dir, "validate_stream.json")
+    generate_json_sample(json_file, records)
+    schema = JSONExtractor().extract(json_file, streaming=True)
+    size_mb = os.path.getsize(json_file) / (1 << 20)
+    print(f"\nJSON validation, loaded vs streamed ({size_mb:.1f} MB)")
+    for label, streaming in [("loaded", False), ("streamed", True)]:
+        assert validate_schema(json_file, schema, streaming)
+        elapsed = best_time(validate_schema, json_file, schema, streaming, repeat=1)
+        peak = traced_peak(validate_schema, json_file, schema, streaming)
+        print(f"  {label:10} {elapsed:7.3f}s  {size_mb / elapsed:6.1f} MB/s  peak {peak:8.2f} MB")
+
+
+def bench_batch_validation(work_dir: str, records: int, files: int = 1000) -> None:
+    """Compare validating files one by one with jsonschema against the batch validator."""
+    records = max(records // (files * 10), 1)
+    workers = os.cpu_count() or 1
+    batch_dir = os.path.join(work_dir, "validate_batch")
+    os.makedirs(batch_dir, exist_ok=True)
+    for i in range(files):
+        generate_json_sample(os.path.join(batch_dir, f"doc{i}.json"), records)
+    file_paths = expand_inputs([batch_dir])
+    schema = JSONExtractor().extract(file_paths[0])
+    schema.data_nodes = []
+    print(f"\nBatch validation ({files} files of {records} records, {workers} workers)")
+
+    def per_file():
+        for file_path in file_paths:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                jsonschema_validate(instance=json.load(f), schema=schema.to_json_schema())
+
+    elapsed = best_time(per_file, repeat=1)
+    print(f"  {'jsonschema per file':20} {elapsed:7.3f}s  {files / elapsed:8.1f} files/s")
+    for label, count in [("batch, serial", 1), ("batch, pool", workers)]:
+        stats = BatchStats()
+        for result in stats.count(validate_batch(file_paths, schema, workers=count)):
+            assert result.ok
+        print(f"  {label:20} {stats.elapsed:7.3f}s  {stats.files_per_second:8.1f} files/s  "
+              f"{stats.mb_per_second:7.2f} MB/s")
+
+
+def main():
+    """Run all benchmarks."""
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("Schema Extractor Benchmarks")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        bench_fused_traversal(work_dir, records)
+        bench_array_sampling(work_dir, records)
+        bench_node_store(work_dir, records)
+        bench_trusted_construction(work_dir, records)
+        bench_deep_nesting(work_dir)
+        bench_batch_extraction(work_dir, records)
+        bench_schema_merge(work_dir, records)
+        bench_jsonl_extraction(work_dir, records)
+        bench_mapped_input(work_dir, records)
+        bench_compiled_validation(work_dir, records)
+        bench_streaming_json_validation(work_dir, records)
+        bench_batch_validation(work_dir, records)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
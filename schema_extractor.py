@@ -5,6 +5,7 @@ Schema Extractor CLI - Command-line interface for extracting schemas from XML an
 
 import os
 import sys
+import json
 from pathlib import Path
 import click
 from rich.console import Console
@@ -13,9 +14,18 @@ from rich.panel import Panel
 from rich.syntax import Syntax
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from schema_extractor import SchemaExtractor
-from schema_extractor.utils.helpers import save_schema, load_schema, format_schema_output
+from schema_extractor import SchemaExtractor, SchemaCache
+from schema_extractor.utils.helpers import detect_file_type, save_schema, load_schema, format_schema_output
+from schema_extractor.utils.batch import BatchStats, expand_inputs, merge_schema_files
+from schema_extractor.utils.binary import is_binary_schema
+from schema_extractor.extractors.merge import SchemaReducer
 from schema_extractor.models.schema import DataType
+from schema_extractor.models.query import NodeQuery
+from schema_extractor.utils.export import (
+    CSV_HEADER, COMPRESSIONS, compression_for, data_node_record, data_node_row, export_data_nodes, write_data_nodes
+)
+from schema_extractor.utils.arrow import ARROW_FORMATS, record_batches, write_record_batches
+from schema_extractor.utils.sketches import summarize_values
 
 console = Console()
 
@@ -28,15 +38,25 @@ def cli():
 
 
 @cli.command()
-@click.option('--input', '-i', 'input_file', required=True, help='Input file path (XML or JSON)')
+@click.option('--input', '-i', 'input_file', required=True, help='Input file path (XML, JSON or JSON Lines)')
 @click.option('--output', '-o', 'output_file', help='Output file path for schema')
 @click.option('--format', '-f', 'output_format', 
-              type=click.Choice(['json', 'xsd', 'dict']), 
+              type=click.Choice(['json', 'xsd', 'dict', 'binary']), 
               default='json', help='Output format')
+@click.option('--no-compress', is_flag=True, help='Store binary schemas without zlib compression')
 @click.option('--display', '-d', is_flag=True, help='Display schema in terminal')
 @click.option('--pretty', '-p', is_flag=True, help='Pretty print output')
-def extract(input_file, output_file, output_format, display, pretty):
-    """Extract schema from XML or JSON file."""
+@click.option('--streaming', '-s', is_flag=True, help='Stream the input instead of loading it into memory (data nodes are counted, not listed)')
+@click.option('--sample-size', type=click.IntRange(min=1), help='Infer array item schemas from at most this many randomly sampled items')
+@click.option('--seed', type=int, help='Random seed for --sample-size')
+@click.option('--workers', '-w', type=click.IntRange(min=1), default=1, help='Worker processes for JSON Lines input (the file is split on line boundaries)')
+@click.option('--cache-dir', help='Reuse schemas of unchanged files stored in this directory')
+@click.option('--cache-size', type=click.IntRange(min=1), default=1024, help='Maximum cache size in MB, least recently used entries are evicted first')
+@click.option('--verify-hash', is_flag=True, help='Compare file content hashes before reusing cached schemas')
+@click.option('--checkpoint', help='Checkpoint file of an append-only JSON Lines or XML input; only data appended since the last run is parsed')
+def extract(input_file, output_file, output_format, no_compress, display, pretty, streaming, sample_size, seed,
+            workers, cache_dir, cache_size, verify_hash, checkpoint):
+    """Extract schema from XML, JSON or JSON Lines file."""
     try:
         with Progress(
             SpinnerColumn(),
@@ -46,12 +66,19 @@ def extract(input_file, output_file, output_format, display, pretty):
             task = progress.add_task("Extracting schema...", total=None)
             
             # Initialize extractor
-            extractor = SchemaExtractor()
+            cache = _open_cache(cache_dir, cache_size, verify_hash)
+            extractor = SchemaExtractor(array_sample_size=sample_size, sample_seed=seed, cache=cache)
             
             # Extract schema
-            schema = extractor.extract_schema(input_file)
+            if checkpoint:
+                schema = extractor.extract_incremental(input_file, checkpoint)
+            else:
+                schema = extractor.extract_schema(input_file, streaming=streaming, workers=workers)
             
-            progress.update(task, description="Schema extraction completed!")
+            if cache is not None and cache.hits:
+                progress.update(task, description="Schema loaded from cache!")
+            else:
+                progress.update(task, description="Schema extraction completed!")
         
         # Display schema if requested
         if display:
@@ -66,7 +93,7 @@ def extract(input_file, output_file, output_format, display, pretty):
         
         # Save schema if output file specified
         if output_file:
-            save_schema(schema, output_file, output_format)
+            save_schema(schema, output_file, output_format, compression=None if no_compress else "zlib")
             console.print(f"[green]Schema saved to: {output_file}[/green]")
         
         # Display summary
@@ -80,10 +107,93 @@ def extract(input_file, output_file, output_format, display, pretty):
         sys.exit(1)
 
 
+@cli.command('extract-batch')
+@click.option('--input', '-i', 'inputs', required=True, multiple=True, help='Input files, directories or glob patterns (repeatable)')
+@click.option('--output-dir', '-o', help='Directory to write one schema per input file to')
+@click.option('--merged', '-m', 'merged_file', help='Output file path for the schema merged over all files')
+@click.option('--format', '-f', 'output_format',
+              type=click.Choice(['json', 'xsd']),
+              default='json', help='Output format of the per-file schemas')
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='Number of worker processes (default: CPU count)')
+@click.option('--streaming', '-s', is_flag=True, help='Stream every input instead of loading it into memory')
+@click.option('--sample-size', type=click.IntRange(min=1), help='Infer array item schemas from at most this many randomly sampled items')
+@click.option('--seed', type=int, help='Random seed for --sample-size')
+@click.option('--cache-dir', help='Reuse schemas of unchanged files stored in this directory')
+@click.option('--cache-size', type=click.IntRange(min=1), default=1024, help='Maximum cache size in MB, least recently used entries are evicted first')
+@click.option('--verify-hash', is_flag=True, help='Compare file content hashes before reusing cached schemas')
+def extract_batch(inputs, output_dir, merged_file, output_format, workers, streaming, sample_size, seed,
+                  cache_dir, cache_size, verify_hash):
+    """Extract schemas from many files in parallel.
+    
+    Files are distributed over a process pool and each schema is written
+    as soon as its file completes. A throughput report (files/s, MB/s) is
+    displayed at the end.
+    """
+    try:
+        file_paths = expand_inputs(inputs)
+        if not file_paths:
+            console.print("[yellow]No input files found.[/yellow]")
+            return
+        
+        base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in file_paths])
+        cache = _open_cache(cache_dir, cache_size, verify_hash)
+        extractor = SchemaExtractor(array_sample_size=sample_size, sample_seed=seed, cache=cache)
+        reducer = SchemaReducer()
+        failures = []
+        stats = BatchStats()
+        
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            TextColumn("{task.completed}/{task.total}"),
+            console=console
+        ) as progress:
+            task = progress.add_task("Extracting schemas...", total=len(file_paths))
+            
+            for result in stats.count(extractor.extract_batch(file_paths, workers=workers, streaming=streaming)):
+                progress.advance(task)
+                if not result.ok:
+                    failures.append(result)
+                    continue
+                
+                if output_dir:
+                    relative = os.path.relpath(os.path.abspath(result.file_path), base_dir)
+                    save_schema(result.schema, os.path.join(output_dir, f"{relative}.schema.{output_format}"), output_format)
+                
+                if merged_file:
+                    reducer.add(result.schema, owned=True)
+            
+            progress.update(task, description="Batch extraction completed!")
+        
+        if merged_file and reducer.count:
+            save_schema(reducer.result(), merged_file)
+            console.print(f"[green]Merged schema saved to: {merged_file}[/green]")
+        if output_dir:
+            console.print(f"[green]Schemas saved to: {output_dir}[/green]")
+        
+        for result in failures[:20]:
+            console.print(f"[red]✗ {result.file_path}: {result.error}[/red]")
+        if len(failures) > 20:
+            console.print(f"[red]... and {len(failures) - 20} more failures[/red]")
+        
+        _display_batch_summary(stats, cache)
+        
+        if failures:
+            sys.exit(1)
+    
+    except FileNotFoundError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--input', '-i', 'input_file', required=True, help='Input file path to validate')
 @click.option('--schema', '-s', 'schema_file', required=True, help='Schema file path')
-def validate(input_file, schema_file):
+@click.option('--streaming', is_flag=True, help='Validate JSON from parse events without loading the document')
+def validate(input_file, schema_file, streaming):
     """Validate a file against a schema."""
     try:
         with Progress(
@@ -102,7 +212,7 @@ def validate(input_file, schema_file):
             extractor = SchemaExtractor()
             
             # Validate file
-            is_valid = extractor.validate_file(input_file, schema)
+            is_valid = extractor.validate_file(input_file, schema, streaming=streaming)
             
             progress.update(task, description="Validation completed!")
         
@@ -121,13 +231,87 @@ def validate(input_file, schema_file):
         sys.exit(1)
 
 
+@cli.command('validate-batch')
+@click.option('--input', '-i', 'inputs', required=True, multiple=True, help='Input files, directories or glob patterns (repeatable)')
+@click.option('--schema', '-s', 'schema_file', required=True, help='Schema file path')
+@click.option('--report', '-r', 'report_file', help='Output file path for the JSON Lines report (one line per file)')
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='Number of worker processes (default: CPU count)')
+@click.option('--streaming', is_flag=True, help='Validate JSON from parse events without loading the documents')
+@click.option('--max-errors', type=click.IntRange(min=1), default=10, help='Violations reported per file')
+def validate_batch(inputs, schema_file, report_file, workers, streaming, max_errors):
+    """Validate many files against one schema in parallel.
+    
+    The schema is loaded and compiled once per worker process. Each result
+    is written to the report as soon as its file completes, as a JSON line
+    with the file, whether it is valid, its errors and the validation time.
+    """
+    try:
+        file_paths = expand_inputs(inputs)
+        if not file_paths:
+            console.print("[yellow]No input files found.[/yellow]")
+            return
+        
+        schema = load_schema(schema_file)
+        extractor = SchemaExtractor()
+        invalid = []
+        stats = BatchStats()
+        
+        if report_file and os.path.dirname(report_file):
+            os.makedirs(os.path.dirname(report_file), exist_ok=True)
+        report = open(report_file, 'w', encoding='utf-8') if report_file else None
+        try:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                TextColumn("{task.completed}/{task.total}"),
+                console=console
+            ) as progress:
+                task = progress.add_task("Validating files...", total=len(file_paths))
+                
+                results = extractor.validate_batch(file_paths, schema, workers=workers, streaming=streaming,
+                                                   max_errors=max_errors)
+                for result in stats.count(results):
+                    progress.advance(task)
+                    if report is not None:
+                        report.write(json.dumps(result.to_record()) + "\n")
+                    if not result.ok:
+                        invalid.append(result)
+                
+                progress.update(task, description="Batch validation completed!")
+        finally:
+            if report is not None:
+                report.close()
+        
+        if report_file:
+            console.print(f"[green]Report saved to: {report_file}[/green]")
+        
+        for result in invalid[:20]:
+            first = result.error or str(result.violations[0])
+            console.print(f"[red]✗ {result.file_path}: {first}[/red]")
+        if len(invalid) > 20:
+            console.print(f"[red]... and {len(invalid) - 20} more invalid files[/red]")
+        
+        _display_batch_summary(stats, failed_label="Invalid")
+        
+        if invalid:
+            sys.exit(1)
+    
+    except FileNotFoundError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--input', '-i', 'input_file', required=True, help='Input file path')
 @click.option('--output', '-o', 'output_file', help='Output file path')
 @click.option('--format', '-f', 'output_format', 
-              type=click.Choice(['json', 'xsd']), 
+              type=click.Choice(['json', 'xsd', 'binary']), 
               default='json', help='Output format')
-def convert(input_file, output_file, output_format):
+@click.option('--no-compress', is_flag=True, help='Store binary schemas without zlib compression')
+def convert(input_file, output_file, output_format, no_compress):
     """Convert schema between formats."""
     try:
         with Progress(
@@ -146,7 +330,7 @@ def convert(input_file, output_file, output_format):
                 output_file = f"{base_name}.{output_format}"
             
             # Save in new format
-            save_schema(schema, output_file, output_format)
+            save_schema(schema, output_file, output_format, compression=None if no_compress else "zlib")
             
             progress.update(task, description="Conversion completed!")
         
@@ -161,38 +345,33 @@ def convert(input_file, output_file, output_format):
 
 
 @cli.command()
-@click.option('--input', '-i', 'input_files', required=True, multiple=True, help='Input schema files')
+@click.option('--input', '-i', 'input_files', required=True, multiple=True, help='Input schema files, directories or glob patterns')
 @click.option('--output', '-o', 'output_file', required=True, help='Output merged schema file')
-def merge(input_files, output_file):
-    """Merge multiple schemas into one."""
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='Number of worker processes (default: CPU count)')
+def merge(input_files, output_file, workers):
+    """Merge multiple schemas into one.
+    
+    Schemas are merged as a tree reduction over a process pool, holding
+    only a few of them in memory at a time.
+    """
     try:
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=console
         ) as progress:
-            task = progress.add_task("Loading schemas...", total=len(input_files))
+            task = progress.add_task("Merging schemas...", total=None)
             
-            # Load all schemas
-            schemas = []
-            for schema_file in input_files:
-                schema = load_schema(schema_file)
-                schemas.append(schema)
-                progress.advance(task)
-            
-            progress.update(task, description="Merging schemas...")
-            
-            # Merge schemas (assuming all are JSON schemas for now)
-            from schema_extractor.extractors.json_extractor import JSONExtractor
-            extractor = JSONExtractor()
-            merged_schema = extractor.merge_schemas(schemas)
+            # Binary schemas have no fixed extension, so they are recognized by their header
+            schema_files = expand_inputs(input_files, extensions=(".json",), include=is_binary_schema)
+            merged_schema = merge_schema_files(schema_files, workers=workers)
             
             # Save merged schema
             save_schema(merged_schema, output_file)
             
             progress.update(task, description="Merge completed!")
         
-        console.print(f"[green]Schemas merged and saved to: {output_file}[/green]")
+        console.print(f"[green]{len(schema_files)} schemas merged and saved to: {output_file}[/green]")
         
     except FileNotFoundError as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -209,62 +388,85 @@ def merge(input_files, output_file):
 @click.option('--path', '-p', 'path_pattern', help='Filter by path pattern (regex)')
 @click.option('--leaf-only', '-l', is_flag=True, help='Show only leaf nodes (nodes with actual values)')
 @click.option('--format', '-f', 'output_format', 
-              type=click.Choice(['table', 'json', 'csv']), 
-              default='table', help='Output format')
+              type=click.Choice(['table', 'json', 'jsonl', 'csv', 'arrow', 'parquet']), 
+              default='table', help='Output format (arrow and parquet require --output and pyarrow)')
+@click.option('--compression', '-c', type=click.Choice(COMPRESSIONS),
+              help='Compress the output file (default: inferred from a .gz or .zst extension; parquet defaults to snappy)')
+@click.option('--min-depth', type=int, help='Minimum depth to display')
 @click.option('--max-depth', '-d', type=int, help='Maximum depth to display')
-def nodes(input_file, output_file, data_type, path_pattern, leaf_only, output_format, max_depth):
-    """List data nodes from XML or JSON file."""
+@click.option('--value', '-v', 'value_filters', multiple=True,
+              help="Filter on node values, e.g. '>=10', '=active', '!=null' or '~^2024' (repeatable, all must match)")
+@click.option('--offset', type=click.IntRange(min=0), default=0, help='Skip this many matching nodes')
+@click.option('--limit', '-n', type=click.IntRange(min=0), help='Stop after this many matching nodes')
+@click.option('--streaming', '-s', is_flag=True, help='Generate nodes while parsing instead of loading the file (container nodes carry no value)')
+def nodes(input_file, output_file, data_type, path_pattern, leaf_only, output_format, compression,
+          min_depth, max_depth, value_filters, offset, limit, streaming):
+    """List data nodes from XML or JSON file.
+    
+    All filters are compiled into one query that the extractor checks
+    before creating each node, so failing nodes are never built; parsing
+    stops once --limit nodes have been found. With --output nodes are
+    written straight to the file and only the summary is displayed.
+    """
     try:
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            task = progress.add_task("Extracting data nodes...", total=None)
-            
-            # Initialize extractor
-            extractor = SchemaExtractor()
-            
-            # Extract schema (which includes data nodes)
-            schema = extractor.extract_schema(input_file)
-            
-            progress.update(task, description="Data nodes extraction completed!")
-        
-        # Filter data nodes
-        data_nodes = schema.data_nodes
-        
+        filter_type = None
         if data_type:
             try:
                 filter_type = DataType(data_type.lower())
-                data_nodes = schema.get_data_nodes_by_type(filter_type)
             except ValueError:
                 console.print(f"[red]Error: Invalid data type '{data_type}'. Valid types: {[t.value for t in DataType]}[/red]")
                 sys.exit(1)
         
-        if path_pattern:
-            data_nodes = schema.get_data_nodes_by_path(path_pattern)
+        # Initialize extractor and compile the filters
+        extractor = SchemaExtractor()
+        stats = _DataNodeStats()
+        query = NodeQuery(
+            data_type=filter_type,
+            path_pattern=path_pattern,
+            leaf_only=leaf_only,
+            min_depth=min_depth,
+            max_depth=max_depth,
+            value_filters=value_filters,
+            offset=offset,
+            limit=limit
+        )
         
-        if leaf_only:
-            data_nodes = schema.get_leaf_nodes()
+        if output_format in ARROW_FORMATS:
+            if not output_file:
+                console.print(f"[red]Error: --format {output_format} requires --output[/red]")
+                sys.exit(1)
+            
+            # Build typed record batches from the columns of the extracted data node table
+            if streaming or detect_file_type(input_file) == "jsonl":
+                batches = record_batches(extractor.iter_data_nodes(input_file, streaming=streaming, query=query))
+            else:
+                batches = record_batches(extractor.extract_schema(input_file).data_nodes, query=query)
+            write_record_batches(stats.count_batches(batches), output_file, output_format, compression)
+            console.print(f"[green]Data nodes saved to: {output_file}[/green]")
+            _display_data_nodes_summary(stats, query)
+            return
         
-        if max_depth is not None:
-            data_nodes = [node for node in data_nodes if node.depth <= max_depth]
+        # Generate data nodes lazily, with the query pushed into the extractor
+        data_nodes = stats.count_found(extractor.iter_data_nodes(input_file, streaming=streaming, query=query))
         
-        # Display results
-        if output_format == 'table':
-            _display_data_nodes_table(data_nodes, schema.name)
+        if output_file and output_format != 'table':
+            # Stream to the file without displaying every node
+            _save_data_nodes(data_nodes, output_file, output_format, compression)
+            console.print(f"[green]Data nodes saved to: {output_file}[/green]")
+        elif output_format == 'table':
+            _display_data_nodes_table(data_nodes, Path(input_file).stem)
+            if output_file:
+                console.print(f"[yellow]Tables are only displayed; use --format json, jsonl, csv, arrow "
+                              f"or parquet to save to {output_file}[/yellow]")
         elif output_format == 'json':
             _display_data_nodes_json(data_nodes)
+        elif output_format == 'jsonl':
+            write_data_nodes(data_nodes, sys.stdout, 'jsonl')
         elif output_format == 'csv':
             _display_data_nodes_csv(data_nodes)
         
-        # Save to file if requested
-        if output_file:
-            _save_data_nodes(data_nodes, output_file, output_format)
-            console.print(f"[green]Data nodes saved to: {output_file}[/green]")
-        
         # Display summary
-        _display_data_nodes_summary(data_nodes, schema)
+        _display_data_nodes_summary(stats, query)
         
     except FileNotFoundError as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -274,6 +476,39 @@ def nodes(input_file, output_file, data_type, path_pattern, leaf_only, output_fo
         sys.exit(1)
 
 
+class _DataNodeStats:
+    """Running totals over a stream of data nodes."""
+    
+    def __init__(self):
+        self.found = 0
+        self.leaves = 0
+        self.max_depth = 0
+        self.type_counts = {}
+    
+    def count_found(self, data_nodes):
+        """Count the nodes that passed the filters."""
+        for node in data_nodes:
+            self.found += 1
+            if node.is_leaf:
+                self.leaves += 1
+            if node.depth > self.max_depth:
+                self.max_depth = node.depth
+            self.type_counts[node.data_type.value] = self.type_counts.get(node.data_type.value, 0) + 1
+            yield node
+    
+    def count_batches(self, batches):
+        """Count the rows of Arrow record batches that passed the filters."""
+        import pyarrow.compute as pc
+        
+        for batch in batches:
+            self.found += batch.num_rows
+            self.leaves += pc.sum(batch.column("is_leaf")).as_py() or 0
+            self.max_depth = max(self.max_depth, pc.max(batch.column("depth")).as_py() or 0)
+            for entry in batch.column("data_type").dictionary_decode().value_counts().to_pylist():
+                self.type_counts[entry["values"]] = self.type_counts.get(entry["values"], 0) + entry["counts"]
+            yield batch
+
+
 def _display_schema_summary(schema):
     """Display a summary of the extracted schema."""
     table = Table(title="Schema Summary")
@@ -294,12 +529,34 @@ def _display_schema_summary(schema):
     console.print(table)
 
 
+def _open_cache(cache_dir, cache_size, verify_hash):
+    """Return the SchemaCache selected by the --cache-* options, or None."""
+    if not cache_dir:
+        return None
+    return SchemaCache(cache_dir, max_bytes=cache_size * 1024 * 1024, verify_hash=verify_hash)
+
+
+def _display_batch_summary(stats, cache=None, failed_label="Failed"):
+    """Display the file counts and throughput of a batch extraction or validation."""
+    table = Table(title="Batch Summary")
+    table.add_column("Property", style="cyan")
+    table.add_column("Value", style="magenta")
+    
+    table.add_row("Files", str(stats.files))
+    table.add_row(failed_label, str(stats.failed))
+    table.add_row("Total Size", f"{stats.bytes / (1024 * 1024):.2f} MB")
+    table.add_row("Elapsed", f"{stats.elapsed:.2f} s")
+    table.add_row("Files/s", f"{stats.files_per_second:.1f}")
+    table.add_row("MB/s", f"{stats.mb_per_second:.2f}")
+    if cache is not None:
+        cache_stats = cache.stats()
+        table.add_row("Cache", f"{cache_stats['entries']} entries, {cache_stats['bytes'] / (1024 * 1024):.2f} MB")
+    
+    console.print(table)
+
+
 def _display_data_nodes_table(data_nodes, schema_name):
     """Display data nodes in a table format."""
-    if not data_nodes:
-        console.print("[yellow]No data nodes found matching the criteria.[/yellow]")
-        return
-    
     table = Table(title=f"Data Nodes - {schema_name}")
     table.add_column("Path", style="cyan", no_wrap=True)
     table.add_column("Name", style="green")
@@ -323,6 +580,10 @@ def _display_data_nodes_table(data_nodes, schema_name):
             "✓" if node.is_leaf else "✗"
         )
     
+    if not table.row_count:
+        console.print("[yellow]No data nodes found matching the criteria.[/yellow]")
+        return
+    
     console.print(table)
 
 
@@ -330,18 +591,7 @@ def _display_data_nodes_json(data_nodes):
     """Display data nodes in JSON format."""
     import json
     
-    nodes_data = []
-    for node in data_nodes:
-        nodes_data.append({
-            "path": node.path,
-            "name": node.name,
-            "value": node.value,
-            "data_type": node.data_type.value,
-            "depth": node.depth,
-            "parent_path": node.parent_path,
-            "is_leaf": node.is_leaf,
-            "description": node.description
-        })
+    nodes_data = [data_node_record(node) for node in data_nodes]
     
     json_output = json.dumps(nodes_data, indent=2, default=str)
     syntax = Syntax(json_output, "json", theme="monokai")
@@ -357,84 +607,100 @@ def _display_data_nodes_csv(data_nodes):
     writer = csv.writer(output)
     
     # Write header
-    writer.writerow(["Path", "Name", "Value", "Type", "Depth", "Is Leaf", "Parent Path"])
+    writer.writerow(CSV_HEADER)
     
     # Write data
     for node in data_nodes:
-        writer.writerow([
-            node.path,
-            node.name,
-            str(node.value) if node.value is not None else "",
-            node.data_type.value,
-            node.depth,
-            node.is_leaf,
-            node.parent_path or ""
-        ])
+        writer.writerow(data_node_row(node))
     
     console.print(Panel(output.getvalue(), title="Data Nodes (CSV)", border_style="green"))
 
 
-def _save_data_nodes(data_nodes, output_file, format_type):
-    """Save data nodes to a file."""
-    import json
-    import csv
-    
-    if format_type == 'json':
-        nodes_data = []
-        for node in data_nodes:
-            nodes_data.append({
-                "path": node.path,
-                "name": node.name,
-                "value": node.value,
-                "data_type": node.data_type.value,
-                "depth": node.depth,
-                "parent_path": node.parent_path,
-                "is_leaf": node.is_leaf,
-                "description": node.description
-            })
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(nodes_data, f, indent=2, default=str)
-    
-    elif format_type == 'csv':
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Path", "Name", "Value", "Type", "Depth", "Is Leaf", "Parent Path"])
-            
-            for node in data_nodes:
-                writer.writerow([
-                    node.path,
-                    node.name,
-                    str(node.value) if node.value is not None else "",
-                    node.data_type.value,
-                    node.depth,
-                    node.is_leaf,
-                    node.parent_path or ""
-                ])
-
-
-def _display_data_nodes_summary(data_nodes, schema):
-    """Display a summary of the data nodes."""
+def _save_data_nodes(data_nodes, output_file, format_type, compression=None):
+    """Stream data nodes to a file, writing them one at a time."""
+    if compression is None:
+        compression = compression_for(output_file)
+    export_data_nodes(data_nodes, output_file, format_type, compression)
+
+
+def _display_data_nodes_summary(stats, query):
+    """Display a summary of the data nodes found by a query."""
     table = Table(title="Data Nodes Summary")
     table.add_column("Property", style="cyan")
     table.add_column("Value", style="magenta")
     
-    table.add_row("Total Nodes Found", str(len(data_nodes)))
-    table.add_row("Total Nodes in Schema", str(schema.total_data_nodes))
-    table.add_row("Leaf Nodes", str(len([n for n in data_nodes if n.is_leaf])))
-    table.add_row("Max Depth", str(max([n.depth for n in data_nodes]) if data_nodes else 0))
+    table.add_row("Total Nodes Found", str(stats.found))
+    if query.exhaustive:
+        table.add_row("Total Nodes in Schema", str(query.scanned))
+    else:
+        # Skipped subtrees and an early stop leave nodes unvisited
+        table.add_row("Nodes Scanned", str(query.scanned))
+    table.add_row("Leaf Nodes", str(stats.leaves))
+    table.add_row("Max Depth", str(stats.max_depth))
     
     # Count by type
-    type_counts = {}
-    for node in data_nodes:
-        type_counts[node.data_type.value] = type_counts.get(node.data_type.value, 0) + 1
-    
-    for data_type, count in sorted(type_counts.items()):
+    for data_type, count in sorted(stats.type_counts.items()):
         table.add_row(f"Type: {data_type}", str(count))
     
     console.print(table)
 
 
+@cli.command()
+@click.option('--input', '-i', 'input_file', required=True, help='Input file path (XML, JSON or JSON Lines)')
+@click.option('--path', '-p', 'path_pattern', help='Only summarize paths matching this regex')
+@click.option('--top', '-k', 'top_k', type=click.IntRange(min=1), default=5, help='Frequent values shown per field')
+@click.option('--precision', type=click.IntRange(4, 18), default=12,
+              help='HyperLogLog precision; 2**precision bytes per field, about 1.04/sqrt(2**precision) error')
+@click.option('--streaming', '-s', is_flag=True, help='Generate nodes while parsing instead of loading the file')
+def values(input_file, path_pattern, top_k, precision, streaming):
+    """Summarize the leaf values of each field.
+    
+    Distinct counts are HyperLogLog estimates and frequent values come
+    from Misra-Gries counters, so memory per field is fixed however many
+    values there are. Items of arrays are grouped into one field.
+    """
+    try:
+        extractor = SchemaExtractor()
+        query = NodeQuery(leaf_only=True, path_pattern=path_pattern)
+        sketches = summarize_values(
+            extractor.iter_data_nodes(input_file, streaming=streaming, query=query),
+            precision=precision,
+            capacity=max(100, top_k * 10)
+        )
+        _display_value_summary(sketches, top_k, Path(input_file).stem)
+        
+    except FileNotFoundError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Error: {e}[/red]")
+        sys.exit(1)
+
+
+def _display_value_summary(sketches, top_k, schema_name):
+    """Display the value sketches of each field."""
+    if not sketches:
+        console.print("[yellow]No leaf values found.[/yellow]")
+        return
+    
+    table = Table(title=f"Field Values - {schema_name}")
+    table.add_column("Field", style="cyan", no_wrap=True)
+    table.add_column("Values", style="yellow", justify="right")
+    table.add_column("Distinct (≈)", style="green", justify="right")
+    table.add_column("Most Frequent (≈ count)", style="magenta", max_width=60)
+    
+    for field, sketch in sketches.items():
+        frequent = []
+        for value, count in sketch.top(top_k):
+            value_str = str(value)
+            if len(value_str) > 20:
+                value_str = value_str[:17] + "..."
+            frequent.append(f"{value_str} ({count})")
+        table.add_row(field, str(sketch.count), str(sketch.distinct_count()), ", ".join(frequent))
+    
+    console.print(table)
+
+
 @cli.command()
 def info():
     """Display information about the schema extractor."""
@@ -454,6 +720,7 @@ def info():
     [bold]Supported Formats:[/bold]
     • XML files (.xml, .xhtml, .svg)
     • JSON files (.json, .js)
+    • JSON Lines files (.jsonl, .ndjson)
     
     [bold]Output Formats:[/bold]
     • JSON Schema
@@ -2,75 +2,218 @@
 Schema Extractor - A tool for extracting schemas from XML and JSON files.
 """
 
-from .models.schema import Schema
+from typing import Iterator, List, Optional, Union
+
+from .models.schema import Schema, DataNode
+from .models.query import NodeQuery
 from .extractors.xml_extractor import XMLExtractor
 from .extractors.json_extractor import JSONExtractor
+from .extractors.incremental import extract_incremental
 from .utils.helpers import detect_file_type, validate_schema
+from .utils.mapped import MappedFile
+from .utils.batch import BatchResult, ValidationResult, extract_batch, validate_batch
+from .utils.cache import SchemaCache
 
 
 class SchemaExtractor:
     """Main class for extracting schemas from XML and JSON files."""
     
-    def __init__(self):
-        self.xml_extractor = XMLExtractor()
-        self.json_extractor = JSONExtractor()
+    def __init__(self, array_sample_size: Optional[int] = None, sample_seed: Optional[int] = None,
+                 cache: Union[SchemaCache, str, None] = None):
+        """
+        Args:
+            array_sample_size: Fold at most this many randomly sampled items of
+                each array (or repeated XML element) into the schema
+            sample_seed: Seed for the sampling, for reproducible schemas
+            cache: SchemaCache, or cache directory, that extract_schema
+                reuses schemas of unchanged files from
+        """
+        self.array_sample_size = array_sample_size
+        self.sample_seed = sample_seed
+        self.cache = SchemaCache(cache) if isinstance(cache, str) else cache
+        self.xml_extractor = XMLExtractor(array_sample_size, sample_seed)
+        self.json_extractor = JSONExtractor(array_sample_size, sample_seed)
     
-    def extract_schema(self, file_path: str) -> Schema:
+    def extract_schema(self, file_path: str, streaming: bool = False, workers: int = 1) -> Schema:
         """
         Extract schema from a file (auto-detects file type).
         
         Args:
-            file_path: Path to the XML or JSON file
+            file_path: Path to the XML, JSON or JSON Lines file
+            streaming: Parse incrementally with memory bounded by document depth
+            workers: Number of processes used for JSON Lines files
             
         Returns:
-            Schema object containing the extracted schema
+            Schema object containing the extracted schema; with a cache, a
+            stored schema when the file is unchanged
         """
-        file_type = detect_file_type(file_path)
+        if self.cache is None:
+            return self._extract_schema(file_path, streaming, workers)
         
-        if file_type == "xml":
-            return self.extract_xml_schema(file_path)
-        elif file_type == "json":
-            return self.extract_json_schema(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+        options = {"streaming": streaming, "array_sample_size": self.array_sample_size,
+                   "sample_seed": self.sample_seed}
+        schema = self.cache.get(file_path, options)
+        if schema is None:
+            stamp = self.cache.stamp(file_path)
+            schema = self._extract_schema(file_path, streaming, workers)
+            self.cache.put(file_path, schema, options, stamp)
+        return schema
+    
+    def _extract_schema(self, file_path: str, streaming: bool, workers: int) -> Schema:
+        """Extract a schema, sniffing and parsing from one mapping of the file."""
+        with MappedFile(file_path) as source:
+            file_type = detect_file_type(file_path, source)
+            
+            if file_type == "xml":
+                return self.xml_extractor.extract(file_path, streaming=streaming, mapped=source)
+            elif file_type == "json":
+                return self.json_extractor.extract(file_path, streaming=streaming, mapped=source)
+            elif file_type == "jsonl":
+                return self.json_extractor.extract_jsonl(file_path, workers=workers, mapped=source)
+            else:
+                raise ValueError(f"Unsupported file type: {file_type}")
     
-    def extract_xml_schema(self, file_path: str) -> Schema:
+    def extract_incremental(self, file_path: str, checkpoint_path: Optional[str] = None) -> Schema:
+        """
+        Extract schema from an append-only JSON Lines or XML file, parsing
+        only what was appended since the previous run.
+        
+        The consumed byte offset and the schema so far are kept in a
+        checkpoint file. XML files are read as one root element whose
+        children are appended.
+        
+        Args:
+            file_path: Path to the JSON Lines or XML file
+            checkpoint_path: Checkpoint file to resume from and update
+                (defaults to the file path with ".checkpoint" appended)
+            
+        Returns:
+            Schema object of the complete records read so far
+        """
+        with MappedFile(file_path) as source:
+            file_type = detect_file_type(file_path, source)
+            return extract_incremental(source, file_type, checkpoint_path or f"{file_path}.checkpoint",
+                                       self.json_extractor, self.xml_extractor)
+    
+    def extract_xml_schema(self, file_path: str, streaming: bool = False) -> Schema:
         """
         Extract schema from an XML file.
         
         Args:
             file_path: Path to the XML file
+            streaming: Parse with iterparse, clearing processed elements
             
         Returns:
             Schema object containing the extracted XML schema
         """
-        return self.xml_extractor.extract(file_path)
+        return self.xml_extractor.extract(file_path, streaming=streaming)
     
-    def extract_json_schema(self, file_path: str) -> Schema:
+    def extract_json_schema(self, file_path: str, streaming: bool = False) -> Schema:
         """
         Extract schema from a JSON file.
         
         Args:
             file_path: Path to the JSON file
+            streaming: Parse incrementally instead of loading the whole document
             
         Returns:
             Schema object containing the extracted JSON schema
         """
-        return self.json_extractor.extract(file_path)
+        return self.json_extractor.extract(file_path, streaming=streaming)
+    
+    def extract_jsonl_schema(self, file_path: str, workers: int = 1) -> Schema:
+        """
+        Extract schema from a JSON Lines file, folding all records into one root element.
+        
+        Args:
+            file_path: Path to the JSON Lines file
+            workers: Number of processes; the file is split on line boundaries
+            
+        Returns:
+            Schema object whose root element describes one record
+        """
+        return self.json_extractor.extract_jsonl(file_path, workers=workers)
+    
+    def extract_batch(self, file_paths: List[str], workers: Optional[int] = None,
+                      streaming: bool = False, keep_data_nodes: bool = False) -> Iterator[BatchResult]:
+        """
+        Extract schemas from many files in parallel worker processes.
+        
+        Args:
+            file_paths: Paths to the XML or JSON files
+            workers: Number of worker processes (defaults to the CPU count)
+            streaming: Parse every file incrementally
+            keep_data_nodes: Return the data nodes along with each schema
+            
+        Returns:
+            Iterator over one BatchResult per file, in completion order
+        """
+        return extract_batch(file_paths, workers=workers, streaming=streaming,
+                             array_sample_size=self.array_sample_size, sample_seed=self.sample_seed,
+                             keep_data_nodes=keep_data_nodes, cache=self.cache)
+    
+    def validate_batch(self, file_paths: List[str], schema: Schema, workers: Optional[int] = None,
+                       streaming: bool = False, max_errors: Optional[int] = 10) -> Iterator[ValidationResult]:
+        """
+        Validate many files against one schema in parallel worker processes.
+        
+        Args:
+            file_paths: Paths to the XML, JSON or JSON Lines files
+            schema: Schema every file is validated against, compiled once per worker
+            workers: Number of worker processes (defaults to the CPU count)
+            streaming: Validate JSON documents from parse events
+            max_errors: Violations collected per file (None for all of them)
+            
+        Returns:
+            Iterator over one ValidationResult per file, in completion order
+        """
+        return validate_batch(file_paths, schema, workers=workers, streaming=streaming, max_errors=max_errors)
+    
+    def iter_data_nodes(self, file_path: str, streaming: bool = False,
+                        query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """
+        Lazily yield the data nodes of a file (auto-detects file type).
+        
+        Args:
+            file_path: Path to the XML, JSON or JSON Lines file
+            streaming: Generate the nodes while parsing instead of loading
+                the whole document first (JSON Lines files are always read
+                one record at a time)
+            query: NodeQuery pushed down into the extractor: nodes failing
+                it are never created, and parsing stops once its limit is
+                reached
+            
+        Returns:
+            Iterator over the data nodes in document order
+        """
+        file_type = detect_file_type(file_path)
+        
+        if file_type == "xml":
+            nodes = self.xml_extractor.iter_nodes(file_path, streaming=streaming, query=query)
+        elif file_type == "json":
+            nodes = self.json_extractor.iter_nodes(file_path, streaming=streaming, query=query)
+        elif file_type == "jsonl":
+            nodes = self.json_extractor.iter_jsonl_nodes(file_path, query=query)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+        return query.paginate(nodes) if query is not None else nodes
     
-    def validate_file(self, file_path: str, schema: Schema) -> bool:
+    def validate_file(self, file_path: str, schema: Schema, streaming: bool = False) -> bool:
         """
         Validate a file against a schema.
         
         Args:
             file_path: Path to the file to validate
             schema: Schema object to validate against
+            streaming: Validate JSON documents from parse events, in memory
+                bounded by their nesting depth
             
         Returns:
             True if valid, False otherwise
         """
-        return validate_schema(file_path, schema)
+        return validate_schema(file_path, schema, streaming)
 
 
 __version__ = "1.0.0"
-__all__ = ["SchemaExtractor", "Schema", "XMLExtractor", "JSONExtractor"]
+__all__ = ["SchemaExtractor", "Schema", "XMLExtractor", "JSONExtractor", "BatchResult", "ValidationResult",
+           "SchemaCache", "NodeQuery"]
@@ -4,5 +4,6 @@ Schema extractors for different file formats.
 
 from .xml_extractor import XMLExtractor
 from .json_extractor import JSONExtractor
+from .merge import merge_schemas, SchemaReducer
 
-__all__ = ["XMLExtractor", "JSONExtractor"]
+__all__ = ["XMLExtractor", "JSONExtractor", "merge_schemas", "SchemaReducer"]
@@ -0,0 +1,332 @@
+"""
+Incremental schema extraction for append-only JSON Lines and XML files.
+
+A checkpoint records how far a file has been read and the schema of
+everything before that point. The next run checks that the file still
+starts with the same bytes, parses only what was appended since, and folds
+the schema of the new part into the stored one.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import xml.parsers.expat
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from ..models.schema import Schema, SchemaElement, DataType
+from ..utils.mapped import MappedFile
+from .merge import SchemaReducer, merge_into, _count_totals
+
+CHECKPOINT_VERSION = 1
+
+# Bytes hashed at the start of the file and before the checkpoint offset
+FINGERPRINT_BYTES = 4096
+
+# Bytes fed to the boundary scanner at a time
+_SCAN_CHUNK = 1 << 20
+
+
+class Checkpoint:
+    """Progress of the incremental extraction of one file."""
+    __slots__ = ("file_type", "offset", "fingerprint", "options", "schema", "head", "close_tag")
+
+    def __init__(self, file_type: str, offset: int, fingerprint: str, options: Dict[str, Any],
+                 schema: Schema, head: bytes = b"", close_tag: bytes = b""):
+        self.file_type = file_type
+        self.offset = offset  # Bytes read so far, always at a record boundary
+        self.fingerprint = fingerprint  # Hash of the bytes around the start and the offset
+        self.options = options  # Extraction options the schema was built with
+        self.schema = schema  # Schema of the first `offset` bytes
+        self.head = head  # XML: bytes up to the end of the root start tag
+        self.close_tag = close_tag  # XML: end tag of the root element
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"version": CHECKPOINT_VERSION, **{name: getattr(self, name) for name in self.__slots__}}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+        for name in self.__slots__:
+            setattr(self, name, state[name])
+
+
+def load_checkpoint(checkpoint_path: str) -> Optional[Checkpoint]:
+    """
+    Load a checkpoint, or return None if it is missing or unreadable.
+
+    Args:
+        checkpoint_path: Path of the checkpoint file
+
+    Returns:
+        The checkpoint, or None
+    """
+    try:
+        with open(checkpoint_path, 'rb') as f:
+            checkpoint = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+        return None
+    return checkpoint if isinstance(checkpoint, Checkpoint) else None
+
+
+def save_checkpoint(checkpoint: Checkpoint, checkpoint_path: str) -> None:
+    """
+    Write a checkpoint atomically.
+
+    Args:
+        checkpoint: Checkpoint to save
+        checkpoint_path: Path of the checkpoint file
+    """
+    directory = os.path.dirname(os.path.abspath(checkpoint_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, checkpoint_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def extract_incremental(source: MappedFile, file_type: str, checkpoint_path: str,
+                        json_extractor: Any, xml_extractor: Any) -> Schema:
+    """
+    Extract the schema of an append-only file, resuming from its checkpoint.
+
+    Only complete records are consumed: JSON Lines up to the last newline,
+    XML up to the end of the last complete child of the root element. The
+    rest is left for the next run. The checkpoint is discarded and the file
+    read from the start when it was truncated, rewritten or extracted with
+    other options. With array sampling, each run samples its own part.
+
+    Args:
+        source: Mapping of the file
+        file_type: "jsonl" or "xml"
+        checkpoint_path: Checkpoint to resume from and update
+        json_extractor: JSONExtractor used for JSON Lines records
+        xml_extractor: XMLExtractor used for XML elements
+
+    Returns:
+        Schema of the consumed part of the file; data nodes are counted,
+        not collected
+    """
+    if file_type not in ("jsonl", "xml"):
+        raise ValueError(f"Incremental extraction supports JSON Lines and XML files, not {file_type}")
+
+    extractor = xml_extractor if file_type == "xml" else json_extractor
+    options = {"array_sample_size": extractor.array_sample_size, "sample_seed": extractor.sample_seed}
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None and not _can_resume(checkpoint, source, file_type, options):
+        checkpoint = None
+
+    if file_type == "jsonl":
+        checkpoint = _extend_jsonl(source, checkpoint, options, json_extractor)
+    else:
+        checkpoint = _extend_xml(source, checkpoint, options, xml_extractor)
+
+    save_checkpoint(checkpoint, checkpoint_path)
+
+    schema = checkpoint.schema
+    schema.name = os.path.splitext(os.path.basename(source.file_path))[0]
+    schema.created_at = extractor._get_creation_time(source.file_path)
+    return schema
+
+
+def _can_resume(checkpoint: Checkpoint, source: MappedFile, file_type: str, options: Dict[str, Any]) -> bool:
+    """Whether the file still starts with the bytes a checkpoint was taken over."""
+    return (checkpoint.file_type == file_type
+            and checkpoint.options == options
+            and checkpoint.offset <= source.size
+            and source.head(len(checkpoint.head)) == checkpoint.head
+            and _fingerprint(source, checkpoint.offset) == checkpoint.fingerprint)
+
+
+def _fingerprint(source: MappedFile, offset: int) -> str:
+    """Hash the first bytes of a file and the bytes before `offset`."""
+    buffer = source.buffer
+    digest = hashlib.sha256(buffer[:min(offset, FINGERPRINT_BYTES)])
+    digest.update(buffer[max(0, offset - FINGERPRINT_BYTES):offset])
+    return digest.hexdigest()
+
+
+def _extend_jsonl(source: MappedFile, checkpoint: Optional[Checkpoint], options: Dict[str, Any],
+                  json_extractor: Any) -> Checkpoint:
+    """Fold the complete lines appended after a checkpoint into its schema."""
+    start = checkpoint.offset if checkpoint is not None else 0
+    end = source.buffer.rfind(b"\n", start) + 1
+    if end <= start:
+        end = start
+    if checkpoint is not None and end == start:
+        return checkpoint
+
+    tail = json_extractor._extract_jsonl_range(source, start, end)
+    if checkpoint is None:
+        schema = tail
+    else:
+        reducer = SchemaReducer()
+        reducer.add(checkpoint.schema, owned=True)
+        reducer.add(tail, owned=True)
+        schema = reducer.result()
+    schema.file_type = "jsonl"
+    return Checkpoint("jsonl", end, _fingerprint(source, end), options, schema)
+
+
+def _extend_xml(source: MappedFile, checkpoint: Optional[Checkpoint], options: Dict[str, Any],
+                xml_extractor: Any) -> Checkpoint:
+    """Fold the root children appended after a checkpoint into its schema."""
+    if checkpoint is None:
+        head, close_tag = _scan_root(source)
+        start = len(head)
+    else:
+        head, close_tag, start = checkpoint.head, checkpoint.close_tag, checkpoint.offset
+
+    end = _last_child_end(source, head, start)
+    if checkpoint is not None and end == start:
+        return checkpoint
+
+    # Parse the new children inside a copy of the root start tag
+    tail = xml_extractor.extract_pieces(_document_pieces(source, head, start, end, close_tag))
+    if checkpoint is None:
+        schema = tail
+    else:
+        schema = checkpoint.schema
+        _fold_root_children(schema.root_element, tail.root_element)
+        root_nodes = 1 + len(tail.root_element.attributes)
+        schema.total_data_nodes += tail.total_data_nodes - root_nodes
+        schema.max_depth = max(schema.max_depth, tail.max_depth)
+        _count_totals(schema)
+    return Checkpoint("xml", end, _fingerprint(source, end), options, schema, head, close_tag)
+
+
+def _document_pieces(source: MappedFile, head: bytes, start: int, end: int,
+                     close_tag: bytes) -> Iterator[bytes]:
+    """Yield the root start tag, the children in [start, end) and the root end tag."""
+    yield head
+    buffer = source.buffer
+    for offset in range(start, end, _SCAN_CHUNK):
+        yield buffer[offset:min(offset + _SCAN_CHUNK, end)]
+    yield close_tag
+
+
+def _fold_root_children(root: SchemaElement, tail_root: SchemaElement) -> None:
+    """
+    Merge the children of a root element parsed later into the stored root.
+
+    Both describe the same single root element, so its children stay
+    required, and a child tag now seen in both parts is repeated.
+    """
+    properties = root.properties
+    for name, tail_prop in tail_root.properties.items():
+        prop = properties.get(name)
+        if prop is None:
+            properties[name] = tail_prop
+            continue
+
+        if prop.data_type != DataType.ARRAY or prop.array_type is None:
+            prop = SchemaElement.trusted(
+                name=name,
+                data_type=DataType.ARRAY,
+                required=True,
+                array_type=prop.trusted_copy(required=False),
+                occurrences=prop.occurrences
+            )
+        properties[name] = merge_into(prop, tail_prop, xml=True, adopt=True)
+
+
+def _scan_root(source: MappedFile) -> Tuple[bytes, bytes]:
+    """
+    Find the root element of an XML file.
+
+    Returns:
+        The bytes up to the end of the root start tag, and the root end tag
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    found = []
+
+    def start_element(name: str, attributes: Dict[str, str]) -> None:
+        if not found:
+            found.append((name, parser.CurrentByteIndex))
+
+    parser.StartElementHandler = start_element
+    buffer = source.buffer
+    try:
+        for offset in range(0, source.size, _SCAN_CHUNK):
+            parser.Parse(buffer[offset:offset + _SCAN_CHUNK], False)
+            if found:
+                break
+    except xml.parsers.expat.ExpatError as e:
+        raise ValueError(f"Invalid XML in {source.file_path}: {e}") from e
+    if not found:
+        raise ValueError(f"No root element found in {source.file_path}")
+
+    name, tag_start = found[0]
+    tag_end = _start_tag_end(buffer, tag_start)
+    if tag_end < 0:
+        raise ValueError(f"Incomplete root element in {source.file_path}")
+    if buffer[tag_end - 2:tag_end] == b"/>":
+        raise ValueError(f"The root element of {source.file_path} is empty and cannot be appended to")
+    return buffer[:tag_end], f"</{name}>".encode('utf-8')
+
+
+def _start_tag_end(buffer: Any, offset: int) -> int:
+    """Return the offset just past the start tag at `offset`, skipping quoted values, or -1."""
+    position = offset
+    while True:
+        close = buffer.find(b">", position)
+        if close < 0:
+            return -1
+        double = buffer.find(b'"', position, close)
+        single = buffer.find(b"'", position, close)
+        quotes = [quote for quote in (double, single) if quote >= 0]
+        if not quotes:
+            return close + 1
+        quote = min(quotes)
+        position = buffer.find(buffer[quote:quote + 1], quote + 1)
+        if position < 0:
+            return -1
+        position += 1
+
+
+def _last_child_end(source: MappedFile, head: bytes, start: int) -> int:
+    """
+    Return the offset just past the last complete child of the root element
+    between `start` and the end of the file (`start` if there is none).
+
+    The new bytes are scanned with expat after the root start tag, which
+    reports where every element ends without building them.
+    """
+    buffer = source.buffer
+    parser = xml.parsers.expat.ParserCreate()
+    shift = start - len(head)  # Parser offsets past the head -> file offsets
+    state = {"depth": 0, "just_started": False, "end": start, "closed": False}
+
+    def start_element(name: str, attributes: Dict[str, str]) -> None:
+        state["depth"] += 1
+        state["just_started"] = True
+
+    def end_element(name: str) -> None:
+        depth = state["depth"] = state["depth"] - 1
+        just_started, state["just_started"] = state["just_started"], False
+        if depth == 1:
+            offset = parser.CurrentByteIndex + shift
+            # An empty element reports its end just past "/>", an end tag at its "<"
+            if not (just_started and buffer[offset - 2:offset] == b"/>"):
+                offset = buffer.find(b">", offset) + 1
+            state["end"] = offset
+        elif depth == 0:
+            state["closed"] = True
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    try:
+        parser.Parse(head, False)
+        for offset in range(start, source.size, _SCAN_CHUNK):
+            parser.Parse(buffer[offset:offset + _SCAN_CHUNK], False)
+            if state["closed"]:
+                break
+    except xml.parsers.expat.ExpatError as e:
+        if not state["closed"]:
+            raise ValueError(f"Invalid XML in {source.file_path} after byte {state['end']}: {e}") from e
+    return state["end"]
@@ -0,0 +1,201 @@
+"""
+Incremental schema inference shared by the JSON and XML extractors.
+"""
+
+import random
+from typing import Any, Dict, List, Optional, Set
+
+from ..models.schema import SchemaElement, DataType
+
+# Maximum number of distinct example values kept per element
+MAX_EXAMPLES = 5
+
+EXAMPLE_TYPES = (DataType.STRING, DataType.INTEGER, DataType.FLOAT, DataType.BOOLEAN)
+NUMERIC_TYPES = (DataType.INTEGER, DataType.FLOAT)
+STRING_TYPES = (DataType.STRING, DataType.DATE, DataType.DATETIME)
+
+
+def widen_data_type(current: DataType, new: DataType, fallback: DataType = DataType.UNKNOWN) -> DataType:
+    """
+    Return the narrowest type covering both `current` and `new`.
+
+    NULL is absorbed by any other type; callers record the element as
+    nullable instead.
+
+    Args:
+        current: Type inferred so far
+        new: Type of the value being folded in
+        fallback: Type used when the two are incompatible
+
+    Returns:
+        The widened data type
+    """
+    if current == new:
+        return current
+    if current == DataType.UNKNOWN or new == DataType.UNKNOWN:
+        return DataType.UNKNOWN
+    if current == DataType.NULL:
+        return new
+    if new == DataType.NULL:
+        return current
+    if current in NUMERIC_TYPES and new in NUMERIC_TYPES:
+        return DataType.FLOAT
+    if current in STRING_TYPES and new in STRING_TYPES:
+        return DataType.STRING
+    return fallback
+
+
+class SchemaAccumulator:
+    """
+    Folds every observed value into one merged SchemaElement per position.
+
+    Each value costs O(1) on top of visiting it: its type is widened into
+    the element and a few counters are bumped. Required flags and occurrence
+    counts are derived from those counters once, in finalize().
+
+    With a sample size, arrays longer than the sample only fold a uniform
+    random sample of their items, which caps the inference work per array.
+    """
+
+    def __init__(self, sample_size: Optional[int] = None, seed: Optional[int] = None):
+        if sample_size is not None and sample_size < 1:
+            raise ValueError("Sample size must be at least 1")
+
+        self.sample_size = sample_size
+        self.random = random.Random(seed)
+
+        # Counters keyed by id() of the elements of the tree being built
+        self._values: Dict[int, int] = {}
+        self._instances: Dict[int, int] = {}
+        self._presence: Dict[int, Dict[str, List[int]]] = {}
+        self._attributes: Dict[int, Dict[str, int]] = {}
+
+    def add(self, element: SchemaElement) -> SchemaElement:
+        """Register a newly created element holding its first value."""
+        self._values[id(element)] = 1
+        return element
+
+    def fold(self, element: SchemaElement, data_type: DataType, value: Any = None,
+             fallback: DataType = DataType.UNKNOWN) -> None:
+        """
+        Fold another value at the position of `element` into it.
+
+        Args:
+            element: Merged element for the position
+            data_type: Type of the new value
+            value: The value itself, kept as an example for primitive types
+            fallback: Type used when the types are incompatible
+        """
+        key = id(element)
+        self._values[key] = self._values.get(key, 0) + 1
+
+        if data_type != element.data_type:
+            if DataType.NULL in (data_type, element.data_type):
+                element.nullable = True
+            element.data_type = widen_data_type(element.data_type, data_type, fallback)
+
+        if value is not None and data_type in EXAMPLE_TYPES:
+            examples = element.examples
+            if len(examples) < MAX_EXAMPLES and value not in examples:
+                examples.append(value)
+
+    def count_values(self, element: SchemaElement, count: int) -> None:
+        """Count values at the position of `element` that were not folded in."""
+        key = id(element)
+        self._values[key] = self._values.get(key, 0) + count
+
+    def add_instance(self, element: SchemaElement) -> None:
+        """Count one object (or XML element) instance folded into `element`."""
+        key = id(element)
+        self._instances[key] = self._instances.get(key, 0) + 1
+
+    def mark_present(self, element: SchemaElement, name: str, count: int = 1) -> None:
+        """Record that one instance of `element` contained property `name` `count` times."""
+        presence = self._presence.get(id(element))
+        if presence is None:
+            presence = self._presence[id(element)] = {}
+
+        entry = presence.get(name)
+        if entry is None:
+            presence[name] = [1, count]
+        else:
+            entry[0] += 1
+            if count > entry[1]:
+                entry[1] = count
+
+    def mark_attribute(self, element: SchemaElement, name: str) -> None:
+        """Record that one instance of `element` carried attribute `name`."""
+        attributes = self._attributes.get(id(element))
+        if attributes is None:
+            attributes = self._attributes[id(element)] = {}
+        attributes[name] = attributes.get(name, 0) + 1
+
+    def sample_indices(self, length: int) -> Optional[Set[int]]:
+        """
+        Choose which items of an in-memory array to fold.
+
+        Returns:
+            Set of item indices, or None when every item should be folded
+        """
+        if self.sample_size is None or length <= self.sample_size:
+            return None
+        return set(self.random.sample(range(length), self.sample_size))
+
+    def reservoir_slot(self, seen: int) -> Optional[int]:
+        """
+        Reservoir sampling (Algorithm R) for arrays of unknown length.
+
+        Args:
+            seen: Number of items seen before this one
+
+        Returns:
+            Reservoir slot the item should be stored in, or None to drop it
+        """
+        if seen < self.sample_size:
+            return seen
+        slot = self.random.randrange(seen + 1)
+        return slot if slot < self.sample_size else None
+
+    def finalize(self, root: SchemaElement, wrap_repeated: bool = False) -> None:
+        """
+        Set required flags and occurrence counts on the merged tree.
+
+        A property or attribute is required when it was present in every
+        instance of its parent. Arrays report the number of items folded.
+
+        Args:
+            root: Root of the merged tree
+            wrap_repeated: Replace properties that occurred more than once in
+                an instance with an array of that property (XML siblings)
+        """
+        stack = [root]
+        while stack:
+            element = stack.pop()
+            key = id(element)
+
+            if element.array_type is not None:
+                element.occurrences = self._values.get(id(element.array_type), element.occurrences)
+                stack.append(element.array_type)
+            else:
+                element.occurrences = self._values.get(key, element.occurrences)
+
+            instances = self._instances.get(key, 0)
+            presence = self._presence.get(key, {})
+            for name, prop in list(element.properties.items()):
+                seen, max_count = presence.get(name, (0, 0))
+                prop.required = instances > 0 and seen >= instances
+                stack.append(prop)
+
+                if wrap_repeated and max_count > 1:
+                    element.properties[name] = SchemaElement.trusted(
+                        name=name,
+                        data_type=DataType.ARRAY,
+                        required=prop.required,
+                        array_type=prop,
+                        occurrences=self._values.get(id(prop), 1)
+                    )
+                    prop.required = False
+
+            attribute_presence = self._attributes.get(key, {})
+            for name, attribute in element.attributes.items():
+                attribute.required = instances > 0 and attribute_presence.get(name, 0) >= instances
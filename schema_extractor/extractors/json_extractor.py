@@ -3,18 +3,64 @@ JSON Schema Extractor - Extracts schema information from JSON files.
 """
 
 import os
-import json
 import re
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Iterator, Tuple
 from collections import defaultdict
+from multiprocessing import Pool
 
-from ..models.schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNode
+from ..models.schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNode, DataNodeTable
+from ..models.query import NodeQuery
+from ..utils.helpers import _load_record, gc_paused, loads_json
+from ..utils.mapped import MappedFile, map_input
+from ..parsers.json_events import iter_json_events, JSONValueBuilder
+from .inference import SchemaAccumulator
+from .merge import merge_schemas, SchemaReducer
+
+
+# Non-string JSON types mapped directly from the Python type
+_PARSED_TYPES = {
+    type(None): DataType.NULL,
+    bool: DataType.BOOLEAN,
+    int: DataType.INTEGER,
+    float: DataType.FLOAT,
+    list: DataType.ARRAY,
+    dict: DataType.OBJECT,
+}
+
+_CONTAINER_TYPES = (DataType.OBJECT, DataType.ARRAY)
+
+# Stack marker for the items left out of a sampled array
+_SKIPPED_ITEMS = object()
+
+# Smallest byte range a JSON Lines file is split into for parallel extraction
+JSONL_MIN_CHUNK = 1 << 20
+
+
+class _StreamFrame:
+    """Open object or array on the streaming parse stack."""
+    __slots__ = ("element", "is_object", "key", "count", "reservoir")
+
+    def __init__(self, element: Optional[SchemaElement], is_object: bool, sampled: bool = False):
+        self.element = element  # None when the container is not being inferred
+        self.is_object = is_object
+        self.key = None
+        self.count = 0  # Items seen by a sampled array
+        self.reservoir = [] if sampled else None
 
 
 class JSONExtractor:
     """Extracts schema information from JSON files."""
     
-    def __init__(self):
+    def __init__(self, array_sample_size: Optional[int] = None, sample_seed: Optional[int] = None):
+        """
+        Args:
+            array_sample_size: Fold at most this many randomly sampled items
+                of each array into the schema (None folds every item)
+            sample_seed: Seed for the sampling, for reproducible schemas
+        """
+        self.array_sample_size = array_sample_size
+        self.sample_seed = sample_seed
+        self.accumulator = SchemaAccumulator(array_sample_size, sample_seed)
         self.property_counts = defaultdict(int)
         self.data_type_patterns = {
             DataType.INTEGER: re.compile(r'^-?\d+$'),
@@ -24,12 +70,17 @@ class JSONExtractor:
             DataType.DATETIME: re.compile(r'^\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}'),
         }
     
-    def extract(self, file_path: str) -> Schema:
+    def extract(self, file_path: str, streaming: bool = False, mapped: Optional[MappedFile] = None) -> Schema:
         """
         Extract schema from a JSON file.
         
         Args:
             file_path: Path to the JSON file
+            streaming: Parse the file incrementally instead of loading it,
+                keeping memory bounded by document depth. Data nodes are
+                counted but not collected in this mode.
+            mapped: Mapping of the file to read from, when the caller
+                already holds one
             
         Returns:
             Schema object containing the extracted JSON schema
@@ -37,9 +88,12 @@ class JSONExtractor:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"JSON file not found: {file_path}")
         
-        # Read and parse JSON
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if streaming:
+            return self._extract_streaming(file_path, mapped)
+        
+        # Decode and parse JSON straight from the mapping
+        with map_input(file_path, mapped) as source:
+            data = loads_json(source.text())
         
         # Reset counters
         self.property_counts.clear()
@@ -52,57 +106,239 @@ class JSONExtractor:
             created_at=self._get_creation_time(file_path)
         )
         
-        # Extract root element schema
-        root_element = self._extract_element_schema(data, "root")
+        # Infer schema, collect data nodes and measure depth in one pass
+        data_nodes = DataNodeTable()
+        with gc_paused():
+            root_element, max_depth = self._traverse(data, data_nodes)
         schema.root_element = root_element
-        
-        # Extract data nodes
-        schema.data_nodes = self._extract_data_nodes(data, "root")
-        schema.total_data_nodes = len(schema.data_nodes)
+        schema.data_nodes = data_nodes
+        schema.total_data_nodes = len(data_nodes)
         
         # Calculate statistics
         schema.total_elements = len(self.property_counts)
-        schema.max_depth = self._calculate_max_depth(data)
+        schema.max_depth = max_depth
         
         return schema
     
-    def _extract_element_schema(self, data: Any, name: str, depth: int = 0) -> SchemaElement:
-        """Extract schema information from a JSON element."""
-        data_type = self._determine_data_type(data)
+    def _extract_streaming(self, file_path: str, mapped: Optional[MappedFile] = None) -> Schema:
+        """Extract schema from a JSON file in a single streaming pass."""
+        schema_name = os.path.splitext(os.path.basename(file_path))[0]
+        schema = Schema(
+            name=schema_name,
+            file_type="json",
+            created_at=self._get_creation_time(file_path)
+        )
+        
+        with map_input(file_path, mapped) as source:
+            self._extract_schema_from_events(iter_json_events(source.text_reader()), schema)
+        
+        return schema
+    
+    def extract_jsonl(self, file_path: str, workers: int = 1, mapped: Optional[MappedFile] = None) -> Schema:
+        """
+        Extract schema from a JSON Lines (newline-delimited JSON) file.
+        
+        Every non-blank line holds one record. All records are folded into
+        one root element: its properties are the union of the record keys, a
+        property is required when every record has it, and occurrence counts
+        are kept per property. Lines are parsed one at a time, so memory is
+        bounded by the largest record; data nodes are counted, not collected.
+        
+        Args:
+            file_path: Path to the JSON Lines file
+            workers: Number of processes; with more than one the file is
+                split into byte ranges on line boundaries that are extracted
+                in parallel and merged (examples and property order may then
+                differ from a single-process run)
+            mapped: Mapping of the file to read from, when the caller
+                already holds one; workers map the file themselves
+            
+        Returns:
+            Schema object whose root element describes one record
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"JSONL file not found: {file_path}")
+        
+        with map_input(file_path, mapped) as source:
+            ranges = source.line_ranges(workers * 4, JSONL_MIN_CHUNK) if workers > 1 else [(0, source.size)]
+            if len(ranges) == 1:
+                schema = self._extract_jsonl_range(source, *ranges[0])
+        
+        if len(ranges) > 1:
+            reducer = SchemaReducer()
+            tasks = [(file_path, start, end, self.array_sample_size, self.sample_seed) for start, end in ranges]
+            with Pool(min(workers, len(ranges))) as pool:
+                for part in pool.imap_unordered(_extract_jsonl_range, tasks):
+                    reducer.add(part, owned=True)
+            schema = reducer.result()
+        
+        schema.name = os.path.splitext(os.path.basename(file_path))[0]
+        schema.created_at = self._get_creation_time(file_path)
+        return schema
+    
+    def _extract_jsonl_range(self, source: MappedFile, start: int, end: int) -> Schema:
+        """Fold the records of the lines starting in [start, end) into a schema."""
+        self.property_counts.clear()
+        self.accumulator = SchemaAccumulator(self.array_sample_size, self.sample_seed)
+        
+        root_element = None
+        max_depth = 0
+        total_nodes = 0
+        with gc_paused():
+            for line_start, line in source.iter_lines(start, end):
+                if line.isspace():
+                    continue
+                
+                try:
+                    record = _load_record(line)
+                except ValueError as e:
+                    raise ValueError(f"Invalid JSON record at byte {line_start} of {source.file_path}: {e}") from e
+                
+                root_element, depth, visited = self._visit(record, "root", "root", 0, -1, None, root_element)
+                total_nodes += visited
+                if depth > max_depth:
+                    max_depth = depth
+        
+        if root_element is not None:
+            self.accumulator.finalize(root_element)
+        
+        schema = Schema(name="jsonl_schema", file_type="jsonl")
+        schema.root_element = root_element
+        schema.total_data_nodes = total_nodes
+        schema.total_elements = len(self.property_counts)
+        schema.max_depth = max_depth
+        return schema
+    
+    def _extract_schema_from_events(self, events: Iterator[Tuple[str, Any]], schema: Schema) -> None:
+        """
+        Build the root element and statistics of a schema from parse events.
+        
+        Only the open containers are kept on the stack, so memory grows with
+        document depth rather than document size. Array items are folded
+        into one merged item element as they arrive; when sampling, each
+        array keeps a reservoir of items that is folded on end_array.
+        
+        Args:
+            events: (event, value) tuples as produced by iter_json_events
+            schema: Schema to populate
+        """
+        self.property_counts.clear()
+        accumulator = self.accumulator = SchemaAccumulator(self.array_sample_size, self.sample_seed)
+        sampling = accumulator.sample_size is not None
+        
+        root_element = None
+        stack: List[_StreamFrame] = []
+        max_depth = 0
+        total_nodes = 0
+        capture = None  # Builder for the sampled array item being read
+        capture_frame = None
+        
+        for event, value in events:
+            if capture is not None and capture.feed(event, value):
+                self._keep_sample(capture_frame, capture.value)
+                capture = None
+            
+            if event == 'map_key':
+                stack[-1].key = value
+                continue
+            
+            if event == 'end_map' or event == 'end_array':
+                frame = stack.pop()
+                if frame.reservoir is not None:
+                    self._fold_samples(frame)
+                continue
+            
+            # Every other event starts a value
+            depth = len(stack)
+            total_nodes += 1
+            if depth > max_depth:
+                max_depth = depth
+            
+            if event == 'start_map':
+                data_type = DataType.OBJECT
+            elif event == 'start_array':
+                data_type = DataType.ARRAY
+            else:
+                data_type = self._determine_data_type(value)
+            
+            element = None
+            if not stack:
+                element = root_element = self._fold_value(None, value, data_type, "root")
+            else:
+                parent = stack[-1]
+                if parent.element is None:
+                    # Inside an item that is captured or left out by sampling
+                    pass
+                elif parent.is_object:
+                    key = parent.key
+                    element = self._fold_value(parent.element.properties.get(key), value, data_type, key)
+                    parent.element.properties[key] = element
+                    self.property_counts[key] += 1
+                    accumulator.mark_present(parent.element, key)
+                elif parent.reservoir is not None:
+                    capture = JSONValueBuilder()
+                    capture_frame = parent
+                    if capture.feed(event, value):
+                        self._keep_sample(parent, capture.value)
+                        capture = None
+                else:
+                    element = self._fold_value(parent.element.array_type, value, data_type, "item")
+                    parent.element.array_type = element
+            
+            if event == 'start_map' or event == 'start_array':
+                if element is not None and event == 'start_map':
+                    accumulator.add_instance(element)
+                sampled = sampling and element is not None and event == 'start_array'
+                stack.append(_StreamFrame(element, event == 'start_map', sampled))
+        
+        if root_element is not None:
+            accumulator.finalize(root_element)
         
-        # Create schema element
-        schema_element = SchemaElement(
+        schema.root_element = root_element
+        schema.total_data_nodes = total_nodes
+        schema.total_elements = len(self.property_counts)
+        schema.max_depth = max_depth
+    
+    def _keep_sample(self, frame: _StreamFrame, item: Any) -> None:
+        """Offer a completed array item to the reservoir of its array."""
+        slot = self.accumulator.reservoir_slot(frame.count)
+        frame.count += 1
+        if slot is None:
+            return
+        if slot == len(frame.reservoir):
+            frame.reservoir.append(item)
+        else:
+            frame.reservoir[slot] = item
+    
+    def _fold_samples(self, frame: _StreamFrame) -> None:
+        """Fold the sampled items of a finished array into its item element."""
+        schema_element = frame.element
+        for item in frame.reservoir:
+            schema_element.array_type, _, _ = self._visit(item, "item", "item", 0, -1, None, schema_element.array_type)
+        
+        skipped = frame.count - len(frame.reservoir)
+        if skipped:
+            self.accumulator.count_values(schema_element.array_type, skipped)
+    
+    def _fold_value(self, schema_element: Optional[SchemaElement], data: Any, data_type: DataType, name: str) -> SchemaElement:
+        """Fold a value into the merged element for its position, creating it on first sight."""
+        if schema_element is None:
+            return self.accumulator.add(self._new_element(data, data_type, name))
+        
+        self.accumulator.fold(schema_element, data_type, data)
+        if data_type == DataType.NULL:
+            schema_element.description = f"Property: {name} (nullable)"
+        return schema_element
+    
+    def _new_element(self, data: Any, data_type: DataType, name: str) -> SchemaElement:
+        """Create the schema element for a single value, without its children."""
+        schema_element = SchemaElement.trusted(
             name=name,
             data_type=data_type,
             description=f"Property: {name}"
         )
         
-        if data_type == DataType.OBJECT:
-            # Process object properties
-            if isinstance(data, dict):
-                for prop_name, prop_value in data.items():
-                    self.property_counts[prop_name] += 1
-                    prop_schema = self._extract_element_schema(prop_value, prop_name, depth + 1)
-                    schema_element.properties[prop_name] = prop_schema
-        
-        elif data_type == DataType.ARRAY:
-            # Process array elements
-            if isinstance(data, list) and data:
-                # Analyze first element to determine array type
-                first_element = data[0]
-                array_type_schema = self._extract_element_schema(first_element, "item", depth + 1)
-                schema_element.array_type = array_type_schema
-                schema_element.occurrences = len(data)
-                
-                # Check if all elements are of the same type
-                for item in data[1:]:
-                    item_type = self._determine_data_type(item)
-                    if item_type != array_type_schema.data_type:
-                        # Mixed types - update to more general type
-                        array_type_schema.data_type = DataType.UNKNOWN
-                        break
-        
-        elif data_type in [DataType.STRING, DataType.INTEGER, DataType.FLOAT, DataType.BOOLEAN]:
+        if data_type in [DataType.STRING, DataType.INTEGER, DataType.FLOAT, DataType.BOOLEAN]:
             # Store example values for primitive types
             schema_element.examples = [data]
         
@@ -112,8 +348,282 @@ class JSONExtractor:
         
         return schema_element
     
+    def _traverse(self, data: Any, data_nodes: Optional[DataNodeTable] = None) -> Tuple[SchemaElement, int]:
+        """
+        Infer the schema, collect data nodes and measure depth in one traversal.
+        
+        Args:
+            data: Parsed JSON document
+            data_nodes: Table to append data nodes to, or None to skip them
+            
+        Returns:
+            Tuple of (root schema element, maximum depth)
+        """
+        self.accumulator = SchemaAccumulator(self.array_sample_size, self.sample_seed)
+        root_element, max_depth, _ = self._visit(data, "root", "root", 0, -1, data_nodes)
+        self.accumulator.finalize(root_element)
+        return root_element, max_depth
+    
+    def _visit(self, data: Any, name: str, path: str, depth: int, parent: int,
+               data_nodes: Optional[DataNodeTable], schema_element: Optional[SchemaElement] = None,
+               build: bool = True) -> Tuple[Optional[SchemaElement], int, int]:
+        """
+        Visit a JSON value and its children.
+        
+        Values are visited in document order from an explicit stack, so
+        nesting depth is not limited by the interpreter's recursion limit.
+        
+        Args:
+            data: JSON value to visit
+            name: Schema element name for the value
+            path: Data node path of the value
+            depth: Current depth level
+            parent: Row of the parent node in `data_nodes`, -1 for the root
+            data_nodes: Table to append data nodes to, or None to skip them
+            schema_element: Merged element to fold the value into, or None
+                to create one
+            build: Whether to infer the schema; array items left out by
+                sampling are only visited for data nodes and depth
+            
+        Returns:
+            Tuple of (schema element or None, maximum depth below the value,
+            number of values visited)
+        """
+        accumulator = self.accumulator
+        property_counts = self.property_counts
+        max_depth = depth
+        visited = 0
+        
+        # Frames are (value, name, path segment, extends parent path, document root,
+        # depth, parent row, owner, key, build), where the value is folded into
+        # owner.properties[key], or owner.array_type when key is None. The starting
+        # value has no owner. A _SKIPPED_ITEMS frame counts the items of a sampled
+        # array once all of them have been visited. Only path segments are built;
+        # the data node table renders full paths on demand.
+        stack = [(data, name, path, False, parent == -1, depth, parent, None, None, build)]
+        while stack:
+            data, name, segment, extends, bare, depth, parent, owner, key, build = stack.pop()
+            if data is _SKIPPED_ITEMS:
+                accumulator.count_values(owner.array_type, key)
+                continue
+            
+            data_type = self._determine_data_type(data)
+            visited += 1
+            if depth > max_depth:
+                max_depth = depth
+            
+            element = None
+            if build:
+                if owner is None:
+                    element = schema_element = self._fold_value(schema_element, data, data_type, name)
+                elif key is None:
+                    element = owner.array_type = self._fold_value(owner.array_type, data, data_type, name)
+                else:
+                    properties = owner.properties
+                    element = properties[key] = self._fold_value(properties.get(key), data, data_type, name)
+                    property_counts[key] += 1
+                    accumulator.mark_present(owner, key)
+            
+            row = -1
+            if data_nodes is not None:
+                row = data_nodes.append(
+                    segment, None, data, data_type, depth, parent,
+                    data_type not in _CONTAINER_TYPES, "Data node at path: {path}", extends
+                )
+            
+            if data_type == DataType.OBJECT:
+                if build:
+                    accumulator.add_instance(element)
+                # Children of the document root are addressed by their bare key
+                if bare:
+                    children = [
+                        (value, key, key, False, False, depth + 1, row, element, key, build)
+                        for key, value in data.items()
+                    ]
+                else:
+                    children = [
+                        (value, key, "." + key, True, False, depth + 1, row, element, key, build)
+                        for key, value in data.items()
+                    ]
+                children.reverse()
+                stack.extend(children)
+            
+            elif data_type == DataType.ARRAY:
+                sampled = accumulator.sample_indices(len(data)) if build else None
+                if sampled is not None:
+                    stack.append((_SKIPPED_ITEMS, None, None, False, False, 0, -1, element, len(data) - len(sampled), False))
+                for i in range(len(data) - 1, -1, -1):
+                    stack.append((
+                        data[i], "item", f"[{i}]", True, False, depth + 1, row, element, None,
+                        build and (sampled is None or i in sampled)
+                    ))
+        
+        return schema_element, max_depth, visited
+    
+    def _data_node(self, data: Any, data_type: DataType, path: str, depth: int,
+                   parent_path: Optional[str]) -> DataNode:
+        """Create the data node for a value at `path`."""
+        return DataNode.trusted(
+            path=path,
+            name=path.split('.')[-1] if '.' in path else path,
+            value=data,
+            data_type=data_type,
+            depth=depth,
+            parent_path=parent_path,
+            is_leaf=data_type not in [DataType.OBJECT, DataType.ARRAY],
+            description=f"Data node at path: {path}"
+        )
+    
+    def iter_nodes(self, file_path: str, streaming: bool = False,
+                   query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """
+        Yield the data nodes of a JSON file lazily, in document order.
+        
+        Args:
+            file_path: Path to the JSON file
+            streaming: Generate the nodes from parse events instead of
+                loading the document. Container nodes carry no value in
+                this mode, so memory stays bounded by document depth.
+            query: NodeQuery checked before each node is created; subtrees
+                it rules out are skipped (offset and limit are not applied)
+            
+        Yields:
+            DataNode objects, as collected by extract()
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"JSON file not found: {file_path}")
+        
+        if streaming:
+            with MappedFile(file_path) as source:
+                yield from self._iter_event_nodes(iter_json_events(source.text_reader()), query)
+            return
+        
+        with MappedFile(file_path) as source:
+            data = loads_json(source.text())
+        yield from self._iter_value_nodes(data, query=query)
+    
+    def iter_jsonl_nodes(self, file_path: str, query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """
+        Yield the data nodes of a JSON Lines file lazily, one record at a time.
+        
+        The file is treated as an array of its records: a container node
+        "root" (without a value) is followed by the nodes of each record,
+        rooted at "root[i]".
+        
+        Args:
+            file_path: Path to the JSON Lines file
+            query: NodeQuery checked before each node is created
+            
+        Yields:
+            DataNode objects in file order
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"JSONL file not found: {file_path}")
+        
+        if query is None or query.accepts("root", 0, DataType.ARRAY, False, None):
+            yield self._data_node(None, DataType.ARRAY, "root", 0, None)
+        if query is not None and not query.descends("root", 0):
+            return
+        with MappedFile(file_path) as source:
+            index = 0
+            for _, line in source.iter_lines():
+                if line.isspace():
+                    continue
+                yield from self._iter_value_nodes(_load_record(line), f"root[{index}]", 1, "root", query)
+                index += 1
+    
+    def _iter_value_nodes(self, data: Any, path: str = "root", depth: int = 0,
+                          parent_path: Optional[str] = None,
+                          query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """Yield the data nodes of a parsed JSON value in document order, as selected by a query."""
+        data_type = self._determine_data_type(data)
+        is_leaf = data_type not in _CONTAINER_TYPES
+        if query is None or query.accepts(path, depth, data_type, is_leaf, data):
+            yield self._data_node(data, data_type, path, depth, parent_path)
+        # Keys of the document root are not prefixed with its path
+        document_root = parent_path is None
+        if is_leaf or (query is not None and not query.descends(path, depth, not document_root)):
+            return
+        
+        # Stack of (children iterator, parent path, child depth)
+        stack = [(self._iter_children(data, path, document_root), path, depth + 1)]
+        while stack:
+            children, parent_path, depth = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+            
+            path, value = child
+            data_type = self._determine_data_type(value)
+            is_leaf = data_type not in _CONTAINER_TYPES
+            if query is None or query.accepts(path, depth, data_type, is_leaf, value):
+                yield self._data_node(value, data_type, path, depth, parent_path)
+            if not is_leaf and (query is None or query.descends(path, depth)):
+                stack.append((self._iter_children(value, path), path, depth + 1))
+    
+    def _iter_children(self, data: Any, path: str, document_root: bool = False) -> Iterator[Tuple[str, Any]]:
+        """Yield (path, value) for the children of an object or array."""
+        if isinstance(data, dict):
+            for key, value in data.items():
+                yield (key if document_root else f"{path}.{key}"), value
+        else:
+            for i, item in enumerate(data):
+                yield f"{path}[{i}]", item
+    
+    def _iter_event_nodes(self, events: Iterator[Tuple[str, Any]],
+                          query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """Yield data nodes from parse events as produced by iter_json_events, as selected by a query."""
+        # Open containers as [path, next array index]; None for objects
+        stack = []
+        key = None
+        
+        for event, value in events:
+            if event == 'map_key':
+                key = value
+                continue
+            
+            if event == 'end_map' or event == 'end_array':
+                stack.pop()
+                continue
+            
+            if event == 'start_map':
+                data_type = DataType.OBJECT
+                value = None
+            elif event == 'start_array':
+                data_type = DataType.ARRAY
+                value = None
+            else:
+                data_type = self._determine_data_type(value)
+            
+            if not stack:
+                path = "root"
+                parent_path = None
+            else:
+                parent = stack[-1]
+                parent_path = parent[0]
+                if parent[1] is None:
+                    # Keys of the document root, the only open container, are bare
+                    path = f"{parent_path}.{key}" if len(stack) > 1 else key
+                else:
+                    path = f"{parent_path}[{parent[1]}]"
+                    parent[1] += 1
+            
+            if query is None or query.accepts(path, len(stack), data_type, data_type not in _CONTAINER_TYPES, value):
+                yield self._data_node(value, data_type, path, len(stack), parent_path)
+            
+            if event == 'start_map':
+                stack.append([path, None])
+            elif event == 'start_array':
+                stack.append([path, 0])
+    
     def _determine_data_type(self, data: Any) -> DataType:
         """Determine the data type of a JSON value."""
+        # Fast path for the exact types produced by the JSON parser
+        data_type = _PARSED_TYPES.get(type(data))
+        if data_type is not None:
+            return data_type
+        
         if data is None:
             return DataType.NULL
         elif isinstance(data, bool):
@@ -134,7 +644,8 @@ class JSONExtractor:
     
     def _infer_string_type(self, value: str) -> DataType:
         """Infer more specific type for string values."""
-        if not value:
+        # Dates and datetimes always start with a digit
+        if not value or not value[0].isdigit():
             return DataType.STRING
         
         # Only convert dates and datetimes, keep everything else as strings
@@ -144,21 +655,6 @@ class JSONExtractor:
         
         return DataType.STRING
     
-    def _calculate_max_depth(self, data: Any, current_depth: int = 0) -> int:
-        """Calculate the maximum depth of the JSON structure."""
-        max_depth = current_depth
-        
-        if isinstance(data, dict):
-            for value in data.values():
-                child_depth = self._calculate_max_depth(value, current_depth + 1)
-                max_depth = max(max_depth, child_depth)
-        elif isinstance(data, list):
-            for item in data:
-                child_depth = self._calculate_max_depth(item, current_depth + 1)
-                max_depth = max(max_depth, child_depth)
-        
-        return max_depth
-    
     def _get_creation_time(self, file_path: str) -> str:
         """Get file creation time."""
         try:
@@ -179,7 +675,7 @@ class JSONExtractor:
             Schema object containing the extracted JSON schema
         """
         # Parse JSON string
-        data = json.loads(json_string)
+        data = loads_json(json_string)
         
         # Reset counters
         self.property_counts.clear()
@@ -191,12 +687,12 @@ class JSONExtractor:
         )
         
         # Extract root element schema
-        root_element = self._extract_element_schema(data, "root")
+        root_element, max_depth = self._traverse(data)
         schema.root_element = root_element
         
         # Calculate statistics
         schema.total_elements = len(self.property_counts)
-        schema.max_depth = self._calculate_max_depth(data)
+        schema.max_depth = max_depth
         
         return schema
     
@@ -210,107 +706,11 @@ class JSONExtractor:
         Returns:
             Merged schema
         """
-        if not schemas:
-            raise ValueError("No schemas provided for merging")
-        
-        if len(schemas) == 1:
-            return schemas[0]
-        
-        # Start with the first schema
-        merged_schema = schemas[0].model_copy()
-        merged_schema.name = "merged_schema"
-        
-        # Merge root elements
-        if merged_schema.root_element and all(s.root_element for s in schemas[1:]):
-            merged_root = self._merge_elements(
-                [s.root_element for s in schemas]
-            )
-            merged_schema.root_element = merged_root
-        
-        return merged_schema
-    
-    def _merge_elements(self, elements: List[SchemaElement]) -> SchemaElement:
-        """Merge multiple schema elements."""
-        if not elements:
-            raise ValueError("No elements provided for merging")
-        
-        if len(elements) == 1:
-            return elements[0]
-        
-        # Start with the first element
-        merged_element = elements[0].model_copy()
-        
-        # Merge properties
-        all_properties = {}
-        for element in elements:
-            for prop_name, prop_schema in element.properties.items():
-                if prop_name in all_properties:
-                    # Merge existing property
-                    all_properties[prop_name] = self._merge_elements([
-                        all_properties[prop_name], prop_schema
-                    ])
-                else:
-                    all_properties[prop_name] = prop_schema
-        
-        merged_element.properties = all_properties
-        
-        # Merge attributes
-        all_attributes = {}
-        for element in elements:
-            for attr_name, attr_schema in element.attributes.items():
-                if attr_name in all_attributes:
-                    # Merge existing attribute
-                    existing_attr = all_attributes[attr_name]
-                    existing_attr.required = existing_attr.required and attr_schema.required
-                    if attr_schema.default_value and not existing_attr.default_value:
-                        existing_attr.default_value = attr_schema.default_value
-                else:
-                    all_attributes[attr_name] = attr_schema
-        
-        merged_element.attributes = all_attributes
-        
-        return merged_element
+        return merge_schemas(schemas)
 
-    def _extract_data_nodes(self, data: Any, path: str, depth: int = 0, parent_path: Optional[str] = None) -> List[DataNode]:
-        """
-        Extract all data nodes from JSON data.
-        
-        Args:
-            data: JSON data to extract nodes from
-            path: Current path in the data structure
-            depth: Current depth level
-            parent_path: Path of the parent node
-            
-        Returns:
-            List of DataNode objects
-        """
-        nodes = []
-        data_type = self._determine_data_type(data)
-        
-        # Create node for current element
-        node = DataNode(
-            path=path,
-            name=path.split('.')[-1] if '.' in path else path,
-            value=data,
-            data_type=data_type,
-            depth=depth,
-            parent_path=parent_path,
-            is_leaf=data_type not in [DataType.OBJECT, DataType.ARRAY],
-            description=f"Data node at path: {path}"
-        )
-        nodes.append(node)
-        
-        # Process children based on data type
-        if data_type == DataType.OBJECT and isinstance(data, dict):
-            for key, value in data.items():
-                child_path = f"{path}.{key}" if path != "root" else key
-                child_nodes = self._extract_data_nodes(value, child_path, depth + 1, path)
-                nodes.extend(child_nodes)
-        
-        elif data_type == DataType.ARRAY and isinstance(data, list):
-            for i, item in enumerate(data):
-                child_path = f"{path}[{i}]"
-                child_nodes = self._extract_data_nodes(item, child_path, depth + 1, path)
-                nodes.extend(child_nodes)
-        
-        return nodes
+
+def _extract_jsonl_range(task: Tuple[str, int, int, Optional[int], Optional[int]]) -> Schema:
+    """Extract one byte range of a JSON Lines file in a worker process."""
+    file_path, start, end, array_sample_size, sample_seed = task
+    with MappedFile(file_path) as source:
+        return JSONExtractor(array_sample_size, sample_seed)._extract_jsonl_range(source, start, end)
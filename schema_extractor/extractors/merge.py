@@ -0,0 +1,430 @@
+"""
+Associative, commutative merging of extracted schemas.
+
+The kernel, merge_into(), folds one element tree into another that the
+caller owns, updating it in place. Owned trees are not shared with anything
+else, so their fields are written straight to __dict__, skipping pydantic's
+__setattr__ on the hot path.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..models.schema import Schema, SchemaElement, SchemaAttribute, DataType
+from .inference import MAX_EXAMPLES, widen_data_type
+
+
+def merge_into(target: SchemaElement, other: SchemaElement, xml: bool = False,
+               adopt: bool = False) -> SchemaElement:
+    """
+    Merge `other` into `target`, two elements describing the same position.
+
+    The merge is associative and commutative, so any number of elements can
+    be combined in any grouping and order with the same result:
+
+    - types are widened as during extraction, and null on either side makes
+      the element nullable
+    - a property or attribute is required only when both sides require it
+      (a property missing on one side is optional)
+    - occurrences add up
+    - examples keep the MAX_EXAMPLES smallest distinct values
+    - bounds are widened; a constraint missing on one side is dropped
+    - properties keep their order when both sides agree on it (or one side
+      has none) and are sorted by name otherwise
+
+    Args:
+        target: Element tree owned by the caller; it is modified and may be
+            replaced by the result
+        other: Element tree to merge in; only modified when adopted
+        xml: Merge with the XML rules: incompatible element types widen to
+            object, and a repeated element (an array of it) absorbs single
+            occurrences of it
+        adopt: Link subtrees of `other` into the result instead of copying
+            them, giving up `other`
+
+    Returns:
+        The merged element, owned by the caller
+    """
+    fallback = DataType.OBJECT if xml else DataType.UNKNOWN
+    result = {}
+    # (target, other, parent, key): the merged element is stored as parent[key],
+    # or as the parent's array_type when key is None
+    stack = [(target, other, result, "root")]
+    while stack:
+        target, other, parent, key = stack.pop()
+
+        if xml and (target.data_type == DataType.ARRAY) != (other.data_type == DataType.ARRAY):
+            if target.data_type == DataType.ARRAY and target.array_type is not None:
+                _merge_counts(target, other)
+                _store(parent, key, target)
+                stack.append((target.array_type, other, target, None))
+                continue
+            if other.array_type is not None:
+                repeated = other if adopt else copy_element(other.trusted_copy(array_type=None))
+                _merge_counts(repeated, target)
+                _store(parent, key, repeated)
+                stack.append((target, other.array_type, repeated, None))
+                continue
+
+        values = target.__dict__
+        if other.data_type != target.data_type:
+            if DataType.NULL in (target.data_type, other.data_type):
+                values["nullable"] = True
+            values["data_type"] = widen_data_type(target.data_type, other.data_type, fallback)
+        if other.nullable:
+            values["nullable"] = True
+        _merge_counts(target, other)
+        if other.description != target.description:
+            values["description"] = _pick(target.description, other.description)
+        if other.examples != target.examples:
+            values["examples"] = _merge_examples(target.examples, other.examples)
+        _merge_constraints(values, other)
+        if target.attributes or other.attributes:
+            values["attributes"] = merge_attributes(target.attributes, other.attributes)
+        _store(parent, key, target)
+
+        properties = target.properties
+        other_properties = other.properties
+        if other_properties or properties:
+            order = _merged_order(properties, other_properties)
+            if order != list(properties):
+                properties = values["properties"] = {name: properties.get(name) for name in order}
+            for name, other_prop in other_properties.items():
+                prop = properties[name]
+                if prop is None:
+                    prop = properties[name] = other_prop if adopt else copy_element(other_prop)
+                    prop.__dict__["required"] = False
+                else:
+                    stack.append((prop, other_prop, properties, name))
+            if len(properties) != len(other_properties):
+                for name, prop in properties.items():
+                    if name not in other_properties:
+                        prop.__dict__["required"] = False
+
+        if other.array_type is not None:
+            if target.array_type is None:
+                values["array_type"] = other.array_type if adopt else copy_element(other.array_type)
+            else:
+                stack.append((target.array_type, other.array_type, target, None))
+
+    return result["root"]
+
+
+def merge_elements(left: SchemaElement, right: SchemaElement, xml: bool = False) -> SchemaElement:
+    """
+    Merge two elements into a new tree, without modifying either.
+
+    See merge_into() for the merge rules.
+
+    Args:
+        left: First element
+        right: Second element
+        xml: Merge with the XML rules
+
+    Returns:
+        The merged element
+    """
+    return merge_into(copy_element(left), right, xml)
+
+
+def copy_element(element: SchemaElement) -> SchemaElement:
+    """
+    Copy an element tree without validation.
+
+    Elements and their property maps are copied; attribute maps and example
+    lists are shared, since merging replaces them rather than modifying them.
+    """
+    root = element.trusted_copy()
+    stack = [root]
+    while stack:
+        copy = stack.pop()
+        values = copy.__dict__
+        if copy.properties:
+            properties = values["properties"] = {name: prop.trusted_copy() for name, prop in copy.properties.items()}
+            stack.extend(properties.values())
+        else:
+            values["properties"] = {}
+        if copy.array_type is not None:
+            values["array_type"] = copy.array_type.trusted_copy()
+            stack.append(copy.array_type)
+    return root
+
+
+def merge_attributes(left: Dict[str, SchemaAttribute], right: Dict[str, SchemaAttribute]) -> Dict[str, SchemaAttribute]:
+    """
+    Merge two attribute maps with the same rules as merge_into().
+
+    Args:
+        left: First attributes by name
+        right: Second attributes by name
+
+    Returns:
+        A new map of the merged attributes by name; unchanged attributes are
+        shared with the inputs
+    """
+    merged = {}
+    for name in _merged_order(left, right):
+        left_attr = left.get(name)
+        right_attr = right.get(name)
+        if left_attr is None or right_attr is None:
+            attribute = right_attr if left_attr is None else left_attr
+            if attribute.required:
+                attribute = SchemaAttribute.trusted(
+                    name=attribute.name,
+                    data_type=attribute.data_type,
+                    default_value=attribute.default_value,
+                    description=attribute.description
+                )
+            merged[name] = attribute
+        else:
+            merged[name] = SchemaAttribute.trusted(
+                name=min(left_attr.name, right_attr.name),
+                data_type=widen_data_type(left_attr.data_type, right_attr.data_type, DataType.STRING),
+                required=left_attr.required and right_attr.required,
+                default_value=_pick(left_attr.default_value, right_attr.default_value),
+                description=_pick(left_attr.description, right_attr.description)
+            )
+    return merged
+
+
+def merge_schema_pair(left: Schema, right: Schema) -> Schema:
+    """
+    Merge two schemas into a new one, without modifying either.
+
+    Root elements are merged with merge_into(). Depths are maximized, data
+    node counts add up, and element and attribute totals are recounted on
+    the merged tree. The merged schema holds no data nodes.
+
+    Args:
+        left: First schema
+        right: Second schema
+
+    Returns:
+        The merged schema
+    """
+    merged = _copy_schema(left)
+    _merge_schema_into(merged, right, adopt=False)
+    _count_totals(merged)
+    return merged
+
+
+class SchemaReducer:
+    """
+    Merges a stream of schemas as a balanced binary tree.
+
+    Works like a binary counter: slot i holds the merge of 2**i schemas, so
+    at most log2(n) + 1 partial results are held at once. Since the merge is
+    associative and commutative, the result does not depend on the order in
+    which schemas are added.
+
+    Partial results are owned by the reducer and merged in place. Schemas
+    added with `owned=True` are taken over as well instead of being copied.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._slots: List[Optional[Tuple[Schema, bool]]] = []
+
+    def add(self, schema: Schema, owned: bool = False) -> None:
+        """
+        Merge another schema in.
+
+        Args:
+            schema: Schema to merge
+            owned: Hand the schema over to the reducer, which may then modify
+                it; it must not be used afterwards
+        """
+        self.count += 1
+        carry = (schema, owned)
+        for i, slot in enumerate(self._slots):
+            if slot is None:
+                self._slots[i] = carry
+                return
+            carry = _combine(slot, carry)
+            self._slots[i] = None
+        self._slots.append(carry)
+
+    def result(self) -> Schema:
+        """
+        Merge the partial results.
+
+        Returns:
+            The merged schema; a single schema is returned unchanged
+        """
+        merged = None
+        for slot in self._slots:
+            if slot is not None:
+                merged = slot if merged is None else _combine(slot, merged)
+        if merged is None:
+            raise ValueError("No schemas provided for merging")
+
+        if self.count > 1:
+            _count_totals(merged[0])
+        # Keep the result as the only partial, so more schemas can be added
+        self._slots = [None] * (len(self._slots) - 1) + [merged]
+        return merged[0]
+
+
+def merge_schemas(schemas: Iterable[Schema]) -> Schema:
+    """
+    Merge any number of schemas, holding O(log n) of them at once.
+
+    Args:
+        schemas: Schemas to merge; they are not modified
+
+    Returns:
+        The merged schema
+    """
+    reducer = SchemaReducer()
+    for schema in schemas:
+        reducer.add(schema)
+    return reducer.result()
+
+
+def _combine(left: Tuple[Schema, bool], right: Tuple[Schema, bool]) -> Tuple[Schema, bool]:
+    """Merge two (schema, owned) partial results into an owned one."""
+    (left_schema, left_owned), (right_schema, right_owned) = left, right
+    if left_owned:
+        _merge_schema_into(left_schema, right_schema, adopt=right_owned)
+        return left_schema, True
+    if right_owned:
+        _merge_schema_into(right_schema, left_schema, adopt=False)
+        return right_schema, True
+
+    merged = _copy_schema(left_schema)
+    _merge_schema_into(merged, right_schema, adopt=False)
+    return merged, True
+
+
+def _copy_schema(schema: Schema) -> Schema:
+    """Copy a schema, without its data nodes, as the owned target of a merge."""
+    copy = Schema(
+        name=schema.name,
+        file_type=schema.file_type,
+        created_at=schema.created_at
+    )
+    if schema.root_element is not None:
+        copy.root_element = copy_element(schema.root_element)
+    copy.elements = {name: copy_element(element) for name, element in schema.elements.items()}
+    copy.attributes = dict(schema.attributes)
+    copy.max_depth = schema.max_depth
+    copy.total_elements = schema.total_elements
+    copy.total_attributes = schema.total_attributes
+    copy.total_data_nodes = schema.total_data_nodes
+    return copy
+
+
+def _merge_schema_into(target: Schema, other: Schema, adopt: bool) -> None:
+    """Merge `other` into the owned schema `target`; totals are recounted separately."""
+    xml = target.file_type == other.file_type == "xml"
+    target.name = "merged_schema"
+    if target.file_type != other.file_type:
+        target.file_type = "mixed"
+    target.created_at = _pick(target.created_at, other.created_at)
+    target.data_nodes = []
+
+    if target.root_element is None:
+        if other.root_element is not None:
+            target.root_element = other.root_element if adopt else copy_element(other.root_element)
+    elif other.root_element is not None:
+        target.root_element = merge_into(target.root_element, other.root_element, xml, adopt)
+
+    if other.elements:
+        elements = {}
+        for name in _merged_order(target.elements, other.elements):
+            element = target.elements.get(name)
+            other_element = other.elements.get(name)
+            if element is not None and other_element is not None:
+                element = merge_into(element, other_element, xml, adopt)
+            else:
+                if element is None:
+                    element = other_element if adopt else copy_element(other_element)
+                element.__dict__["required"] = False
+            elements[name] = element
+        target.elements = elements
+    if target.attributes or other.attributes:
+        target.attributes = merge_attributes(target.attributes, other.attributes)
+
+    target.max_depth = max(target.max_depth, other.max_depth)
+    target.total_data_nodes += other.total_data_nodes
+
+
+def _count_totals(schema: Schema) -> None:
+    """Recount the distinct element and attribute names of a merged schema."""
+    if schema.root_element is None:
+        return
+    xml = schema.file_type == "xml"
+    root = schema.root_element
+    element_names = {root.name} if xml else set()
+    attribute_names = set()
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        for name, prop in element.properties.items():
+            # Skip the "text" property holding typed XML text content
+            if not (xml and name == "text" and prop.description is None and prop.array_type is None):
+                element_names.add(name)
+        attribute_names.update(element.attributes)
+        stack.extend(element.properties.values())
+        if element.array_type is not None:
+            stack.append(element.array_type)
+    schema.total_elements = len(element_names)
+    schema.total_attributes = len(attribute_names)
+
+
+def _store(parent: Any, key: Optional[str], element: SchemaElement) -> None:
+    """Link a merged element into its parent."""
+    if key is None:
+        parent.__dict__["array_type"] = element
+    else:
+        parent[key] = element
+
+
+def _merge_counts(target: SchemaElement, other: SchemaElement) -> None:
+    """Combine the required flags and occurrence counts of two elements into `target`."""
+    values = target.__dict__
+    values["required"] = target.required and other.required
+    values["occurrences"] = target.occurrences + other.occurrences
+
+
+def _pick(left: Optional[Any], right: Optional[Any]) -> Optional[Any]:
+    """Order-independent choice between two optional values."""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return max(left, right)
+
+
+def _merged_order(left: Dict[str, Any], right: Dict[str, Any]) -> List[str]:
+    """Keys of both maps: in their order when both agree on it (or one is empty), else sorted."""
+    if not right:
+        return list(left)
+    if not left:
+        return list(right)
+    left_keys = list(left)
+    if left_keys == list(right):
+        return left_keys
+    return sorted(left.keys() | right.keys())
+
+
+def _example_key(value: Any) -> Tuple[str, str]:
+    return (type(value).__name__, str(value))
+
+
+def _merge_examples(left: List[Any], right: List[Any]) -> List[Any]:
+    """The smallest distinct examples of two different lists, as a new list."""
+    examples = list(left)
+    examples.extend(value for value in right if value not in left)
+    examples.sort(key=_example_key)
+    return examples[:MAX_EXAMPLES]
+
+
+def _merge_constraints(values: Dict[str, Any], other: SchemaElement) -> None:
+    """Widen the value and length bounds; keep a pattern both sides share."""
+    for field, combine in (("min_value", min), ("max_value", max), ("min_length", min), ("max_length", max)):
+        current = values[field]
+        if current is not None:
+            new = other.__dict__[field]
+            values[field] = None if new is None else combine(current, new)
+    if values["pattern"] is not None and values["pattern"] != other.pattern:
+        values["pattern"] = None
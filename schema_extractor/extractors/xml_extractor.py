@@ -4,18 +4,49 @@ XML Schema Extractor - Extracts schema information from XML files.
 
 import os
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator
 from collections import defaultdict
 from lxml import etree
 import xmltodict
 
-from ..models.schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNode
+from ..models.schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNode, DataNodeTable
+from ..models.query import NodeQuery
+from ..utils.helpers import gc_paused
+from ..utils.mapped import MappedFile, map_input
+from .inference import SchemaAccumulator, widen_data_type
+
+
+# Stack marker for an element whose children have all been visited
+_FINISH = object()
+
+
+class _StreamFrame:
+    """Open element on the streaming parse stack."""
+    __slots__ = ("element", "new", "keep", "counts", "child_count", "reservoir")
+
+    def __init__(self, element: Optional[SchemaElement], new: bool, keep: bool, sampled: bool = False):
+        self.element = element  # None when the element is not being inferred
+        self.new = new  # True when the element was created by this occurrence
+        self.keep = keep  # True inside a subtree kept for sampling
+        self.counts = {}  # Child tag -> occurrences in this element
+        self.child_count = 0
+        self.reservoir = {} if sampled else None  # Child tag -> sampled subtrees
 
 
 class XMLExtractor:
     """Extracts schema information from XML files."""
     
-    def __init__(self):
+    def __init__(self, array_sample_size: Optional[int] = None, sample_seed: Optional[int] = None):
+        """
+        Args:
+            array_sample_size: Fold at most this many randomly sampled
+                occurrences of each repeated child tag into the schema
+                (None folds every occurrence)
+            sample_seed: Seed for the sampling, for reproducible schemas
+        """
+        self.array_sample_size = array_sample_size
+        self.sample_seed = sample_seed
+        self.accumulator = SchemaAccumulator(array_sample_size, sample_seed)
         self.element_counts = defaultdict(int)
         self.attribute_counts = defaultdict(int)
         self.data_type_patterns = {
@@ -26,12 +57,17 @@ class XMLExtractor:
             DataType.DATETIME: re.compile(r'^\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}'),
         }
     
-    def extract(self, file_path: str) -> Schema:
+    def extract(self, file_path: str, streaming: bool = False, mapped: Optional[MappedFile] = None) -> Schema:
         """
         Extract schema from an XML file.
         
         Args:
             file_path: Path to the XML file
+            streaming: Parse the file with iterparse, clearing processed
+                subtrees so memory stays flat. Data nodes are counted but
+                not collected in this mode.
+            mapped: Mapping of the file to read from, when the caller
+                already holds one
             
         Returns:
             Schema object containing the extracted XML schema
@@ -39,9 +75,13 @@ class XMLExtractor:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"XML file not found: {file_path}")
         
-        # Parse XML using lxml for structure analysis
-        tree = etree.parse(file_path)
-        root = tree.getroot()
+        if streaming:
+            return self._extract_streaming(file_path, mapped)
+        
+        # Parse XML using lxml for structure analysis; huge_tree raises
+        # libxml2's nesting limit from 256 to 2048 levels
+        with map_input(file_path, mapped) as source:
+            root = _parse_mapped(source)
         
         # Reset counters
         self.element_counts.clear()
@@ -55,86 +95,510 @@ class XMLExtractor:
             created_at=self._get_creation_time(file_path)
         )
         
-        # Extract root element schema
-        root_element = self._extract_element_schema(root)
+        # Infer schema, collect data nodes and measure depth in one pass
+        data_nodes = DataNodeTable()
+        with gc_paused():
+            root_element, max_depth = self._traverse(root, data_nodes)
         schema.root_element = root_element
-        
-        # Extract data nodes
-        schema.data_nodes = self._extract_data_nodes(root, root.tag)
-        schema.total_data_nodes = len(schema.data_nodes)
+        schema.data_nodes = data_nodes
+        schema.total_data_nodes = len(data_nodes)
         
         # Calculate statistics
         schema.total_elements = len(self.element_counts)
         schema.total_attributes = len(self.attribute_counts)
-        schema.max_depth = self._calculate_max_depth(root)
+        schema.max_depth = max_depth
         
         return schema
     
-    def _extract_element_schema(self, element: etree._Element, depth: int = 0) -> SchemaElement:
-        """Extract schema information from an XML element."""
+    def _extract_streaming(self, file_path: str, mapped: Optional[MappedFile] = None) -> Schema:
+        """Extract schema from an XML file in a single iterparse pass."""
+        schema_name = os.path.splitext(os.path.basename(file_path))[0]
+        schema = Schema(
+            name=schema_name,
+            file_type="xml",
+            created_at=self._get_creation_time(file_path)
+        )
+        
+        self._extract_schema_from_events(_iterparse(file_path, mapped), schema)
+        return schema
+    
+    def _extract_schema_from_events(self, events: Iterator[Tuple[str, etree._Element]], schema: Schema) -> None:
+        """
+        Build the root element and statistics of a schema from iterparse events.
+        
+        Elements are folded into the schema on start/end events and cleared
+        as soon as they end, so only the open elements are kept alive. When
+        sampling, child elements are kept as subtrees in a per-tag reservoir
+        and folded when their parent ends.
+        """
+        # Reset counters
+        self.element_counts.clear()
+        self.attribute_counts.clear()
+        accumulator = self.accumulator = SchemaAccumulator(self.array_sample_size, self.sample_seed)
+        sampling = accumulator.sample_size is not None
+        
+        root_element = None
+        stack: List[_StreamFrame] = []
+        max_depth = 0
+        total_nodes = 0
+        
+        for event, element in events:
+            if event == "start":
+                depth = len(stack)
+                if depth > max_depth:
+                    max_depth = depth
+                total_nodes += 1 + len(element.attrib)
+                
+                schema_element = None
+                new = False
+                keep = False
+                parent = stack[-1] if stack else None
+                
+                if parent is None:
+                    new = True
+                    schema_element = root_element = self._start_element_schema(None, element, self._attribute_types(element))
+                else:
+                    parent.child_count += 1
+                    if parent.element is not None:
+                        tag = element.tag
+                        parent.counts[tag] = parent.counts.get(tag, 0) + 1
+                        if parent.reservoir is not None:
+                            # Candidate for the reservoir, folded when the parent ends
+                            keep = True
+                        else:
+                            slot = parent.element.properties.get(tag)
+                            new = slot is None
+                            schema_element = self._start_element_schema(slot, element, self._attribute_types(element))
+                            parent.element.properties[tag] = schema_element
+                    else:
+                        keep = parent.keep
+                
+                stack.append(_StreamFrame(schema_element, new, keep, sampling and schema_element is not None))
+                continue
+            
+            frame = stack.pop()
+            text = element.text.strip() if element.text else ""
+            if text:
+                total_nodes += 1
+            
+            if frame.element is not None:
+                if frame.child_count:
+                    element_type = DataType.OBJECT
+                elif text:
+                    element_type = DataType.STRING
+                elif element.attrib:
+                    element_type = DataType.OBJECT
+                else:
+                    element_type = DataType.STRING
+                self._fold_element_type(frame.element, element_type, frame.new)
+                
+                if frame.reservoir is not None:
+                    self._fold_samples(frame)
+                for tag, count in frame.counts.items():
+                    accumulator.mark_present(frame.element, tag, count)
+                if text:
+                    self._fold_text(frame.element, text, self._determine_data_type(text))
+            
+            parent = stack[-1] if stack else None
+            if frame.keep:
+                if parent is None or parent.reservoir is None:
+                    # Part of a subtree that may still be sampled
+                    continue
+                reservoir = parent.reservoir.setdefault(element.tag, [])
+                slot = accumulator.reservoir_slot(parent.counts[element.tag] - 1)
+                if slot is not None:
+                    element.getparent().remove(element)
+                    if slot == len(reservoir):
+                        reservoir.append(element)
+                    else:
+                        reservoir[slot] = element
+                    continue
+            
+            # Release the finished subtree and any processed siblings
+            element.clear(keep_tail=True)
+            parent_element = element.getparent()
+            if parent_element is not None:  # The root's siblings are prolog comments and PIs
+                while element.getprevious() is not None:
+                    del parent_element[0]
+        
+        if root_element is not None:
+            self._finalize(root_element)
+        
+        schema.root_element = root_element
+        schema.total_data_nodes = total_nodes
+        schema.total_elements = len(self.element_counts)
+        schema.total_attributes = len(self.attribute_counts)
+        schema.max_depth = max_depth
+    
+    def extract_pieces(self, pieces: Iterable[bytes]) -> Schema:
+        """
+        Extract schema from an XML document given as consecutive byte pieces.
+        
+        The pieces are fed to a pull parser as they come, so a document can
+        be assembled from slices of a mapped file without joining them.
+        Data nodes are counted but not collected.
+        
+        Args:
+            pieces: Byte strings that concatenate to one XML document
+            
+        Returns:
+            Schema object containing the extracted XML schema
+        """
+        schema = Schema(name="xml_schema", file_type="xml")
+        self._extract_schema_from_events(_iterparse_pieces(pieces), schema)
+        return schema
+    
+    def _fold_samples(self, frame: _StreamFrame) -> None:
+        """Fold the sampled child subtrees of a finished element into its schema."""
+        properties = frame.element.properties
+        for tag, children in frame.reservoir.items():
+            slot = properties.get(tag)
+            for child in children:
+                slot, _ = self._visit(child, tag, 0, -1, None, slot)
+            properties[tag] = slot
+            
+            skipped = frame.counts[tag] - len(children)
+            if skipped:
+                self.accumulator.count_values(slot, skipped)
+    
+    def _attribute_types(self, element: etree._Element) -> List[Tuple[str, str, DataType]]:
+        """Return (name, value, data type) for each attribute of an element."""
+        return [
+            (attr_name, attr_value, self._determine_data_type(attr_value))
+            for attr_name, attr_value in element.attrib.items()
+        ]
+    
+    def _start_element_schema(self, schema_element: Optional[SchemaElement], element: etree._Element,
+                              attributes: List[Tuple[str, str, DataType]]) -> SchemaElement:
+        """
+        Fold an element's tag and attributes into the merged element for its position.
+        
+        Args:
+            schema_element: Merged element for the position, or None to create one
+            element: XML element being folded in
+            attributes: (name, value, data type) of the element's attributes
+            
+        Returns:
+            The merged schema element
+        """
         element_name = element.tag
         self.element_counts[element_name] += 1
         
-        # Determine data type
-        data_type = self._determine_element_type(element)
+        if schema_element is None:
+            schema_element = self.accumulator.add(SchemaElement.trusted(
+                name=element_name,
+                description=f"Element: {element_name}"
+            ))
+        self.accumulator.add_instance(schema_element)
+        
+        for attr_name, attr_value, attr_data_type in attributes:
+            attribute = schema_element.attributes.get(attr_name)
+            if attribute is None:
+                schema_element.attributes[attr_name] = SchemaAttribute.trusted(
+                    name=attr_name,
+                    data_type=attr_data_type,
+                    required=True,
+                    default_value=attr_value if attr_value else None
+                )
+            elif attribute.data_type != attr_data_type:
+                attribute.data_type = widen_data_type(attribute.data_type, attr_data_type, DataType.STRING)
+            self.accumulator.mark_attribute(schema_element, attr_name)
+            self.attribute_counts[attr_name] += 1
         
-        # Create schema element
-        schema_element = SchemaElement(
-            name=element_name,
-            data_type=data_type,
-            description=f"Element: {element_name}"
-        )
+        return schema_element
+    
+    def _fold_element_type(self, schema_element: SchemaElement, element_type: DataType, new: bool) -> None:
+        """Fold an element's type into its merged element; elements with children win."""
+        if new:
+            schema_element.data_type = element_type
+        else:
+            self.accumulator.fold(schema_element, element_type, fallback=DataType.OBJECT)
+    
+    def _fold_text(self, schema_element: SchemaElement, text: str, text_type: DataType) -> None:
+        """Fold an element's text into its "text" property, creating it on first text."""
+        text_element = schema_element.properties.get("text")
+        if text_element is not None:
+            self.accumulator.fold(text_element, text_type, text, fallback=DataType.STRING)
+        else:
+            schema_element.properties["text"] = self.accumulator.add(SchemaElement.trusted(
+                name="text",
+                data_type=text_type,
+                examples=[text]
+            ))
+    
+    def _finalize(self, root_element: SchemaElement) -> None:
+        """Finalize the merged tree and drop "text" properties that only saw plain strings."""
+        self.accumulator.finalize(root_element, wrap_repeated=True)
+        stack = [root_element]
+        while stack:
+            element = stack.pop()
+            text_element = element.properties.get("text")
+            if (text_element is not None and text_element.description is None
+                    and text_element.array_type is None and text_element.data_type == DataType.STRING):
+                del element.properties["text"]
+            stack.extend(element.properties.values())
+            if element.array_type is not None:
+                stack.append(element.array_type)
+    
+    def _traverse(self, root: etree._Element, data_nodes: Optional[DataNodeTable] = None) -> Tuple[SchemaElement, int]:
+        """
+        Infer the schema, collect data nodes and measure depth in one traversal.
         
-        # Extract attributes
-        for attr_name, attr_value in element.attrib.items():
-            attr_data_type = self._determine_data_type(attr_value)
-            schema_element.attributes[attr_name] = SchemaAttribute(
-                name=attr_name,
-                data_type=attr_data_type,
-                required=True,  # Assume required for now
-                default_value=attr_value if attr_value else None
-            )
-            self.attribute_counts[attr_name] += 1
+        Args:
+            root: Root element of the parsed document
+            data_nodes: Table to append data nodes to, or None to skip them
+            
+        Returns:
+            Tuple of (root schema element, maximum depth)
+        """
+        self.accumulator = SchemaAccumulator(self.array_sample_size, self.sample_seed)
+        root_element, max_depth = self._visit(root, root.tag, 0, -1, data_nodes)
+        self._finalize(root_element)
+        return root_element, max_depth
+    
+    def _visit(self, element: etree._Element, path: str, depth: int, parent: int,
+               data_nodes: Optional[DataNodeTable], schema_element: Optional[SchemaElement] = None,
+               build: bool = True) -> Tuple[Optional[SchemaElement], int]:
+        """
+        Visit an XML element and its children.
         
-        # Extract child elements
-        if data_type == DataType.OBJECT:
-            child_elements = defaultdict(list)
+        Elements are visited in document order from an explicit stack, so
+        nesting depth is not limited by the interpreter's recursion limit.
+        
+        Args:
+            element: XML element to visit
+            path: Data node path of the element
+            depth: Current depth level
+            parent: Row of the parent node in `data_nodes`, -1 for the root
+            data_nodes: Table to append data nodes to, or None to skip them
+            schema_element: Merged element to fold the element into, or None
+                to create one
+            build: Whether to infer the schema; occurrences left out by
+                sampling are only visited for data nodes and depth
             
-            for child in element:
-                child_elements[child.tag].append(child)
+        Returns:
+            Tuple of (schema element or None, maximum depth below the element)
+        """
+        accumulator = self.accumulator
+        max_depth = depth
+        
+        # Frames are (element, path segment, depth, parent row, owner, build), where
+        # the element is folded into owner.properties[tag]; the starting element
+        # has no owner and its segment is its full path. A _FINISH frame completes
+        # an element once its children are done. Only path segments are built; the
+        # data node table renders full paths on demand.
+        stack = [(element, path, depth, parent, None, build)]
+        while stack:
+            frame = stack.pop()
+            if frame[0] is _FINISH:
+                _, finished, counts, sampled, text, text_type = frame
+                for tag, count in counts.items():
+                    accumulator.mark_present(finished, tag, count)
+                    if sampled is not None and tag in sampled:
+                        accumulator.count_values(finished.properties[tag], count - len(sampled[tag]))
+                if text:
+                    self._fold_text(finished, text, text_type)
+                continue
             
-            # Process child elements
-            for child_name, children in child_elements.items():
-                if len(children) == 1:
-                    # Single child element
-                    child_schema = self._extract_element_schema(children[0], depth + 1)
-                    schema_element.properties[child_name] = child_schema
+            element, segment, depth, parent, owner, build = frame
+            if depth > max_depth:
+                max_depth = depth
+            element_type = self._determine_element_type(element)
+            text = element.text.strip() if element.text else ""
+            text_type = self._determine_data_type(text) if text else None
+            attributes = self._attribute_types(element)
+            
+            current = None
+            if build:
+                slot = schema_element if owner is None else owner.properties.get(element.tag)
+                current = self._start_element_schema(slot, element, attributes)
+                self._fold_element_type(current, element_type, slot is None)
+                if owner is None:
+                    schema_element = current
                 else:
-                    # Multiple children with same name - treat as array
-                    child_schema = self._extract_element_schema(children[0], depth + 1)
-                    array_element = SchemaElement(
-                        name=child_name,
-                        data_type=DataType.ARRAY,
-                        array_type=child_schema,
-                        occurrences=len(children)
+                    owner.properties[element.tag] = current
+            
+            row = -1
+            if data_nodes is not None:
+                row = data_nodes.append(
+                    segment, element.tag, text if text else None, element_type, depth, parent,
+                    len(element) == 0 and not text, "XML element: {name}"
+                )
+                for attr_name, attr_value, attr_data_type in attributes:
+                    data_nodes.append(
+                        "@" + attr_name, attr_name, attr_value, attr_data_type, depth + 1, row,
+                        True, "Attribute: {name}"
+                    )
+                if text:
+                    data_nodes.append(
+                        "#text", "text", text, text_type, depth + 1, row, True, "Text content of {parent_name}"
                     )
-                    schema_element.properties[child_name] = array_element
+            
+            children = []
+            if build:
+                counts = {}
+                sampled = self._sample_children(element) if accumulator.sample_size else None
+                for child in element:
+                    tag = child.tag
+                    index = counts.get(tag, 0)
+                    counts[tag] = index + 1
+                    fold = sampled is None or tag not in sampled or index in sampled[tag]
+                    children.append((child, "." + tag, depth + 1, row, current if fold else None, fold))
+                stack.append((_FINISH, current, counts, sampled, text, text_type))
+            else:
+                for child in element:
+                    children.append((child, "." + child.tag, depth + 1, row, None, False))
+            children.reverse()
+            stack.extend(children)
+        
+        return schema_element, max_depth
+    
+    def _element_data_nodes(self, element: etree._Element, path: str, depth: int, parent_path: Optional[str],
+                            element_type: DataType, text: str, text_type: Optional[DataType],
+                            attributes: List[Tuple[str, str, DataType]],
+                            query: Optional[NodeQuery] = None) -> List[DataNode]:
+        """Create the data nodes for an element, its attributes and its text, as selected by a query."""
+        nodes = []
+        value = text if text else None
+        is_leaf = len(element) == 0 and not text
+        if query is None or query.accepts(path, depth, element_type, is_leaf, value):
+            nodes.append(DataNode.trusted(
+                path=path,
+                name=element.tag,
+                value=value,
+                data_type=element_type,
+                depth=depth,
+                parent_path=parent_path,
+                is_leaf=is_leaf,
+                description=f"XML element: {element.tag}"
+            ))
+        
+        for attr_name, attr_value, attr_data_type in attributes:
+            attr_path = f"{path}@{attr_name}"
+            if query is not None and not query.accepts(attr_path, depth + 1, attr_data_type, True, attr_value):
+                continue
+            nodes.append(DataNode.trusted(
+                path=attr_path,
+                name=attr_name,
+                value=attr_value,
+                data_type=attr_data_type,
+                depth=depth + 1,
+                parent_path=path,
+                is_leaf=True,
+                description=f"Attribute: {attr_name}"
+            ))
         
-        # Extract text content if present
-        if element.text and element.text.strip():
-            text_content = element.text.strip()
-            data_type = self._determine_data_type(text_content)
+        if text and (query is None or query.accepts(f"{path}#text", depth + 1, text_type, True, text)):
+            nodes.append(DataNode.trusted(
+                path=f"{path}#text",
+                name="text",
+                value=text,
+                data_type=text_type,
+                depth=depth + 1,
+                parent_path=path,
+                is_leaf=True,
+                description=f"Text content of {element.tag}"
+            ))
+        
+        return nodes
+    
+    def _element_nodes(self, element: etree._Element, path: str, depth: int,
+                       parent_path: Optional[str], query: Optional[NodeQuery] = None) -> List[DataNode]:
+        """Create the data nodes for an element whose text has been parsed."""
+        text = element.text.strip() if element.text else ""
+        return self._element_data_nodes(
+            element, path, depth, parent_path, self._determine_element_type(element),
+            text, self._determine_data_type(text) if text else None, self._attribute_types(element), query
+        )
+    
+    def iter_nodes(self, file_path: str, streaming: bool = False,
+                   query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """
+        Yield the data nodes of an XML file lazily, in document order.
+        
+        Args:
+            file_path: Path to the XML file
+            streaming: Parse with iterparse and clear every element once its
+                nodes have been yielded, instead of parsing the whole tree
+            query: NodeQuery checked before each node is created; subtrees
+                it rules out are skipped (offset and limit are not applied)
             
-            if data_type != DataType.STRING:
-                # Create a text property
-                text_element = SchemaElement(
-                    name="text",
-                    data_type=data_type,
-                    examples=[text_content]
-                )
-                schema_element.properties["text"] = text_element
+        Yields:
+            DataNode objects, as collected by extract()
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"XML file not found: {file_path}")
         
-        return schema_element
+        if streaming:
+            yield from self._iter_streaming_nodes(file_path, query)
+            return
+        
+        with MappedFile(file_path) as source:
+            root = _parse_mapped(source)
+        yield from self._element_nodes(root, root.tag, 0, None, query)
+        
+        # Stack of (children iterator, parent path, child depth)
+        stack = [(iter(root), root.tag, 1)] if query is None or query.descends(root.tag, 0) else []
+        while stack:
+            children, parent_path, depth = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+            
+            path = f"{parent_path}.{child.tag}"
+            yield from self._element_nodes(child, path, depth, parent_path, query)
+            if len(child) and (query is None or query.descends(path, depth)):
+                stack.append((iter(child), path, depth + 1))
+    
+    def _iter_streaming_nodes(self, file_path: str, query: Optional[NodeQuery] = None) -> Iterator[DataNode]:
+        """
+        Yield data nodes from iterparse events.
+        
+        An element's text is only complete once its first child starts or
+        the element ends, so its nodes are yielded at whichever comes first.
+        """
+        # Open elements as [path, pending]
+        stack = []
+        
+        for event, element in _iterparse(file_path):
+            if event == "start":
+                if stack:
+                    parent = stack[-1]
+                    if parent[1]:
+                        parent[1] = False
+                        grandparent_path = stack[-2][0] if len(stack) > 1 else None
+                        yield from self._element_nodes(element.getparent(), parent[0], len(stack) - 1,
+                                                       grandparent_path, query)
+                    path = f"{parent[0]}.{element.tag}"
+                else:
+                    path = element.tag
+                stack.append([path, True])
+                continue
+            
+            path, pending = stack.pop()
+            if pending:
+                yield from self._element_nodes(element, path, len(stack), stack[-1][0] if stack else None, query)
+            
+            # Release the finished subtree and any processed siblings
+            element.clear(keep_tail=True)
+            parent_element = element.getparent()
+            if parent_element is not None:  # The root's siblings are prolog comments and PIs
+                while element.getprevious() is not None:
+                    del parent_element[0]
+    
+    def _sample_children(self, element: etree._Element) -> Optional[Dict[str, set]]:
+        """Choose which occurrences of each repeated child tag to fold when sampling."""
+        totals = defaultdict(int)
+        for child in element:
+            totals[child.tag] += 1
+        
+        sampled = {}
+        for tag, total in totals.items():
+            indices = self.accumulator.sample_indices(total)
+            if indices is not None:
+                sampled[tag] = indices
+        return sampled or None
     
     def _determine_element_type(self, element: etree._Element) -> DataType:
         """Determine the data type of an XML element."""
@@ -165,16 +629,6 @@ class XMLExtractor:
         
         return DataType.STRING
     
-    def _calculate_max_depth(self, element: etree._Element, current_depth: int = 0) -> int:
-        """Calculate the maximum depth of the XML tree."""
-        max_depth = current_depth
-        
-        for child in element:
-            child_depth = self._calculate_max_depth(child, current_depth + 1)
-            max_depth = max(max_depth, child_depth)
-        
-        return max_depth
-    
     def _get_creation_time(self, file_path: str) -> str:
         """Get file creation time."""
         try:
@@ -195,7 +649,7 @@ class XMLExtractor:
             Schema object containing the extracted XML schema
         """
         # Parse XML string
-        root = etree.fromstring(xml_string.encode('utf-8'))
+        root = etree.fromstring(xml_string.encode('utf-8'), etree.XMLParser(huge_tree=True))
         
         # Reset counters
         self.element_counts.clear()
@@ -208,81 +662,34 @@ class XMLExtractor:
         )
         
         # Extract root element schema
-        root_element = self._extract_element_schema(root)
+        root_element, max_depth = self._traverse(root)
         schema.root_element = root_element
         
         # Calculate statistics
         schema.total_elements = len(self.element_counts)
         schema.total_attributes = len(self.attribute_counts)
-        schema.max_depth = self._calculate_max_depth(root)
+        schema.max_depth = max_depth
         
         return schema
 
-    def _extract_data_nodes(self, element: etree._Element, path: str, depth: int = 0, parent_path: Optional[str] = None) -> List[DataNode]:
-        """
-        Extract all data nodes from XML element.
-        
-        Args:
-            element: XML element to extract nodes from
-            path: Current path in the data structure
-            depth: Current depth level
-            parent_path: Path of the parent node
-            
-        Returns:
-            List of DataNode objects
-        """
-        nodes = []
-        
-        # Create node for current element
-        element_type = self._determine_element_type(element)
-        node = DataNode(
-            path=path,
-            name=element.tag,
-            value=element.text.strip() if element.text and element.text.strip() else None,
-            data_type=element_type,
-            depth=depth,
-            parent_path=parent_path,
-            is_leaf=len(element) == 0 and (not element.text or not element.text.strip()),
-            description=f"XML element: {element.tag}"
-        )
-        nodes.append(node)
-        
-        # Extract attribute nodes
-        for attr_name, attr_value in element.attrib.items():
-            attr_path = f"{path}@{attr_name}"
-            attr_data_type = self._determine_data_type(attr_value)
-            attr_node = DataNode(
-                path=attr_path,
-                name=attr_name,
-                value=attr_value,
-                data_type=attr_data_type,
-                depth=depth + 1,
-                parent_path=path,
-                is_leaf=True,
-                description=f"Attribute: {attr_name}"
-            )
-            nodes.append(attr_node)
-        
-        # Extract text content node if present
-        if element.text and element.text.strip():
-            text_path = f"{path}#text"
-            text_data_type = self._determine_data_type(element.text.strip())
-            text_node = DataNode(
-                path=text_path,
-                name="text",
-                value=element.text.strip(),
-                data_type=text_data_type,
-                depth=depth + 1,
-                parent_path=path,
-                is_leaf=True,
-                description=f"Text content of {element.tag}"
-            )
-            nodes.append(text_node)
-        
-        # Process child elements
-        for i, child in enumerate(element):
-            child_path = f"{path}.{child.tag}"
-            child_nodes = self._extract_data_nodes(child, child_path, depth + 1, path)
-            nodes.extend(child_nodes)
-        
-        return nodes
+
+def _parse_mapped(source: MappedFile) -> etree._Element:
+    """Parse a whole XML document from a zero-copy view of its mapping."""
+    with source.view() as view:
+        return etree.fromstring(view, etree.XMLParser(huge_tree=True), base_url=source.file_path)
+
+
+def _iterparse(file_path: str, mapped: Optional[MappedFile] = None) -> Iterator[Tuple[str, etree._Element]]:
+    """Yield iterparse start/end events, reading the document from its mapping."""
+    with map_input(file_path, mapped) as source:
+        yield from etree.iterparse(source.reader(), events=("start", "end"), huge_tree=True)
+
+
+def _iterparse_pieces(pieces: Iterable[bytes]) -> Iterator[Tuple[str, etree._Element]]:
+    """Yield start/end events of a document fed to a pull parser piece by piece."""
+    parser = etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+    for piece in pieces:
+        parser.feed(piece)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
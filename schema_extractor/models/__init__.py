@@ -2,6 +2,8 @@
 Data models for schema representation.
 """
 
-from .schema import Schema, SchemaElement, SchemaAttribute, DataType
+from .schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNode, DataNodeTable, DataNodeIndex
+from .query import NodeQuery
 
-__all__ = ["Schema", "SchemaElement", "SchemaAttribute", "DataType"]
+__all__ = ["Schema", "SchemaElement", "SchemaAttribute", "DataType", "DataNode", "DataNodeTable", "DataNodeIndex",
+           "NodeQuery"]
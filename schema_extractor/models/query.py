@@ -0,0 +1,205 @@
+"""
+Data node queries compiled for a single pass over a node stream.
+"""
+
+import operator
+import re
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .schema import DataNode, DataType, _literal_prefix
+
+_CONTAINER_TYPES = (DataType.OBJECT, DataType.ARRAY)
+
+# Value filters: an operator followed by the value to compare with
+_VALUE_FILTER = re.compile(r'^\s*(==|=|!=|<=|>=|<|>|~)\s?(.*)$', re.DOTALL)
+
+_ORDERINGS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+class NodeQuery:
+    """
+    Filters, value predicates and paging over data nodes.
+
+    Extractors check accepts() before creating a node and descends() before
+    walking into a subtree, so nodes that fail the query are never created
+    and subtrees that cannot contain a match are skipped when the document
+    is in memory. paginate() applies offset and limit, closing the node
+    stream as soon as the limit is reached.
+    """
+
+    def __init__(self, data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+                 leaf_only: bool = False, min_depth: Optional[int] = None, max_depth: Optional[int] = None,
+                 value_filters: Iterable[str] = (), offset: int = 0, limit: Optional[int] = None):
+        """
+        Args:
+            data_type: Keep only nodes of this data type
+            path_pattern: Keep only nodes whose path matches this regex
+                (with re.match)
+            leaf_only: Keep only leaf nodes
+            min_depth: Keep only nodes at or below this depth
+            max_depth: Keep only nodes at or above this depth
+            value_filters: Predicates every kept value must satisfy, each an
+                operator and a value: "=active", "!=null", ">=10", "<2.5" or
+                "~regex" (searched in the value's text); numbers compare
+                numerically, also against numeric text. Object and array
+                nodes never satisfy a value filter.
+            offset: Number of matching nodes to skip
+            limit: Maximum number of nodes returned after the offset
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative")
+        self.data_type = data_type
+        self.path_pattern = path_pattern
+        self.leaf_only = leaf_only
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self.value_filters = list(value_filters)
+        self.offset = offset
+        self.limit = limit
+
+        self._pattern = re.compile(path_pattern) if path_pattern else None
+        self._prefix = _literal_prefix(path_pattern) if path_pattern else ""
+        self._value_tests = [_compile_value_filter(expression) for expression in self.value_filters]
+
+        # Statistics of the last run
+        self.scanned = 0  # Nodes checked against the filters
+        self.exhaustive = True  # False once a subtree is skipped or the limit stops the stream
+
+    def accepts(self, path: str, depth: int, data_type: DataType, is_leaf: bool, value: Any) -> bool:
+        """Return whether a node with these fields matches the query's filters."""
+        self.scanned += 1
+        if self.data_type is not None and data_type != self.data_type:
+            return False
+        if self.leaf_only and not is_leaf:
+            return False
+        if self.min_depth is not None and depth < self.min_depth:
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if self._value_tests:
+            if data_type in _CONTAINER_TYPES:
+                return False
+            for test in self._value_tests:
+                if not test(value):
+                    return False
+        if self._pattern is not None and not self._pattern.match(path):
+            return False
+        return True
+
+    def matches(self, node: DataNode) -> bool:
+        """Return whether a data node matches the query's filters."""
+        return self.accepts(node.path, node.depth, node.data_type, node.is_leaf, node.value)
+
+    def descends(self, path: str, depth: int, extends_path: bool = True) -> bool:
+        """
+        Return whether descendants of a node may match the query.
+
+        Args:
+            path: Path of the node
+            depth: Depth of the node
+            extends_path: Whether the paths of the node's descendants start
+                with its path; False for a JSON document root, whose keys
+                are bare
+
+        Returns:
+            False when the subtree can be skipped
+        """
+        if self.max_depth is not None and depth >= self.max_depth:
+            self.exhaustive = False
+            return False
+        prefix = self._prefix
+        if prefix and extends_path and not path.startswith(prefix) and not prefix.startswith(path):
+            self.exhaustive = False
+            return False
+        return True
+
+    def paginate(self, nodes: Iterable[Any]) -> Iterator[Any]:
+        """
+        Apply offset and limit to matching nodes (or rows).
+
+        The source iterator is closed once the limit is reached, which ends
+        parsing early for extractor streams.
+        """
+        nodes = iter(nodes)
+        if not self.offset and self.limit is None:
+            yield from nodes
+            return
+        stop = self.offset + self.limit if self.limit is not None else None
+        returned = 0
+        try:
+            for item in islice(nodes, self.offset, stop):
+                returned += 1
+                yield item
+            if stop is not None and returned == self.limit:
+                self.exhaustive = False
+        finally:
+            close = getattr(nodes, "close", None)
+            if close is not None:
+                close()
+
+    def apply(self, nodes: Iterable[DataNode]) -> Iterator[DataNode]:
+        """Filter and paginate data nodes produced without the query."""
+        return self.paginate(node for node in nodes if self.matches(node))
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """Return a value as a number, or None when it is not numeric."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _value_text(value: Any) -> str:
+    """Render a value as text, spelling JSON literals as in JSON."""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _compile_value_filter(expression: str) -> Callable[[Any], bool]:
+    """Compile a value filter expression into a predicate over values."""
+    match = _VALUE_FILTER.match(expression)
+    if match is None:
+        raise ValueError(f"Invalid value filter {expression!r}: expected an operator "
+                         f"(=, !=, <, <=, >, >=, ~) followed by a value")
+    op, operand = match.groups()
+
+    if op == "~":
+        pattern = re.compile(operand)
+        return lambda value: pattern.search(_value_text(value)) is not None
+
+    number = _as_number(operand)
+    if op in _ORDERINGS:
+        if number is None:
+            raise ValueError(f"Invalid value filter {expression!r}: {op} needs a number")
+        compare = _ORDERINGS[op]
+
+        def ordered(value: Any) -> bool:
+            value = _as_number(value)
+            return value is not None and compare(value, number)
+        return ordered
+
+    if number is not None:
+        def equal(value: Any) -> bool:
+            return _as_number(value) == number
+    else:
+        def equal(value: Any) -> bool:
+            return _value_text(value) == operand
+    if op == "!=":
+        return lambda value: not equal(value)
+    return equal
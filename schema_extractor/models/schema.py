@@ -2,9 +2,13 @@
 Schema data models for representing extracted schemas.
 """
 
-from typing import Dict, List, Optional, Union, Any
+import re
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
 from enum import Enum
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr, field_serializer, model_validator
 
 
 class DataType(str, Enum):
@@ -21,6 +25,21 @@ class DataType(str, Enum):
     UNKNOWN = "unknown"
 
 
+def _trusted_instance(cls: type, values: Dict[str, Any]) -> Any:
+    """
+    Create a model instance from a complete dict of already valid field values.
+    
+    Skips validation entirely; model_construct() would still walk every field
+    definition per call, which makes it slower than validating.
+    """
+    instance = object.__new__(cls)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__pydantic_fields_set__", set(values))
+    object.__setattr__(instance, "__pydantic_extra__", None)
+    object.__setattr__(instance, "__pydantic_private__", None)
+    return instance
+
+
 class DataNode(BaseModel):
     """Represents a data node with its path, value, and type."""
     path: str  # Full path to the node (e.g., "root.user.name")
@@ -31,6 +50,480 @@ class DataNode(BaseModel):
     parent_path: Optional[str] = None
     is_leaf: bool = True  # True if this is a leaf node (no children)
     description: Optional[str] = None
+    
+    @classmethod
+    def trusted(cls, path: str, name: str, value: Any, data_type: DataType, depth: int = 0,
+                parent_path: Optional[str] = None, is_leaf: bool = True,
+                description: Optional[str] = None) -> "DataNode":
+        """Create a node without validation, for extractor hot paths that pass correct types."""
+        return _trusted_instance(cls, {
+            "path": path,
+            "name": name,
+            "value": value,
+            "data_type": data_type,
+            "depth": depth,
+            "parent_path": parent_path,
+            "is_leaf": is_leaf,
+            "description": description,
+        })
+
+
+# Data types by their one-byte code in DataNodeTable
+_TYPE_BY_CODE = list(DataType)
+_CODE_BY_TYPE = {data_type: code for code, data_type in enumerate(_TYPE_BY_CODE)}
+
+# String id used for a missing description
+_NO_STRING = 0xFFFFFFFF
+
+
+class DataNodeTable(Sequence):
+    """
+    Columnar store for data nodes.
+    
+    Each node is a row across compact columns: interned path segment, name
+    and description ids, a parent row index, the depth, a one-byte type
+    code, bits in the is_leaf and extends-parent-path bitmaps and a
+    reference to the value. DataNode objects are only materialized when a
+    row is accessed.
+    
+    Paths form a parent-pointer trie: a row stores only the segment it adds
+    to its parent's path (".name", "[3]", "@id", ...), so shared prefixes
+    are stored once and full paths are rendered on demand. Descriptions are
+    stored as interned templates that may refer to the node's {path},
+    {name} and {parent_name}.
+    """
+    
+    def __init__(self):
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        
+        self.segment_ids = array('I')
+        self.name_ids = array('I')  # _NO_STRING: last dotted component of the path
+        self.description_ids = array('I')
+        self.parents = array('i')  # Row index of the parent node, -1 for roots
+        self.depths = array('I')
+        self.type_codes = array('B')
+        self.leaf_bits = bytearray()
+        self.extends_bits = bytearray()  # Set when the path is the parent's path plus the segment
+        self.values: List[Any] = []
+    
+    def intern(self, string: str) -> int:
+        """Return the id of a string in the table's string pool."""
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self._strings)
+            self._strings.append(string)
+        return string_id
+    
+    def append(self, segment: str, name: Optional[str], value: Any, data_type: DataType, depth: int = 0,
+               parent: int = -1, is_leaf: bool = True, description: Optional[str] = None,
+               extends_parent: bool = True) -> int:
+        """
+        Append a node to the table.
+        
+        Args:
+            segment: Text the node adds to its parent's path, or its full
+                path when it does not extend the parent's path
+            name: Node name, or None for the last dotted component of the path
+            value: Node value, stored by reference
+            data_type: Data type of the value
+            depth: Nesting level of the node
+            parent: Row index of the parent node, or -1 for a root
+            is_leaf: Whether the node has no children
+            description: Description template (see class docstring)
+            extends_parent: Whether the path starts with the parent's path;
+                ignored for roots
+            
+        Returns:
+            Row index of the new node
+        """
+        index = len(self.values)
+        self.segment_ids.append(self.intern(segment))
+        self.name_ids.append(_NO_STRING if name is None else self.intern(name))
+        self.description_ids.append(_NO_STRING if description is None else self.intern(description))
+        self.parents.append(parent)
+        self.depths.append(depth)
+        self.type_codes.append(_CODE_BY_TYPE[data_type])
+        if not index & 7:
+            self.leaf_bits.append(0)
+            self.extends_bits.append(0)
+        bit = 1 << (index & 7)
+        if is_leaf:
+            self.leaf_bits[index >> 3] |= bit
+        if extends_parent and parent >= 0:
+            self.extends_bits[index >> 3] |= bit
+        self.values.append(value)
+        return index
+    
+    @classmethod
+    def from_nodes(cls, nodes: Iterable[DataNode]) -> "DataNodeTable":
+        """Build a table from DataNode objects, resolving parents by path."""
+        table = cls()
+        rows_by_path: Dict[str, int] = {}
+        for node in nodes:
+            description = node.description
+            if description is not None:
+                description = description.replace("{", "{{").replace("}", "}}")
+            parent = rows_by_path.get(node.parent_path, -1) if node.parent_path is not None else -1
+            extends = parent >= 0 and node.path.startswith(node.parent_path)
+            rows_by_path[node.path] = table.append(
+                node.path[len(node.parent_path):] if extends else node.path,
+                node.name, node.value, node.data_type, node.depth, parent, node.is_leaf, description, extends
+            )
+        return table
+    
+    def path(self, index: int) -> str:
+        """Render the full path of the node at a row."""
+        strings = self._strings
+        segments = []
+        while True:
+            segments.append(strings[self.segment_ids[index]])
+            if not self.extends_bits[index >> 3] & (1 << (index & 7)):
+                break
+            index = self.parents[index]
+        segments.reverse()
+        return "".join(segments)
+    
+    def data_type(self, index: int) -> DataType:
+        """Data type of the node at a row."""
+        return _TYPE_BY_CODE[self.type_codes[index]]
+    
+    def is_leaf(self, index: int) -> bool:
+        """Whether the node at a row is a leaf."""
+        return bool(self.leaf_bits[index >> 3] & (1 << (index & 7)))
+    
+    def node(self, index: int) -> DataNode:
+        """Materialize the DataNode view of a row."""
+        parent = self.parents[index]
+        return self._node(index, self.path(index), self.path(parent) if parent >= 0 else None)
+    
+    def name(self, index: int, path: str) -> str:
+        """Name of the node at a row whose path is already rendered."""
+        name_id = self.name_ids[index]
+        return self._strings[name_id] if name_id != _NO_STRING else path.rsplit('.', 1)[-1]
+    
+    def _node(self, index: int, path: str, parent_path: Optional[str]) -> DataNode:
+        """Materialize a row whose path and parent path are already rendered."""
+        strings = self._strings
+        name = self.name(index, path)
+        
+        description = None
+        description_id = self.description_ids[index]
+        if description_id != _NO_STRING:
+            template = strings[description_id]
+            parent_name = ""
+            if "{parent_name}" in template and parent_path is not None:
+                parent_name_id = self.name_ids[self.parents[index]]
+                parent_name = strings[parent_name_id] if parent_name_id != _NO_STRING else parent_path.rsplit('.', 1)[-1]
+            description = template.format(path=path, name=name, parent_name=parent_name)
+        
+        return DataNode.trusted(
+            path=path,
+            name=name,
+            value=self.values[index],
+            data_type=_TYPE_BY_CODE[self.type_codes[index]],
+            depth=self.depths[index],
+            parent_path=parent_path,
+            is_leaf=self.is_leaf(index),
+            description=description
+        )
+    
+    def _iter_paths(self) -> Iterator[Tuple[int, str, Optional[str]]]:
+        """
+        Yield (row, path, parent path) for every row in order.
+        
+        Rows are stored in document order, so the rendered paths of the
+        current ancestors are kept on a stack and each path costs a single
+        concatenation.
+        """
+        strings = self._strings
+        segment_ids = self.segment_ids
+        parents = self.parents
+        extends_bits = self.extends_bits
+        ancestors: List[Tuple[int, str]] = []  # (row, path) from the root down
+        
+        for index in range(len(self.values)):
+            parent = parents[index]
+            while ancestors and ancestors[-1][0] != parent:
+                ancestors.pop()
+            
+            parent_path = None
+            if parent >= 0:
+                if not ancestors:
+                    ancestors.append((parent, self.path(parent)))
+                parent_path = ancestors[-1][1]
+            
+            segment = strings[segment_ids[index]]
+            path = parent_path + segment if extends_bits[index >> 3] & (1 << (index & 7)) else segment
+            ancestors.append((index, path))
+            yield index, path, parent_path
+    
+    def iter_rows(self, data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+                  leaf_only: bool = False, max_depth: Optional[int] = None) -> Iterator[Tuple[int, str, Optional[str]]]:
+        """
+        Filter on the columns without materializing any DataNode.
+        
+        Takes the filters of filter_data_nodes and yields (row, path,
+        parent path) for every matching row, in order.
+        """
+        if data_type is None and not path_pattern and not leaf_only and max_depth is None:
+            yield from self._iter_paths()
+            return
+        
+        type_code = _CODE_BY_TYPE[data_type] if data_type is not None else None
+        pattern = re.compile(path_pattern) if path_pattern else None
+        
+        for index, path, parent_path in self._iter_paths():
+            if type_code is not None and self.type_codes[index] != type_code:
+                continue
+            if leaf_only and not self.is_leaf(index):
+                continue
+            if max_depth is not None and self.depths[index] > max_depth:
+                continue
+            if pattern is not None and not pattern.match(path):
+                continue
+            yield index, path, parent_path
+    
+    def iter_nodes(self, data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+                   leaf_only: bool = False, max_depth: Optional[int] = None) -> Iterator[DataNode]:
+        """Filter on the columns and materialize only the matching rows (see filter_data_nodes)."""
+        for index, path, parent_path in self.iter_rows(data_type, path_pattern, leaf_only, max_depth):
+            yield self._node(index, path, parent_path)
+    
+    def nbytes(self) -> int:
+        """Approximate size of the table in bytes, excluding the values themselves."""
+        import sys
+        columns = (self.segment_ids, self.name_ids, self.description_ids, self.parents, self.depths,
+                   self.type_codes, self.leaf_bits, self.extends_bits, self.values)
+        return (sum(sys.getsizeof(column) for column in columns)
+                + sys.getsizeof(self._strings) + sys.getsizeof(self._string_ids)
+                + sum(sys.getsizeof(string) for string in self._strings))
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.node(i) for i in range(*index.indices(len(self.values)))]
+        if index < 0:
+            index += len(self.values)
+        if not 0 <= index < len(self.values):
+            raise IndexError("data node index out of range")
+        return self.node(index)
+    
+    def __iter__(self) -> Iterator[DataNode]:
+        for index, path, parent_path in self._iter_paths():
+            yield self._node(index, path, parent_path)
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (DataNodeTable, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+    
+    def __repr__(self) -> str:
+        return f"DataNodeTable({len(self.values)} nodes)"
+
+
+def filter_data_nodes(nodes: Iterable[DataNode], data_type: Optional[DataType] = None,
+                      path_pattern: Optional[str] = None, leaf_only: bool = False,
+                      max_depth: Optional[int] = None) -> Iterator[DataNode]:
+    """
+    Lazily filter a stream of data nodes; all given criteria must match.
+    
+    Args:
+        nodes: Data nodes to filter, e.g. from an extractor's iter_nodes()
+        data_type: Keep only nodes of this data type
+        path_pattern: Keep only nodes whose path matches this regex
+        leaf_only: Keep only leaf nodes
+        max_depth: Keep only nodes at or above this depth
+        
+    Returns:
+        Iterator over the matching nodes
+    """
+    pattern = re.compile(path_pattern) if path_pattern else None
+    for node in nodes:
+        if data_type is not None and node.data_type != data_type:
+            continue
+        if pattern is not None and not pattern.match(node.path):
+            continue
+        if leaf_only and not node.is_leaf:
+            continue
+        if max_depth is not None and node.depth > max_depth:
+            continue
+        yield node
+
+
+# Characters with a meaning in regular expressions
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    Return a prefix every string matched by a regex (with re.match) starts with.
+    
+    The prefix is the run of literal characters at the start of the pattern;
+    a character followed by a quantifier that allows zero repetitions is not
+    part of it, and patterns with alternation have none.
+    """
+    if "|" in pattern:
+        return ""
+    prefix = []
+    index = 1 if pattern.startswith("^") else 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            escaped = pattern[index + 1:index + 2]
+            if not escaped or escaped.isalnum():
+                break  # Character class such as \d, or an anchor
+            prefix.append(escaped)
+            index += 2
+        elif char in "*?{":
+            if prefix:
+                prefix.pop()
+            break
+        elif char in _REGEX_SPECIAL:
+            break
+        else:
+            prefix.append(char)
+            index += 1
+    return "".join(prefix)
+
+
+class DataNodeIndex:
+    """
+    Lookup structures over a set of data nodes, built once.
+    
+    Paths are kept sorted next to their row numbers, so the literal prefix
+    of a path pattern selects a contiguous range found by binary search;
+    rows are listed per data type, and leaf rows are marked in a bitmap.
+    A query starts from its smallest candidate set and checks the remaining
+    criteria per candidate row, so filters compose without a full scan.
+    Results are returned in document order.
+    """
+    
+    def __init__(self, data_nodes: Union[DataNodeTable, List[DataNode]]):
+        """
+        Args:
+            data_nodes: Data nodes to index; a DataNodeTable is indexed from
+                its columns without materializing nodes
+        """
+        self.source = data_nodes
+        self.paths: List[str] = []
+        self.type_rows: Dict[int, array] = {}
+        
+        if isinstance(data_nodes, DataNodeTable):
+            self._parents = data_nodes.parents
+            self.depths = data_nodes.depths
+            self.type_codes = data_nodes.type_codes
+            self.leaf_bits = bytes(data_nodes.leaf_bits)
+            self.paths = [path for _, path, _ in data_nodes._iter_paths()]
+            for row, code in enumerate(self.type_codes):
+                rows = self.type_rows.get(code)
+                if rows is None:
+                    rows = self.type_rows[code] = array('I')
+                rows.append(row)
+        else:
+            self._parents = None
+            self.depths = array('I')
+            self.type_codes = array('B')
+            leaf_bits = bytearray((len(data_nodes) + 7) >> 3)
+            for row, node in enumerate(data_nodes):
+                code = _CODE_BY_TYPE[node.data_type]
+                self.paths.append(node.path)
+                self.depths.append(node.depth)
+                self.type_codes.append(code)
+                if node.is_leaf:
+                    leaf_bits[row >> 3] |= 1 << (row & 7)
+                rows = self.type_rows.get(code)
+                if rows is None:
+                    rows = self.type_rows[code] = array('I')
+                rows.append(row)
+            self.leaf_bits = bytes(leaf_bits)
+        
+        order = sorted(range(len(self.paths)), key=self.paths.__getitem__)
+        self.sorted_rows = array('I', order)
+        self.sorted_paths = [self.paths[row] for row in order]
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def prefix_rows(self, prefix: str) -> List[int]:
+        """Rows whose path starts with a prefix, in document order."""
+        if not prefix:
+            return list(range(len(self.paths)))
+        # Paths sharing the prefix are contiguous in sorted order, ending
+        # before the first path that sorts after every extension of it
+        sorted_paths = self.sorted_paths
+        start = bisect_left(sorted_paths, prefix)
+        last = ord(prefix[-1])
+        end = bisect_left(sorted_paths, prefix[:-1] + chr(last + 1), start) if last < 0x10FFFF else len(sorted_paths)
+        return sorted(self.sorted_rows[start:end])
+    
+    def leaf_rows(self) -> List[int]:
+        """Leaf rows, in document order, read from the leaf bitmap."""
+        rows = []
+        for byte_index, byte in enumerate(self.leaf_bits):
+            if byte:
+                base = byte_index << 3
+                rows.extend(base + bit for bit in range(8) if byte & (1 << bit))
+        return rows
+    
+    def rows(self, data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+             leaf_only: bool = False, max_depth: Optional[int] = None) -> List[int]:
+        """
+        Rows of the nodes matching all given criteria (see filter_data_nodes).
+        
+        Returns:
+            Matching row numbers in document order
+        """
+        pattern = re.compile(path_pattern) if path_pattern else None
+        type_code = _CODE_BY_TYPE[data_type] if data_type is not None else None
+        
+        # Start from the smallest candidate set the index provides
+        sources = []
+        if type_code is not None:
+            sources.append(self.type_rows.get(type_code, ()))
+        if pattern is not None:
+            prefix = _literal_prefix(path_pattern)
+            if prefix:
+                sources.append(self.prefix_rows(prefix))
+        if sources:
+            candidates = min(sources, key=len)
+        elif leaf_only:
+            candidates = self.leaf_rows()
+            leaf_only = False
+        else:
+            candidates = range(len(self.paths))
+        
+        type_codes = self.type_codes
+        leaf_bits = self.leaf_bits
+        depths = self.depths
+        paths = self.paths
+        matches = []
+        for row in candidates:
+            if type_code is not None and type_codes[row] != type_code:
+                continue
+            if leaf_only and not leaf_bits[row >> 3] & (1 << (row & 7)):
+                continue
+            if max_depth is not None and depths[row] > max_depth:
+                continue
+            if pattern is not None and not pattern.match(paths[row]):
+                continue
+            matches.append(row)
+        return matches
+    
+    def node(self, row: int) -> DataNode:
+        """Data node at a row."""
+        if self._parents is None:
+            return self.source[row]
+        parent = self._parents[row]
+        return self.source._node(row, self.paths[row], self.paths[parent] if parent >= 0 else None)
+    
+    def nodes(self, data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+              leaf_only: bool = False, max_depth: Optional[int] = None) -> Iterator[DataNode]:
+        """Iterate over the data nodes matching all given criteria, in document order."""
+        for row in self.rows(data_type, path_pattern, leaf_only, max_depth):
+            yield self.node(row)
 
 
 class SchemaAttribute(BaseModel):
@@ -40,6 +533,22 @@ class SchemaAttribute(BaseModel):
     required: bool = False
     default_value: Optional[str] = None
     description: Optional[str] = None
+    
+    @classmethod
+    def trusted(cls, name: str, data_type: DataType = DataType.STRING, required: bool = False,
+                default_value: Optional[str] = None, description: Optional[str] = None) -> "SchemaAttribute":
+        """Create an attribute without validation, for extractor hot paths that pass correct types."""
+        return _trusted_instance(cls, {
+            "name": name,
+            "data_type": data_type,
+            "required": required,
+            "default_value": default_value,
+            "description": description,
+        })
+
+
+# Fields linking a SchemaElement to its children
+_CHILD_FIELDS = {"properties", "array_type"}
 
 
 class SchemaElement(BaseModel):
@@ -47,6 +556,7 @@ class SchemaElement(BaseModel):
     name: str
     data_type: DataType = DataType.OBJECT
     required: bool = False
+    nullable: bool = False  # null was seen among values of another type
     description: Optional[str] = None
     
     # For objects
@@ -69,6 +579,91 @@ class SchemaElement(BaseModel):
     
     class Config:
         arbitrary_types_allowed = True
+    
+    def to_dict(self, mode: str = "python") -> Dict[str, Any]:
+        """
+        Dump the element tree like model_dump().
+        
+        The tree is walked from an explicit stack, since pydantic stops
+        serializing nested models at about 255 levels.
+        """
+        root = self._dump_shallow(mode)
+        stack = [(self, root)]
+        while stack:
+            element, dumped = stack.pop()
+            for name, prop in element.properties.items():
+                child = dumped["properties"][name] = prop._dump_shallow(mode)
+                stack.append((prop, child))
+            if element.array_type is not None:
+                child = dumped["array_type"] = element.array_type._dump_shallow(mode)
+                stack.append((element.array_type, child))
+        return root
+    
+    def _dump_shallow(self, mode: str) -> Dict[str, Any]:
+        """Dump this element with empty properties and no array type."""
+        dumped = self.model_dump(mode=mode, exclude=_CHILD_FIELDS)
+        return {
+            field: dumped[field] if field in dumped else ({} if field == "properties" else None)
+            for field in type(self).model_fields
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SchemaElement":
+        """
+        Validate an element tree dumped by to_dict() or model_dump().
+        
+        Each element is validated on its own and linked from an explicit
+        stack, so trees deeper than pydantic's nesting limit can be loaded.
+        """
+        def shallow(values: Dict[str, Any]) -> "SchemaElement":
+            return cls.model_validate({key: value for key, value in values.items() if key not in _CHILD_FIELDS})
+        
+        root = shallow(data)
+        stack = [(data, root)]
+        while stack:
+            values, element = stack.pop()
+            for name, prop in (values.get("properties") or {}).items():
+                if not isinstance(prop, SchemaElement):
+                    element.properties[name] = child = shallow(prop)
+                    stack.append((prop, child))
+                else:
+                    element.properties[name] = prop
+            array_type = values.get("array_type")
+            if isinstance(array_type, dict):
+                element.array_type = child = shallow(array_type)
+                stack.append((array_type, child))
+            elif array_type is not None:
+                element.array_type = array_type
+        return root
+    
+    @classmethod
+    def trusted(cls, name: str, data_type: DataType = DataType.OBJECT, required: bool = False,
+                description: Optional[str] = None, array_type: Optional["SchemaElement"] = None,
+                occurrences: int = 1, examples: Optional[List[Any]] = None) -> "SchemaElement":
+        """Create an element without validation, for extractor hot paths that pass correct types."""
+        return _trusted_instance(cls, {
+            "name": name,
+            "data_type": data_type,
+            "required": required,
+            "nullable": False,
+            "description": description,
+            "properties": {},
+            "attributes": {},
+            "array_type": array_type,
+            "min_value": None,
+            "max_value": None,
+            "pattern": None,
+            "min_length": None,
+            "max_length": None,
+            "occurrences": occurrences,
+            "examples": [] if examples is None else examples,
+        })
+
+    def trusted_copy(self, **changes: Any) -> "SchemaElement":
+        """Shallow copy with some fields replaced, without validation; children are shared."""
+        values = dict(self.__dict__)
+        values.update(changes)
+        return _trusted_instance(type(self), values)
 
 
 class Schema(BaseModel):
@@ -79,8 +674,8 @@ class Schema(BaseModel):
     elements: Dict[str, SchemaElement] = Field(default_factory=dict)
     attributes: Dict[str, SchemaAttribute] = Field(default_factory=dict)
     
-    # Data nodes information
-    data_nodes: List[DataNode] = Field(default_factory=list)
+    # Data nodes information; extractors fill in a columnar DataNodeTable
+    data_nodes: Union[DataNodeTable, List[DataNode]] = Field(default_factory=list)
     
     # Metadata
     version: str = "1.0"
@@ -93,37 +688,120 @@ class Schema(BaseModel):
     max_depth: int = 0
     total_data_nodes: int = 0
     
+    # Index over data_nodes, built on the first filtered query
+    _data_node_index: Optional[DataNodeIndex] = PrivateAttr(default=None)
+    
     class Config:
         arbitrary_types_allowed = True
     
+    @model_validator(mode="before")
+    @classmethod
+    def _load_root_element(cls, data: Any) -> Any:
+        """Validate a dumped root element tree iteratively (see SchemaElement.from_dict)."""
+        if isinstance(data, dict) and isinstance(data.get("root_element"), dict):
+            data = {**data, "root_element": SchemaElement.from_dict(data["root_element"])}
+        return data
+    
+    @field_serializer("root_element")
+    def _serialize_root_element(self, element: Optional[SchemaElement], info) -> Optional[Dict[str, Any]]:
+        """Serialize the root element tree iteratively (see SchemaElement.to_dict)."""
+        return element.to_dict(info.mode) if element is not None else None
+    
+    @field_serializer("data_nodes")
+    def _serialize_data_nodes(self, data_nodes: Union[DataNodeTable, List[DataNode]]) -> List[Dict[str, Any]]:
+        """Serialize data nodes as a list of node dictionaries."""
+        return [node.model_dump() for node in data_nodes]
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert schema to dictionary representation."""
         return self.model_dump()
     
+    def __getstate__(self) -> Dict[Any, Any]:
+        # The index is rebuilt on demand rather than pickled
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {**(state.get("__pydantic_private__") or {}), "_data_node_index": None}
+        return state
+    
+    def data_node_index(self) -> DataNodeIndex:
+        """
+        Return the index of the data nodes, building it on first use.
+        
+        The index is rebuilt when data_nodes is replaced or grows; nodes
+        replaced in place in a list are not seen by an existing index.
+        """
+        index = self._data_node_index
+        if index is None or index.source is not self.data_nodes or len(index) != len(self.data_nodes):
+            index = self._data_node_index = DataNodeIndex(self.data_nodes)
+        return index
+    
+    def iter_data_nodes(self, data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+                        leaf_only: bool = False, max_depth: Optional[int] = None) -> Iterator[DataNode]:
+        """
+        Iterate over the data nodes matching all given criteria (see filter_data_nodes).
+        
+        Filtered queries go through the data node index, so only the first
+        one scans every node.
+        """
+        if data_type is None and not path_pattern and not leaf_only and max_depth is None:
+            return iter(self.data_nodes)
+        return self.data_node_index().nodes(data_type, path_pattern, leaf_only, max_depth)
+    
     def get_data_nodes_by_type(self, data_type: DataType) -> List[DataNode]:
         """Get all data nodes of a specific type."""
-        return [node for node in self.data_nodes if node.data_type == data_type]
+        return list(self.iter_data_nodes(data_type=data_type))
     
     def get_data_nodes_by_path(self, path_pattern: str) -> List[DataNode]:
         """Get data nodes matching a path pattern."""
-        import re
-        pattern = re.compile(path_pattern)
-        return [node for node in self.data_nodes if pattern.match(node.path)]
+        return list(self.iter_data_nodes(path_pattern=path_pattern))
     
     def get_leaf_nodes(self) -> List[DataNode]:
         """Get all leaf nodes (nodes with actual values)."""
-        return [node for node in self.data_nodes if node.is_leaf]
+        return list(self.iter_data_nodes(leaf_only=True))
     
     def get_unique_values(self) -> Dict[str, List[Any]]:
-        """Get unique values for each data node path."""
-        unique_values = {}
-        for node in self.data_nodes:
-            if node.is_leaf:
-                if node.path not in unique_values:
-                    unique_values[node.path] = []
-                if node.value not in unique_values[node.path]:
-                    unique_values[node.path].append(node.value)
-        return unique_values
+        """
+        Get unique values for each data node path, in order of first occurrence.
+        
+        Values are deduplicated through a dict per path, so this is linear
+        in the number of leaves; unhashable values fall back to a list scan.
+        For approximate statistics in bounded memory, see summarize_values.
+        """
+        if isinstance(self.data_nodes, DataNodeTable):
+            values = self.data_nodes.values
+            leaves = ((path, values[row]) for row, path, _ in self.data_nodes.iter_rows(leaf_only=True))
+        else:
+            leaves = ((node.path, node.value) for node in self.data_nodes if node.is_leaf)
+        
+        seen: Dict[str, Dict[Any, None]] = {}
+        unhashable: Dict[str, List[Any]] = {}
+        for path, value in leaves:
+            path_values = seen.get(path)
+            if path_values is None:
+                path_values = seen[path] = {}
+            try:
+                path_values[value] = None
+            except TypeError:
+                others = unhashable.setdefault(path, [])
+                if value not in others:
+                    others.append(value)
+        
+        return {path: list(path_values) + unhashable.get(path, []) for path, path_values in seen.items()}
+    
+    def summarize_values(self, precision: int = 12, capacity: int = 100,
+                         group_arrays: bool = True) -> Dict[str, "ValueSketch"]:
+        """
+        Approximate distinct counts and frequent values of the leaves per field.
+        
+        Args:
+            precision: HyperLogLog precision of each sketch
+            capacity: Frequent value counters of each sketch
+            group_arrays: Share one sketch between the items of an array
+            
+        Returns:
+            ValueSketch objects by field path (see utils.sketches)
+        """
+        from ..utils.sketches import summarize_values
+        return summarize_values(self.data_nodes, precision, capacity, group_arrays)
     
     def to_json_schema(self) -> Dict[str, Any]:
         """Convert to JSON Schema format."""
@@ -133,7 +811,12 @@ class Schema(BaseModel):
         return self._element_to_json_schema(self.root_element)
     
     def _element_to_json_schema(self, element: SchemaElement) -> Dict[str, Any]:
-        """Convert a schema element to JSON Schema format."""
+        """
+        Convert a schema element to JSON Schema format.
+        
+        The tree is walked from an explicit stack, so schemas of deeply
+        nested documents convert without hitting the recursion limit.
+        """
         # Map our data types to JSON Schema types
         type_mapping = {
             DataType.STRING: "string",
@@ -148,41 +831,45 @@ class Schema(BaseModel):
             DataType.UNKNOWN: "string"
         }
         
-        schema = {
-            "type": type_mapping.get(element.data_type, "string"),
-            "description": element.description
-        }
+        root = {}
+        stack = [(element, root)]
+        while stack:
+            element, schema = stack.pop()
+            json_type = type_mapping.get(element.data_type, "string")
+            schema["type"] = [json_type, "null"] if element.nullable and json_type != "null" else json_type
+            schema["description"] = element.description
+            
+            if element.data_type == DataType.OBJECT:
+                if element.properties:
+                    properties = schema["properties"] = {}
+                    for name, prop in element.properties.items():
+                        properties[name] = {}
+                        stack.append((prop, properties[name]))
+                    required_props = [
+                        name for name, prop in element.properties.items()
+                        if prop.required
+                    ]
+                    if required_props:
+                        schema["required"] = required_props
+            
+            elif element.data_type == DataType.ARRAY:
+                if element.array_type:
+                    schema["items"] = {}
+                    stack.append((element.array_type, schema["items"]))
+            
+            elif element.data_type in [DataType.STRING, DataType.INTEGER, DataType.FLOAT]:
+                if element.min_value is not None:
+                    schema["minimum"] = element.min_value
+                if element.max_value is not None:
+                    schema["maximum"] = element.max_value
+                if element.min_length is not None:
+                    schema["minLength"] = element.min_length
+                if element.max_length is not None:
+                    schema["maxLength"] = element.max_length
+                if element.pattern:
+                    schema["pattern"] = element.pattern
         
-        if element.data_type == DataType.OBJECT:
-            if element.properties:
-                schema["properties"] = {
-                    name: self._element_to_json_schema(prop)
-                    for name, prop in element.properties.items()
-                }
-                required_props = [
-                    name for name, prop in element.properties.items()
-                    if prop.required
-                ]
-                if required_props:
-                    schema["required"] = required_props
-        
-        elif element.data_type == DataType.ARRAY:
-            if element.array_type:
-                schema["items"] = self._element_to_json_schema(element.array_type)
-        
-        elif element.data_type in [DataType.STRING, DataType.INTEGER, DataType.FLOAT]:
-            if element.min_value is not None:
-                schema["minimum"] = element.min_value
-            if element.max_value is not None:
-                schema["maximum"] = element.max_value
-            if element.min_length is not None:
-                schema["minLength"] = element.min_length
-            if element.max_length is not None:
-                schema["maxLength"] = element.max_length
-            if element.pattern:
-                schema["pattern"] = element.pattern
-        
-        return schema
+        return root
     
     def to_xsd(self) -> str:
         """Convert to XML Schema Definition (XSD) format."""
@@ -196,44 +883,62 @@ class Schema(BaseModel):
         return xsd
     
     def _element_to_xsd(self, element: SchemaElement, indent: int = 0) -> str:
-        """Convert a schema element to XSD format."""
-        spaces = " " * indent
+        """
+        Convert a schema element to XSD format.
         
-        if element.data_type == DataType.OBJECT:
-            xsd = f'{spaces}<xs:element name="{element.name}">\n'
-            xsd += f'{spaces}  <xs:complexType>\n'
+        The tree is walked from an explicit stack, so schemas of deeply
+        nested documents convert without hitting the recursion limit. The
+        stack holds elements still to convert and text closing elements
+        whose children are done.
+        """
+        parts = []
+        stack = [(element, indent)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                parts.append(item)
+                continue
+            element, indent = item
+            spaces = " " * indent
             
-            if element.properties:
+            if element.data_type == DataType.OBJECT:
+                parts.append(f'{spaces}<xs:element name="{element.name}">\n')
+                parts.append(f'{spaces}  <xs:complexType>\n')
+                
+                closing = ""
+                if element.properties:
+                    parts.append(f'{spaces}    <xs:sequence>\n')
+                    closing += f'{spaces}    </xs:sequence>\n'
+                
+                if element.attributes:
+                    for attr_name, attr in element.attributes.items():
+                        closing += f'{spaces}    <xs:attribute name="{attr_name}" type="xs:{attr.data_type.value}"'
+                        if not attr.required:
+                            closing += ' use="optional"'
+                        if attr.default_value:
+                            closing += f' default="{attr.default_value}"'
+                        closing += '/>\n'
+                
+                closing += f'{spaces}  </xs:complexType>\n'
+                closing += f'{spaces}</xs:element>\n'
+                stack.append(closing)
+                stack.extend((prop, indent + 6) for prop in reversed(element.properties.values()))
+                
+            elif element.data_type == DataType.ARRAY:
+                xsd = f'{spaces}<xs:element name="{element.name}">\n'
+                xsd += f'{spaces}  <xs:complexType>\n'
                 xsd += f'{spaces}    <xs:sequence>\n'
-                for prop_name, prop in element.properties.items():
-                    xsd += self._element_to_xsd(prop, indent + 6)
+                xsd += f'{spaces}      <xs:element name="item" type="xs:{element.array_type.data_type.value if element.array_type else "string"}" maxOccurs="unbounded"/>\n'
                 xsd += f'{spaces}    </xs:sequence>\n'
-            
-            if element.attributes:
-                for attr_name, attr in element.attributes.items():
-                    xsd += f'{spaces}    <xs:attribute name="{attr_name}" type="xs:{attr.data_type.value}"'
-                    if not attr.required:
-                        xsd += ' use="optional"'
-                    if attr.default_value:
-                        xsd += f' default="{attr.default_value}"'
-                    xsd += '/>\n'
-            
-            xsd += f'{spaces}  </xs:complexType>\n'
-            xsd += f'{spaces}</xs:element>\n'
-            
-        elif element.data_type == DataType.ARRAY:
-            xsd = f'{spaces}<xs:element name="{element.name}">\n'
-            xsd += f'{spaces}  <xs:complexType>\n'
-            xsd += f'{spaces}    <xs:sequence>\n'
-            xsd += f'{spaces}      <xs:element name="item" type="xs:{element.array_type.data_type.value if element.array_type else "string"}" maxOccurs="unbounded"/>\n'
-            xsd += f'{spaces}    </xs:sequence>\n'
-            xsd += f'{spaces}  </xs:complexType>\n'
-            xsd += f'{spaces}</xs:element>\n'
-            
-        else:
-            xsd = f'{spaces}<xs:element name="{element.name}" type="xs:{element.data_type.value}"'
-            if not element.required:
-                xsd += ' minOccurs="0"'
-            xsd += '/>\n'
+                xsd += f'{spaces}  </xs:complexType>\n'
+                xsd += f'{spaces}</xs:element>\n'
+                parts.append(xsd)
+                
+            else:
+                xsd = f'{spaces}<xs:element name="{element.name}" type="xs:{element.data_type.value}"'
+                if not element.required:
+                    xsd += ' minOccurs="0"'
+                xsd += '/>\n'
+                parts.append(xsd)
         
-        return xsd
+        return "".join(parts)
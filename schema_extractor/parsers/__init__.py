@@ -0,0 +1,7 @@
+"""
+Incremental parsers used by the streaming extractors.
+"""
+
+from .json_events import iter_json_events, JSONValueBuilder
+
+__all__ = ["iter_json_events", "JSONValueBuilder"]
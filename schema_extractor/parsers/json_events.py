@@ -0,0 +1,278 @@
+"""
+Event-driven JSON tokenizer for documents that do not fit in memory.
+
+Events use the same (event, value) vocabulary as ijson's basic_parse:
+start_map, map_key, end_map, start_array, end_array, string, number,
+boolean and null.
+"""
+
+import re
+from json import JSONDecodeError
+from json.decoder import scanstring
+from typing import Any, Iterator, TextIO, Tuple
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+NUMBER_RE = re.compile(r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?')
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+# Literals accepted by json.load, including its non-standard constants
+LITERALS = (
+    ('true', 'boolean', True),
+    ('false', 'boolean', False),
+    ('null', 'null', None),
+    ('NaN', 'number', float('nan')),
+    ('Infinity', 'number', float('inf')),
+    ('-Infinity', 'number', float('-inf')),
+)
+LITERAL_MAX_LENGTH = max(len(literal) for literal, _, _ in LITERALS)
+
+# Parser states
+_VALUE = 0          # expecting any value
+_VALUE_OR_END = 1   # just after '['
+_KEY_OR_END = 2     # just after '{'
+_KEY = 3            # after ',' inside an object
+_COLON = 4          # after an object key
+_COMMA_OR_END = 5   # after a value inside a container
+_DONE = 6           # top-level value complete
+
+
+def iter_json_events(fp: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """
+    Parse a JSON document incrementally and yield parse events.
+
+    Only the current buffer and the container stack are held in memory,
+    so arbitrarily large documents can be processed.
+
+    Args:
+        fp: Text file object to read from
+        chunk_size: Number of characters read per call
+
+    Returns:
+        Iterator of (event, value) tuples
+    """
+    read = fp.read
+    match_whitespace = WHITESPACE_RE.match
+    match_number = NUMBER_RE.match
+
+    buf = read(chunk_size)
+    eof = not buf
+    pos = 0
+    offset = 0  # Document offset of buf[0]
+    stack = []
+    state = _VALUE
+    starved = False
+
+    while True:
+        if starved:
+            # A token runs past the buffer: keep the unconsumed tail and grow
+            # the buffer geometrically so very long strings stay linear.
+            chunk = read(max(chunk_size, len(buf) - pos))
+            offset += pos
+            buf = buf[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            starved = False
+
+        pos = match_whitespace(buf, pos).end()
+        if pos >= len(buf):
+            if eof:
+                break
+            starved = True
+            continue
+
+        char = buf[pos]
+
+        if state == _COMMA_OR_END:
+            if char == ',':
+                pos += 1
+                state = _KEY if stack[-1] == '{' else _VALUE
+                continue
+            if (char == '}' and stack[-1] == '{') or (char == ']' and stack[-1] == '['):
+                pos += 1
+                stack.pop()
+                state = _COMMA_OR_END if stack else _DONE
+                yield ('end_map' if char == '}' else 'end_array'), None
+                continue
+            raise _decode_error("Expecting ',' delimiter", buf, pos, offset)
+
+        if state == _COLON:
+            if char != ':':
+                raise _decode_error("Expecting ':' delimiter", buf, pos, offset)
+            pos += 1
+            state = _VALUE
+            continue
+
+        if state == _KEY_OR_END or state == _KEY:
+            if char == '"':
+                try:
+                    key, end = scanstring(buf, pos + 1)
+                except JSONDecodeError as error:
+                    if eof or not _runs_past_buffer(error, buf):
+                        raise _string_error(error, buf, pos, offset)
+                    starved = True
+                    continue
+                pos = end
+                state = _COLON
+                yield 'map_key', key
+                continue
+            if char == '}' and state == _KEY_OR_END:
+                pos += 1
+                stack.pop()
+                state = _COMMA_OR_END if stack else _DONE
+                yield 'end_map', None
+                continue
+            raise _decode_error("Expecting property name enclosed in double quotes", buf, pos, offset)
+
+        if state == _DONE:
+            raise _decode_error("Extra data", buf, pos, offset)
+
+        # Expecting a value
+        if char == ']' and state == _VALUE_OR_END:
+            pos += 1
+            stack.pop()
+            state = _COMMA_OR_END if stack else _DONE
+            yield 'end_array', None
+            continue
+
+        if char == '{':
+            pos += 1
+            stack.append('{')
+            state = _KEY_OR_END
+            yield 'start_map', None
+            continue
+
+        if char == '[':
+            pos += 1
+            stack.append('[')
+            state = _VALUE_OR_END
+            yield 'start_array', None
+            continue
+
+        if char == '"':
+            try:
+                value, end = scanstring(buf, pos + 1)
+            except JSONDecodeError as error:
+                if eof or not _runs_past_buffer(error, buf):
+                    raise _string_error(error, buf, pos, offset)
+                starved = True
+                continue
+            pos = end
+            state = _COMMA_OR_END if stack else _DONE
+            yield 'string', value
+            continue
+
+        match = match_number(buf, pos)
+        if match is not None:
+            end = match.end()
+            # A fraction or exponent may still be cut off after "1e-" or "1."
+            if len(buf) - end < 3 and not eof:
+                starved = True
+                continue
+            integer, frac, exp = match.groups()
+            if frac or exp:
+                value = float(integer + (frac or '') + (exp or ''))
+            else:
+                value = int(integer)
+            pos = end
+            state = _COMMA_OR_END if stack else _DONE
+            yield 'number', value
+            continue
+
+        if len(buf) - pos < LITERAL_MAX_LENGTH and not eof:
+            starved = True
+            continue
+
+        for literal, event, value in LITERALS:
+            if buf.startswith(literal, pos):
+                pos += len(literal)
+                state = _COMMA_OR_END if stack else _DONE
+                yield event, value
+                break
+        else:
+            raise _decode_error("Expecting value", buf, pos, offset)
+
+    if stack:
+        raise _decode_error("Unterminated container", buf, pos, offset)
+    if state != _DONE:
+        raise _decode_error("Expecting value", buf, pos, offset)
+
+
+def _decode_error(message: str, buf: str, pos: int, offset: int) -> JSONDecodeError:
+    """Build a JSONDecodeError whose position refers to the whole document."""
+    error = JSONDecodeError(message, buf, pos)
+    error.pos = offset + pos
+    error.args = (f"{message}: char {offset + pos}",)
+    return error
+
+
+def _runs_past_buffer(error: JSONDecodeError, buf: str) -> bool:
+    """
+    Whether scanstring failed only because the string is cut off by the end
+    of the buffer, so that reading more input may complete it.
+
+    Invalid escapes and control characters are errors whatever follows, so
+    a malformed string is reported without buffering the rest of the file.
+    """
+    if error.msg.startswith("Unterminated string"):
+        return True
+    # A \uXXXX escape (or the one after a high surrogate) missing characters
+    return error.msg == "Invalid \\uXXXX escape" and error.pos + 5 >= len(buf)
+
+
+def _string_error(error: JSONDecodeError, buf: str, pos: int, offset: int) -> JSONDecodeError:
+    """Rebuild a scanstring error of the string starting at `pos` with its document position."""
+    if error.msg.startswith("Unterminated string"):
+        return _decode_error("Unterminated string", buf, pos, offset)
+    return _decode_error(error.msg, buf, error.pos, offset)
+
+
+class JSONValueBuilder:
+    """
+    Rebuild a single JSON value from parse events.
+
+    Used to materialize small sub-documents, such as sampled array items,
+    out of an event stream.
+    """
+
+    def __init__(self):
+        self.value = None
+        self._containers = []
+        self._keys = []
+
+    def feed(self, event: str, value: Any) -> bool:
+        """
+        Consume one event.
+
+        Returns:
+            True once the value is complete
+        """
+        if event == 'map_key':
+            self._keys[-1] = value
+            return False
+
+        if event == 'end_map' or event == 'end_array':
+            self._containers.pop()
+            self._keys.pop()
+            return not self._containers
+
+        if event == 'start_map':
+            value = {}
+        elif event == 'start_array':
+            value = []
+
+        if self._containers:
+            container = self._containers[-1]
+            if isinstance(container, dict):
+                container[self._keys[-1]] = value
+            else:
+                container.append(value)
+        else:
+            self.value = value
+
+        if event == 'start_map' or event == 'start_array':
+            self._containers.append(value)
+            self._keys.append(None)
+            return False
+
+        return not self._containers
@@ -0,0 +1,268 @@
+"""
+Arrow IPC and Parquet export of data nodes.
+
+Nodes are written in record batches with typed columns: values go to the
+column of their data type (value_string, value_integer, value_float or
+value_boolean) and data types are dictionary encoded. Batches are built
+straight from the columns of a DataNodeTable, so no DataNode objects are
+materialized. Requires the optional pyarrow package.
+"""
+
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, List, Optional, Union
+
+from ..models.query import NodeQuery
+from ..models.schema import DataNode, DataNodeTable, DataType, filter_data_nodes
+
+ARROW_FORMATS = ("arrow", "parquet")
+DEFAULT_BATCH_SIZE = 65536
+
+_TYPES = list(DataType)
+_TYPE_NAMES = [data_type.value for data_type in DataType]
+_CODE_BY_TYPE = {data_type: code for code, data_type in enumerate(DataType)}
+_INTEGER = _CODE_BY_TYPE[DataType.INTEGER]
+_FLOAT = _CODE_BY_TYPE[DataType.FLOAT]
+_BOOLEAN = _CODE_BY_TYPE[DataType.BOOLEAN]
+
+# Boolean spellings accepted by the extractors' type inference
+_BOOLEAN_STRINGS = {"true": True, "yes": True, "1": True, "false": False, "no": False, "0": False}
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _pyarrow():
+    """Import pyarrow, explaining how to get it when it is missing."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ValueError("Arrow and Parquet export require the pyarrow package (pip install pyarrow)")
+    return pyarrow
+
+
+def arrow_schema():
+    """Return the Arrow schema of exported data nodes."""
+    pa = _pyarrow()
+    return pa.schema([
+        pa.field("path", pa.string(), nullable=False),
+        pa.field("name", pa.string(), nullable=False),
+        pa.field("data_type", pa.dictionary(pa.int8(), pa.string()), nullable=False),
+        pa.field("depth", pa.uint32(), nullable=False),
+        pa.field("is_leaf", pa.bool_(), nullable=False),
+        pa.field("parent_path", pa.string()),
+        pa.field("value_string", pa.string()),
+        pa.field("value_integer", pa.int64()),
+        pa.field("value_float", pa.float64()),
+        pa.field("value_boolean", pa.bool_()),
+    ])
+
+
+def record_batches(data_nodes: Union[DataNodeTable, Iterable[DataNode]], batch_size: int = DEFAULT_BATCH_SIZE,
+                   data_type: Optional[DataType] = None, path_pattern: Optional[str] = None,
+                   leaf_only: bool = False, max_depth: Optional[int] = None,
+                   query: Optional[NodeQuery] = None) -> Iterator[Any]:
+    """
+    Convert data nodes to Arrow record batches.
+
+    Args:
+        data_nodes: A DataNodeTable, read column-wise, or any iterable of
+            data nodes (e.g. a streaming extractor)
+        batch_size: Maximum number of rows per batch
+        data_type, path_pattern, leaf_only, max_depth: Filters, as for
+            filter_data_nodes
+        query: NodeQuery applied after the filters, including its offset
+            and limit; table rows are checked before any node is built
+
+    Yields:
+        pyarrow.RecordBatch objects with the columns of arrow_schema()
+    """
+    pa = _pyarrow()
+    schema = arrow_schema()
+    type_names = pa.array(_TYPE_NAMES, pa.string())
+    value_types = (pa.string(), pa.int64(), pa.float64(), pa.bool_())
+
+    def build(paths, names, codes, depths, leaves, parent_paths, values):
+        columns = [
+            pa.array(paths, pa.string()),
+            pa.array(names, pa.string()),
+            pa.DictionaryArray.from_arrays(pa.array(codes, pa.int8()), type_names),
+            pa.array(depths, pa.uint32()),
+            pa.array(leaves, pa.bool_()),
+            pa.array(parent_paths, pa.string()),
+        ]
+        columns.extend(pa.array(column, value_type)
+                       for column, value_type in zip(_split_values(values, codes), value_types))
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+    if isinstance(data_nodes, DataNodeTable):
+        rows = data_nodes.iter_rows(data_type, path_pattern, leaf_only, max_depth)
+        if query is not None:
+            type_codes, depths, values = data_nodes.type_codes, data_nodes.depths, data_nodes.values
+            rows = query.paginate(
+                row for row in rows
+                if query.accepts(row[1], depths[row[0]], _TYPES[type_codes[row[0]]],
+                                 data_nodes.is_leaf(row[0]), values[row[0]])
+            )
+        while True:
+            chunk = _take(rows, batch_size)
+            if not chunk:
+                return
+            indices = [row[0] for row in chunk]
+            paths = [row[1] for row in chunk]
+            gather = _gatherer(indices)
+            yield build(
+                paths,
+                [data_nodes.name(index, path) for index, path in zip(indices, paths)],
+                gather(data_nodes.type_codes),
+                gather(data_nodes.depths),
+                [data_nodes.is_leaf(index) for index in indices],
+                [row[2] for row in chunk],
+                gather(data_nodes.values),
+            )
+
+    nodes = filter_data_nodes(data_nodes, data_type, path_pattern, leaf_only, max_depth)
+    if query is not None:
+        nodes = query.apply(nodes)
+    while True:
+        chunk = _take(nodes, batch_size)
+        if not chunk:
+            return
+        yield build(
+            [node.path for node in chunk],
+            [node.name for node in chunk],
+            [_CODE_BY_TYPE[node.data_type] for node in chunk],
+            [node.depth for node in chunk],
+            [node.is_leaf for node in chunk],
+            [node.parent_path for node in chunk],
+            [node.value for node in chunk],
+        )
+
+
+def write_record_batches(batches: Iterable[Any], output_path: str, format: str = "parquet",
+                         compression: Optional[str] = None) -> int:
+    """
+    Write record batches to an Arrow IPC or Parquet file as they arrive.
+
+    Args:
+        batches: Record batches from record_batches()
+        output_path: Path of the file to create
+        format: "arrow" (IPC file format) or "parquet"; each batch becomes
+            a record batch or row group
+        compression: Codec: "zstd" for either format, "gzip" for Parquet
+            or "lz4" for Arrow; Parquet defaults to snappy, Arrow to none
+
+    Returns:
+        Number of rows written
+    """
+    pa = _pyarrow()
+    schema = arrow_schema()
+    count = 0
+
+    if format == "arrow":
+        if compression not in (None, "zstd", "lz4"):
+            # Arrow IPC only defines the zstd and lz4 codecs
+            raise ValueError(f"Unsupported Arrow IPC compression: {compression}")
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        with pa.ipc.new_file(output_path, schema, options=options) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                count += batch.num_rows
+
+    elif format == "parquet":
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(output_path, schema, compression=compression or "snappy") as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                count += batch.num_rows
+
+    else:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    return count
+
+
+def export_arrow(data_nodes: Union[DataNodeTable, Iterable[DataNode]], output_path: str,
+                 format: str = "parquet", compression: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Write data nodes to an Arrow IPC or Parquet file in record batches.
+
+    Args:
+        data_nodes: A DataNodeTable or any iterable of data nodes
+        output_path: Path of the file to create
+        format: "arrow" or "parquet"
+        compression: Codec (see write_record_batches)
+        batch_size: Maximum number of rows per batch
+
+    Returns:
+        Number of nodes written
+    """
+    if format not in ARROW_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    return write_record_batches(record_batches(data_nodes, batch_size), output_path, format, compression)
+
+
+def _take(rows: Iterator[Any], count: int) -> List[Any]:
+    """Take up to count items from an iterator."""
+    chunk = []
+    append = chunk.append
+    for row in rows:
+        append(row)
+        if len(chunk) >= count:
+            break
+    return chunk
+
+
+def _gatherer(indices: List[int]):
+    """Return a function picking the items at indices from a column, as a tuple."""
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda column: (column[index],)
+    return itemgetter(*indices)
+
+
+def _split_values(values: Iterable[Any], codes: Iterable[int]) -> List[List[Any]]:
+    """
+    Split values into string, integer, float and boolean columns.
+
+    A value goes to the column of its data type when it converts cleanly
+    (XML values are text) and to the string column otherwise; containers
+    and missing values leave every column null.
+    """
+    strings: List[Any] = []
+    integers: List[Any] = []
+    floats: List[Any] = []
+    booleans: List[Any] = []
+
+    for value, code in zip(values, codes):
+        string = integer = number = boolean = None
+        if value is None or isinstance(value, (dict, list)):
+            pass
+        elif code == _INTEGER:
+            try:
+                integer = int(value)
+            except ValueError:
+                string = str(value)
+            else:
+                if not _INT64_MIN <= integer <= _INT64_MAX:
+                    integer, string = None, str(value)
+        elif code == _FLOAT:
+            try:
+                number = float(value)
+            except ValueError:
+                string = str(value)
+        elif code == _BOOLEAN:
+            if isinstance(value, bool):
+                boolean = value
+            else:
+                boolean = _BOOLEAN_STRINGS.get(str(value).lower())
+                if boolean is None:
+                    string = str(value)
+        else:
+            string = value if isinstance(value, str) else str(value)
+        strings.append(string)
+        integers.append(integer)
+        floats.append(number)
+        booleans.append(boolean)
+
+    return [strings, integers, floats, booleans]
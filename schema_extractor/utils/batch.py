@@ -0,0 +1,313 @@
+"""
+Batch extraction and merging of many files over a process pool.
+"""
+
+import glob
+import os
+import time
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from ..models.schema import Schema
+from ..extractors.merge import SchemaReducer
+from ..validators.compiled import SchemaViolation, compile_validator
+from ..validators.xml_validator import compile_xml_validator
+from .cache import SchemaCache
+from .helpers import find_violations, load_schema
+
+# Extensions picked up when an input is a directory
+BATCH_EXTENSIONS = (".xml", ".xhtml", ".svg", ".json", ".js", ".jsonl", ".ndjson")
+
+# Extractor of the current worker process, built once by _init_worker
+_worker_extractor = None
+
+# Schema and settings of the current validation worker, set by _init_validation_worker
+_worker_validation = None
+
+
+class BatchResult:
+    """Outcome of extracting one file of a batch."""
+    __slots__ = ("file_path", "size", "schema", "error", "elapsed")
+
+    def __init__(self, file_path: str, size: int, schema: Optional[Schema] = None,
+                 error: Optional[str] = None, elapsed: float = 0.0):
+        self.file_path = file_path
+        self.size = size  # Bytes
+        self.schema = schema  # None when extraction failed
+        self.error = error
+        self.elapsed = elapsed  # Seconds spent extracting in the worker
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ValidationResult:
+    """Outcome of validating one file of a batch."""
+    __slots__ = ("file_path", "size", "violations", "error", "elapsed")
+
+    def __init__(self, file_path: str, size: int, violations: Optional[List[SchemaViolation]] = None,
+                 error: Optional[str] = None, elapsed: float = 0.0):
+        self.file_path = file_path
+        self.size = size  # Bytes
+        self.violations = violations or []
+        self.error = error  # Set when the file could not be read or parsed
+        self.elapsed = elapsed  # Seconds spent validating in the worker
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file is valid."""
+        return self.error is None and not self.violations
+
+    def to_record(self) -> Dict[str, Any]:
+        """Return the report line of the file: file, valid, errors and duration."""
+        if self.error is not None:
+            errors = [{"path": None, "message": self.error}]
+        else:
+            errors = [{"path": violation.path, "message": violation.message} for violation in self.violations]
+        return {"file": self.file_path, "valid": self.ok, "errors": errors, "duration": round(self.elapsed, 6)}
+
+
+class BatchStats:
+    """Running throughput totals over the results of a batch."""
+
+    def __init__(self):
+        self.files = 0
+        self.failed = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def count(self, results: Iterable[BatchResult]) -> Iterator[BatchResult]:
+        """Count results as they stream past; the clock stops when they run out."""
+        for result in results:
+            self.files += 1
+            self.bytes += result.size
+            if not result.ok:
+                self.failed += 1
+            yield result
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def expand_inputs(inputs: Iterable[str], extensions: Iterable[str] = BATCH_EXTENSIONS,
+                  include: Optional[Callable[[str], bool]] = None) -> List[str]:
+    """
+    Expand files, directories and glob patterns into a sorted list of files.
+
+    Directories are searched recursively for files with one of `extensions`,
+    or for which `include` returns True; files and glob matches are taken
+    as they are.
+
+    Args:
+        inputs: File paths, directory paths or glob patterns (``**`` recurses)
+        extensions: Lower-case extensions collected from directories
+        include: Predicate on the path of other files in directories, e.g.
+            to recognize files by their content
+
+    Returns:
+        Sorted, de-duplicated file paths
+    """
+    extensions = tuple(extensions)
+    files = set()
+    for pattern in inputs:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f"No files match: {pattern}")
+
+        for match in matches:
+            if os.path.isdir(match):
+                for directory, _, names in os.walk(match):
+                    for name in names:
+                        file_path = os.path.join(directory, name)
+                        if name.lower().endswith(extensions) or (include is not None and include(file_path)):
+                            files.add(file_path)
+            elif os.path.isfile(match):
+                files.add(match)
+            else:
+                raise FileNotFoundError(f"File not found: {match}")
+
+    return sorted(files)
+
+
+def extract_batch(file_paths: List[str], workers: Optional[int] = None, streaming: bool = False,
+                  array_sample_size: Optional[int] = None, sample_seed: Optional[int] = None,
+                  keep_data_nodes: bool = False, cache: Optional[SchemaCache] = None) -> Iterator[BatchResult]:
+    """
+    Extract the schemas of many files, distributing them over a process pool.
+
+    Results are yielded as files complete, not in input order. A file that
+    fails to extract yields a result carrying the error instead of a schema.
+
+    Args:
+        file_paths: Files to extract
+        workers: Number of worker processes (defaults to the CPU count); with
+            1 the files are extracted in this process
+        streaming: Parse every file incrementally
+        array_sample_size: Passed to each worker's SchemaExtractor
+        sample_seed: Passed to each worker's SchemaExtractor
+        keep_data_nodes: Send the data nodes back with each schema; they are
+            dropped by default since they dominate the cost of returning it
+        cache: Schema cache shared by the workers; unchanged files are
+            loaded from it instead of being extracted
+
+    Returns:
+        Iterator over one BatchResult per file
+    """
+    workers = workers or os.cpu_count() or 1
+    settings = (array_sample_size, sample_seed, streaming, keep_data_nodes, cache)
+
+    if workers == 1 or len(file_paths) <= 1:
+        _init_worker(*settings)
+        yield from map(_extract_file, file_paths)
+        return
+
+    # Large enough chunks to amortize the IPC, small enough to balance the load
+    chunksize = max(1, min(64, len(file_paths) // (workers * 8)))
+    with Pool(workers, initializer=_init_worker, initargs=settings) as pool:
+        yield from pool.imap_unordered(_extract_file, file_paths, chunksize)
+
+
+def validate_batch(file_paths: List[str], schema: Schema, workers: Optional[int] = None,
+                   streaming: bool = False, max_errors: Optional[int] = 10) -> Iterator[ValidationResult]:
+    """
+    Validate many files against one schema, distributing them over a process pool.
+
+    The schema is sent to each worker once and compiled there once; results
+    are yielded as files complete, not in input order.
+
+    Args:
+        file_paths: Files to validate
+        schema: Schema every file is validated against
+        workers: Number of worker processes (defaults to the CPU count); with
+            1 the files are validated in this process
+        streaming: Check JSON documents from parse events instead of loading them
+        max_errors: Violations collected per file (None for all of them)
+
+    Returns:
+        Iterator over one ValidationResult per file
+    """
+    workers = workers or os.cpu_count() or 1
+    # Validation only needs the element tree; keep the data nodes out of the IPC
+    # without reading lazily loaded ones
+    schema = schema.model_copy(update={"data_nodes": []})
+    settings = (schema, streaming, max_errors)
+
+    if workers == 1 or len(file_paths) <= 1:
+        _init_validation_worker(*settings)
+        yield from map(_validate_file, file_paths)
+        return
+
+    chunksize = max(1, min(64, len(file_paths) // (workers * 8)))
+    with Pool(workers, initializer=_init_validation_worker, initargs=settings) as pool:
+        yield from pool.imap_unordered(_validate_file, file_paths, chunksize)
+
+
+def merge_schema_files(file_paths: List[str], workers: Optional[int] = None,
+                       group_size: Optional[int] = None) -> Schema:
+    """
+    Merge saved schema files as a tree reduction over a process pool.
+
+    Each worker loads one group of files and merges them through a
+    SchemaReducer, holding O(log group size) schemas at a time. The partial
+    results are merged the same way in this process as they arrive, in any
+    order, which the merge is insensitive to.
+
+    Args:
+        file_paths: Schema files to merge
+        workers: Number of worker processes (defaults to the CPU count)
+        group_size: Files merged per task; by default the files are split
+            into four groups per worker
+
+    Returns:
+        The merged schema
+    """
+    if not file_paths:
+        raise ValueError("No schemas provided for merging")
+
+    workers = workers or os.cpu_count() or 1
+    if group_size is None:
+        group_size = -(-len(file_paths) // (workers * 4))
+    groups = [file_paths[i:i + group_size] for i in range(0, len(file_paths), group_size)]
+
+    reducer = SchemaReducer()
+    if workers == 1 or len(groups) == 1:
+        for group in groups:
+            reducer.add(_merge_group(group), owned=True)
+    else:
+        with Pool(min(workers, len(groups))) as pool:
+            for partial in pool.imap_unordered(_merge_group, groups):
+                reducer.add(partial, owned=True)
+    return reducer.result()
+
+
+def _merge_group(file_paths: List[str]) -> Schema:
+    """Load and merge one group of schema files in a worker process."""
+    reducer = SchemaReducer()
+    for file_path in file_paths:
+        schema = load_schema(file_path)
+        schema.data_nodes = []
+        reducer.add(schema, owned=True)
+    return reducer.result()
+
+
+def _init_worker(array_sample_size: Optional[int], sample_seed: Optional[int],
+                 streaming: bool, keep_data_nodes: bool, cache: Optional[SchemaCache] = None) -> None:
+    """Build the extractor used for every file handled by this process."""
+    global _worker_extractor
+    from .. import SchemaExtractor
+
+    extractor = SchemaExtractor(array_sample_size=array_sample_size, sample_seed=sample_seed, cache=cache)
+    _worker_extractor = (extractor, streaming, keep_data_nodes)
+
+
+def _extract_file(file_path: str) -> BatchResult:
+    """Extract one file in a worker process."""
+    extractor, streaming, keep_data_nodes = _worker_extractor
+    started = time.perf_counter()
+    try:
+        size = os.path.getsize(file_path)
+        schema = extractor.extract_schema(file_path, streaming=streaming)
+    except Exception as e:
+        size = os.path.getsize(file_path) if os.path.isfile(file_path) else 0
+        return BatchResult(file_path, size, error=f"{type(e).__name__}: {e}",
+                           elapsed=time.perf_counter() - started)
+
+    if not keep_data_nodes:
+        schema.data_nodes = []
+    return BatchResult(file_path, size, schema, elapsed=time.perf_counter() - started)
+
+
+def _init_validation_worker(schema: Schema, streaming: bool, max_errors: Optional[int]) -> None:
+    """Compile the schema once for every file validated by this process."""
+    global _worker_validation
+    if schema.file_type == "xml":
+        compile_xml_validator(schema)
+    else:
+        compile_validator(schema)
+    _worker_validation = (schema, streaming, max_errors)
+
+
+def _validate_file(file_path: str) -> ValidationResult:
+    """Validate one file in a worker process."""
+    schema, streaming, max_errors = _worker_validation
+    started = time.perf_counter()
+    try:
+        size = os.path.getsize(file_path)
+        violations = find_violations(file_path, schema, limit=max_errors, streaming=streaming)
+    except Exception as e:
+        size = os.path.getsize(file_path) if os.path.isfile(file_path) else 0
+        return ValidationResult(file_path, size, error=f"{type(e).__name__}: {e}",
+                                elapsed=time.perf_counter() - started)
+    return ValidationResult(file_path, size, violations, elapsed=time.perf_counter() - started)
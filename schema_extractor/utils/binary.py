@@ -0,0 +1,365 @@
+"""
+Compact binary file format for schemas.
+
+A file starts with a fixed header followed by framed sections:
+
+    header   MAGIC, format version (u16), byte order (u8), reserved (u8)
+    section  kind (u8), codec (u8), raw length (u64), stored length (u64), payload
+
+The META section holds the schema fields as JSON, TREE the element tree
+as a JSON list of flat per-element records in preorder, and DATA_NODES the
+columns of the DataNodeTable: the string pool and values as JSON, the
+numeric columns and bitmaps as raw arrays. Container values that are made
+of their child rows are rebuilt from them on load instead of being stored
+again. Sections are compressed with zlib unless saved without compression.
+
+The DATA_NODES section is located but not read when a schema is loaded;
+the table is read from the file on first access.
+"""
+
+import json
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.schema import Schema, SchemaElement, SchemaAttribute, DataType, DataNodeTable
+
+MAGIC = b"SXSB"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHBB")
+_SECTION = struct.Struct("<BBQQ")
+_LENGTH = struct.Struct("<Q")
+_ROWS = struct.Struct("<I")
+
+_META, _TREE, _DATA_NODES = 1, 2, 3
+_CODECS = {None: 0, "zlib": 1}
+_LITTLE, _BIG = 0, 1
+
+_OBJECT_CODE = list(DataType).index(DataType.OBJECT)
+_MISSING = object()
+
+# Numeric DataNodeTable columns, in file order, with their array type codes
+_ARRAY_COLUMNS = (("segment_ids", "I"), ("name_ids", "I"), ("description_ids", "I"),
+                  ("parents", "i"), ("depths", "I"))
+
+
+def is_binary_schema(file_path: str) -> bool:
+    """Return whether a file starts with the binary schema magic."""
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_binary_schema(schema: Schema, output_path: str, compression: Optional[str] = "zlib") -> None:
+    """
+    Save a schema in the binary format.
+
+    Args:
+        schema: Schema object to save
+        output_path: Path to save the schema
+        compression: "zlib", or None to store the sections uncompressed
+    """
+    if compression not in _CODECS:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    data_nodes = schema.data_nodes
+    if not isinstance(data_nodes, DataNodeTable):
+        data_nodes = DataNodeTable.from_nodes(data_nodes)
+
+    meta = schema.model_dump(mode="json", exclude={"root_element", "data_nodes"})
+    tree = _encode_tree(schema.root_element) if schema.root_element is not None else []
+    # Encoding reads a lazily loaded table, which may come from the output file itself
+    table = _encode_table(data_nodes)
+
+    # Write to a temporary file and rename it, so the output file is never left partial
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, _LITTLE if sys.byteorder == "little" else _BIG, 0))
+            _write_section(f, _META, json.dumps(meta).encode('utf-8'), compression)
+            _write_section(f, _TREE, json.dumps(tree).encode('utf-8'), compression)
+            _write_section(f, _DATA_NODES, table, compression)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_binary_schema(file_path: str, lazy: bool = True) -> Schema:
+    """
+    Load a schema saved by save_binary_schema().
+
+    Args:
+        file_path: Path to the schema file
+        lazy: Read the data nodes on first access instead of now; the file
+            must not change in between
+
+    Returns:
+        Schema object
+    """
+    stat = os.stat(file_path)
+    with open(file_path, 'rb') as f:
+        magic, version, byte_order, _ = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not a binary schema file: {file_path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary schema version: {version}")
+
+        sections: Dict[int, Tuple[int, int, int, int]] = {}  # Kind -> (codec, raw, stored, offset)
+        while True:
+            header = f.read(_SECTION.size)
+            if not header:
+                break
+            kind, codec, raw_length, stored_length = _SECTION.unpack(header)
+            sections[kind] = (codec, raw_length, stored_length, f.tell())
+            f.seek(stored_length, os.SEEK_CUR)
+
+        schema = Schema.model_validate(json.loads(_read_section(f, sections[_META])))
+        tree = json.loads(_read_section(f, sections[_TREE]))
+        schema.root_element = _decode_tree(tree) if tree else None
+
+        swap = byte_order != (_LITTLE if sys.byteorder == "little" else _BIG)
+        if lazy:
+            rows = _section_rows(f, sections[_DATA_NODES])
+            schema.data_nodes = _LazyDataNodeTable(file_path, stat, sections[_DATA_NODES], swap, rows)
+        else:
+            schema.data_nodes = _decode_table(_read_section(f, sections[_DATA_NODES]), swap)
+    return schema
+
+
+def _write_section(f, kind: int, payload: bytes, compression: Optional[str]) -> None:
+    stored = zlib.compress(payload, 1) if compression == "zlib" else payload
+    f.write(_SECTION.pack(kind, _CODECS[compression], len(payload), len(stored)))
+    f.write(stored)
+
+
+def _read_section(f, section: Tuple[int, int, int, int]) -> bytes:
+    codec, raw_length, stored_length, offset = section
+    f.seek(offset)
+    stored = f.read(stored_length)
+    payload = zlib.decompress(stored) if codec == _CODECS["zlib"] else stored
+    if len(payload) != raw_length:
+        raise ValueError("Truncated binary schema section")
+    return payload
+
+
+def _section_rows(f, section: Tuple[int, int, int, int]) -> int:
+    """Read the row count at the start of a DATA_NODES section without reading the rest."""
+    codec, _, stored_length, offset = section
+    f.seek(offset)
+    if codec == _CODECS["zlib"]:
+        decompressor = zlib.decompressobj()
+        head = b""
+        while len(head) < _ROWS.size and not decompressor.eof:
+            chunk = f.read(min(stored_length, 4096))
+            if not chunk:
+                break
+            head += decompressor.decompress(chunk, _ROWS.size - len(head))
+    else:
+        head = f.read(_ROWS.size)
+    return _ROWS.unpack_from(head, 0)[0]
+
+
+def _encode_tree(root: SchemaElement) -> List[list]:
+    """Flatten an element tree into preorder records: properties first, then the array type."""
+    records = []
+    stack: List[Tuple[Optional[str], SchemaElement]] = [(None, root)]
+    while stack:
+        key, element = stack.pop()
+        records.append([
+            key, element.name, element.data_type.value, element.required, element.description,
+            len(element.properties), element.array_type is not None,
+            [[attr_key, attribute.name, attribute.data_type.value, attribute.required,
+              attribute.default_value, attribute.description]
+             for attr_key, attribute in element.attributes.items()],
+            element.min_value, element.max_value, element.pattern, element.min_length, element.max_length,
+            element.occurrences, element.examples, element.nullable,
+        ])
+        if element.array_type is not None:
+            stack.append((None, element.array_type))
+        stack.extend(reversed(element.properties.items()))
+    return records
+
+
+def _decode_tree(records: List[list]) -> SchemaElement:
+    """Rebuild an element tree from its preorder records."""
+    root = None
+    # Open elements as [element, properties still to attach, array type still to attach]
+    stack: List[list] = []
+    for (key, name, data_type, required, description, property_count, has_array_type, attributes,
+         min_value, max_value, pattern, min_length, max_length, occurrences, examples, *optional) in records:
+        element = SchemaElement.trusted(name=name, data_type=DataType(data_type), required=required,
+                                        description=description, occurrences=occurrences, examples=examples)
+        if optional and optional[0]:
+            # Nullable flag, absent from files written before it was recorded
+            element.nullable = True
+        if (min_value, max_value, pattern, min_length, max_length) != (None, None, None, None, None):
+            element.__dict__.update(min_value=min_value, max_value=max_value, pattern=pattern,
+                                    min_length=min_length, max_length=max_length)
+        for attr_key, attr_name, attr_type, attr_required, default_value, attr_description in attributes:
+            element.attributes[attr_key] = SchemaAttribute.trusted(
+                name=attr_name, data_type=DataType(attr_type), required=attr_required,
+                default_value=default_value, description=attr_description
+            )
+
+        if not stack:
+            root = element
+        else:
+            parent = stack[-1]
+            if parent[1]:
+                parent[0].properties[key] = element
+                parent[1] -= 1
+            else:
+                parent[0].__dict__["array_type"] = element
+                parent[2] = False
+        stack.append([element, property_count, has_array_type])
+        while stack and not stack[-1][1] and not stack[-1][2]:
+            stack.pop()
+    return root
+
+
+def _encode_table(table: DataNodeTable) -> bytes:
+    """Serialize the columns of a data node table."""
+    values = table.values
+    rebuilt = _rebuildable_rows(table)
+    rebuild_bits = bytearray((len(values) + 7) >> 3)
+    if rebuilt:
+        values = list(values)
+        for row in rebuilt:
+            rebuild_bits[row >> 3] |= 1 << (row & 7)
+            values[row] = None
+
+    blocks = [json.dumps(table._strings).encode('utf-8')]
+    blocks.extend(getattr(table, name).tobytes() for name, _ in _ARRAY_COLUMNS)
+    blocks.extend([bytes(table.type_codes), bytes(table.leaf_bits), bytes(table.extends_bits),
+                   bytes(rebuild_bits), json.dumps(values).encode('utf-8')])
+
+    parts = [_ROWS.pack(len(table))]
+    for block in blocks:
+        parts.append(_LENGTH.pack(len(block)))
+        parts.append(block)
+    return b"".join(parts)
+
+
+def _decode_table(payload: bytes, swap: bool) -> DataNodeTable:
+    """Rebuild a data node table from its serialized columns."""
+    (rows,) = _ROWS.unpack_from(payload, 0)
+    offset = _ROWS.size
+    blocks = []
+    while offset < len(payload):
+        (length,) = _LENGTH.unpack_from(payload, offset)
+        offset += _LENGTH.size
+        blocks.append(payload[offset:offset + length])
+        offset += length
+
+    strings_block, *array_blocks = blocks[:1 + len(_ARRAY_COLUMNS)]
+    type_codes, leaf_bits, extends_bits, rebuild_bits, values_block = blocks[1 + len(_ARRAY_COLUMNS):]
+
+    table = DataNodeTable()
+    table._strings = json.loads(strings_block)
+    table._string_ids = {string: string_id for string_id, string in enumerate(table._strings)}
+    for (name, typecode), block in zip(_ARRAY_COLUMNS, array_blocks):
+        column = array(typecode)
+        column.frombytes(block)
+        if swap:
+            column.byteswap()
+        setattr(table, name, column)
+    table.type_codes = array('B', type_codes)
+    table.leaf_bits = bytearray(leaf_bits)
+    table.extends_bits = bytearray(extends_bits)
+    table.values = json.loads(values_block)
+    if len(table.values) != rows:
+        raise ValueError("Corrupt binary schema data nodes")
+    if any(rebuild_bits):
+        _rebuild_containers(table, rebuild_bits)
+    return table
+
+
+def _child_key(table: DataNodeTable, row: int) -> str:
+    """Key of a row in its parent object: its segment without the leading dot."""
+    segment = table._strings[table.segment_ids[row]]
+    return segment[1:] if table.extends_bits[row >> 3] & (1 << (row & 7)) else segment
+
+
+def _rebuildable_rows(table: DataNodeTable) -> List[int]:
+    """
+    Return the rows whose dict or list value consists exactly of the values
+    of their child rows, in order, so it can be rebuilt from them.
+    """
+    values = table.values
+    parents = table.parents
+    candidates = {row: 0 for row, value in enumerate(values) if isinstance(value, (dict, list))}
+    if not candidates:
+        return []
+
+    broken = set()
+    for row in range(len(values)):
+        parent = parents[row]
+        if parent < 0 or parent not in candidates:
+            continue
+        container = values[parent]
+        index = candidates[parent]
+        candidates[parent] = index + 1
+        if isinstance(container, list):
+            same = index < len(container) and container[index] is values[row]
+        else:
+            same = container.get(_child_key(table, row), _MISSING) is values[row]
+        if not same:
+            broken.add(parent)
+    return [row for row, count in candidates.items() if row not in broken and count == len(values[row])]
+
+
+def _rebuild_containers(table: DataNodeTable, rebuild_bits: bytes) -> None:
+    """Refill the container values left out by _encode_table from their child rows."""
+    values = table.values
+    parents = table.parents
+    for row in range(len(values)):
+        if rebuild_bits[row >> 3] & (1 << (row & 7)):
+            values[row] = {} if table.type_codes[row] == _OBJECT_CODE else []
+        parent = parents[row]
+        if parent >= 0 and rebuild_bits[parent >> 3] & (1 << (parent & 7)):
+            container = values[parent]
+            if isinstance(container, list):
+                container.append(values[row])
+            else:
+                container[_child_key(table, row)] = values[row]
+
+
+class _LazyDataNodeTable(DataNodeTable):
+    """DataNodeTable whose columns are read from a binary schema file on first access."""
+
+    def __init__(self, file_path: str, stat: os.stat_result, section: Tuple[int, int, int, int],
+                 swap: bool, rows: int):
+        # Columns are deliberately left unset, so that accessing one goes through __getattr__
+        self._source = (file_path, stat.st_size, stat.st_mtime_ns, section, swap)
+        self._rows = rows
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") or self.__dict__.get("_source") is None:
+            raise AttributeError(name)
+        self._load()
+        return getattr(self, name)
+
+    def _load(self) -> None:
+        file_path, size, mtime_ns, section, swap = self._source
+        stat = os.stat(file_path)
+        if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+            raise ValueError(f"Schema file changed since it was loaded: {file_path}")
+        with open(file_path, 'rb') as f:
+            table = _decode_table(_read_section(f, section), swap)
+        self.__dict__.update(table.__dict__)
+        self._source = None
+
+    def __len__(self) -> int:
+        # The row count is known without reading the columns
+        return self._rows if self._source is not None else len(self.values)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        if self._source is not None:
+            self._load()
+        return dict(self.__dict__)
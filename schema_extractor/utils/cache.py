@@ -0,0 +1,212 @@
+"""
+On-disk cache of extracted schemas.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.schema import Schema
+from .mapped import MappedFile
+
+# Default bound on the total size of the cache entries
+DEFAULT_CACHE_BYTES = 1 << 30
+
+_ENTRY_SUFFIX = ".schema.pickle"
+
+# Part of every entry key; bumped when pickled schemas change shape
+_ENTRY_VERSION = 2
+
+
+class SchemaCache:
+    """
+    Directory of extracted schemas keyed by source file and extraction options.
+
+    An entry is reused while the source file keeps the size and modification
+    time it had when the schema was extracted. With `verify_hash`, the
+    content hash is compared as well: a file rewritten within the mtime
+    resolution is caught, and a file that was only touched still hits.
+
+    Every hit refreshes the entry's modification time, and after each store
+    the least recently used entries are evicted until the cache fits its
+    bounds. Entries are pickled; only point the cache at a trusted directory.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = DEFAULT_CACHE_BYTES, verify_hash: bool = False):
+        """
+        Args:
+            cache_dir: Directory holding the entries (created if missing; ~ is expanded)
+            max_entries: Maximum number of entries kept (None for no limit)
+            max_bytes: Maximum total size of the entries in bytes (None for no limit)
+            verify_hash: Compare a SHA-256 of the file content before reusing an entry
+        """
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.verify_hash = verify_hash
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, file_path: str, options: Optional[Dict[str, Any]] = None) -> Optional[Schema]:
+        """
+        Return the cached schema of a file, or None when it is missing or stale.
+
+        Args:
+            file_path: Source file the schema was extracted from
+            options: Extraction options the schema was extracted with
+
+        Returns:
+            The stored schema, or None
+        """
+        entry_path = self._entry_path(file_path, options)
+        try:
+            with open(entry_path, 'rb') as f:
+                header = pickle.load(f)
+                if not self._is_fresh(file_path, header):
+                    self.misses += 1
+                    return None
+                schema = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return schema
+
+    def stamp(self, file_path: str) -> Dict[str, Any]:
+        """
+        Record the size, modification time and (with `verify_hash`) content
+        hash of a file, to be taken before extracting it.
+        """
+        stat = os.stat(file_path)
+        return {
+            "path": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": _file_hash(file_path) if self.verify_hash else None,
+        }
+
+    def put(self, file_path: str, schema: Schema, options: Optional[Dict[str, Any]] = None,
+            stamp: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Store the schema of a file and evict entries beyond the cache bounds.
+
+        Args:
+            file_path: Source file the schema was extracted from
+            schema: Extracted schema
+            options: Extraction options the schema was extracted with
+            stamp: stamp() of the file taken before extraction, so that a
+                file modified while it was extracted is not cached as
+                unchanged (taken now when omitted)
+
+        Returns:
+            True if the schema was stored; schemas nested too deeply to be
+            pickled are skipped
+        """
+        header = stamp or self.stamp(file_path)
+        try:
+            payload = pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            return False
+
+        # Write to a temporary file and rename it, so concurrent readers and
+        # writers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.write(payload)
+            os.replace(temp_path, self._entry_path(file_path, options))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.evict()
+        return True
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits its bounds.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for entry_path, _, size in entries:
+            if ((self.max_entries is None or len(entries) - removed <= self.max_entries)
+                    and (self.max_bytes is None or total <= self.max_bytes)):
+                break
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass  # Evicted by a concurrent process
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for entry_path, _, _ in self._entries():
+            try:
+                os.remove(entry_path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hit and miss counts of this instance and the current cache size."""
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+        }
+
+    def _entries(self) -> List[Tuple[str, float, int]]:
+        """Return (path, last use, size) of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(_ENTRY_SUFFIX):
+                continue
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry_path)
+            except FileNotFoundError:
+                continue
+            entries.append((entry_path, stat.st_mtime, stat.st_size))
+        entries.sort(key=lambda entry: entry[1])
+        return entries
+
+    def _entry_path(self, file_path: str, options: Optional[Dict[str, Any]]) -> str:
+        """Return the entry path for a file and a set of extraction options."""
+        key = repr((_ENTRY_VERSION, os.path.abspath(file_path), sorted((options or {}).items())))
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + _ENTRY_SUFFIX)
+
+    def _is_fresh(self, file_path: str, header: Dict[str, Any]) -> bool:
+        """Whether the file still matches the header an entry was stored with."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        if stat.st_size != header["size"]:
+            return False
+        if not self.verify_hash:
+            return stat.st_mtime_ns == header["mtime_ns"]
+        return header["hash"] is not None and _file_hash(file_path) == header["hash"]
+
+
+def _file_hash(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    with MappedFile(file_path) as source:
+        return hashlib.sha256(source.buffer).hexdigest()
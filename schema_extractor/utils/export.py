@@ -0,0 +1,156 @@
+"""
+Streaming export of data nodes to JSON, JSON Lines and CSV files.
+
+Writers consume a node iterator and write each node as it arrives, so
+exports run in constant memory whatever the number of nodes. Output can
+be compressed with gzip, or with zstd when the zstandard package is
+installed.
+"""
+
+import csv
+import gzip
+import io
+import json
+from typing import Any, Dict, Iterable, Optional, TextIO
+
+from ..models.schema import DataNode
+
+EXPORT_FORMATS = ("json", "jsonl", "csv")
+COMPRESSIONS = ("gzip", "zstd")
+
+CSV_HEADER = ["Path", "Name", "Value", "Type", "Depth", "Is Leaf", "Parent Path"]
+
+# Characters buffered before a write reaches the (compressed) file
+_WRITE_BUFFER = 1 << 20
+
+_encode = json.JSONEncoder(default=str, ensure_ascii=False).encode
+
+
+def data_node_record(node: DataNode) -> Dict[str, Any]:
+    """Convert a data node to its JSON export representation."""
+    return {
+        "path": node.path,
+        "name": node.name,
+        "value": node.value,
+        "data_type": node.data_type.value,
+        "depth": node.depth,
+        "parent_path": node.parent_path,
+        "is_leaf": node.is_leaf,
+        "description": node.description
+    }
+
+
+def data_node_row(node: DataNode) -> list:
+    """Convert a data node to its CSV export row (see CSV_HEADER)."""
+    return [
+        node.path,
+        node.name,
+        str(node.value) if node.value is not None else "",
+        node.data_type.value,
+        node.depth,
+        node.is_leaf,
+        node.parent_path or ""
+    ]
+
+
+def compression_for(output_path: str) -> Optional[str]:
+    """Infer the compression of an output file from its extension (.gz, .zst)."""
+    lowered = output_path.lower()
+    if lowered.endswith(".gz"):
+        return "gzip"
+    if lowered.endswith((".zst", ".zstd")):
+        return "zstd"
+    return None
+
+
+def open_output(output_path: str, compression: Optional[str] = None) -> TextIO:
+    """
+    Open a text file for writing, compressing what is written to it.
+
+    Args:
+        output_path: Path of the file to create
+        compression: None, "gzip" or "zstd"
+
+    Returns:
+        Buffered text stream encoding UTF-8; closing it closes the file
+    """
+    if compression is None:
+        return open(output_path, 'w', encoding='utf-8', newline='', buffering=_WRITE_BUFFER)
+
+    if compression == "gzip":
+        # Level 6 keeps gzip from dominating the cost of an export
+        raw = gzip.open(output_path, 'wb', compresslevel=6)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression requires the zstandard package (pip install zstandard)")
+        raw = zstandard.ZstdCompressor().stream_writer(open(output_path, 'wb'), closefd=True)
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+    return io.TextIOWrapper(io.BufferedWriter(raw, _WRITE_BUFFER), encoding='utf-8', newline='')
+
+
+def write_data_nodes(data_nodes: Iterable[DataNode], output: TextIO, format: str = "json") -> int:
+    """
+    Write data nodes to a text stream as they are generated.
+
+    Args:
+        data_nodes: Data nodes, typically a lazy iterator
+        output: Text stream to write to
+        format: "json" (an array with one node object per line), "jsonl"
+            (one node object per line) or "csv" (see CSV_HEADER)
+
+    Returns:
+        Number of nodes written
+    """
+    write = output.write
+    count = 0
+
+    if format == "json":
+        separator = "[\n"
+        for node in data_nodes:
+            write(separator)
+            write(_encode(data_node_record(node)))
+            separator = ",\n"
+            count += 1
+        write("\n]\n" if count else "[]\n")
+
+    elif format == "jsonl":
+        for node in data_nodes:
+            write(_encode(data_node_record(node)))
+            write("\n")
+            count += 1
+
+    elif format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(CSV_HEADER)
+        writerow = writer.writerow
+        for node in data_nodes:
+            writerow(data_node_row(node))
+            count += 1
+
+    else:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    return count
+
+
+def export_data_nodes(data_nodes: Iterable[DataNode], output_path: str, format: str = "json",
+                      compression: Optional[str] = None) -> int:
+    """
+    Stream data nodes to a file.
+
+    Args:
+        data_nodes: Data nodes, typically a lazy iterator
+        output_path: Path of the file to create
+        format: "json", "jsonl" or "csv"
+        compression: None, "gzip" or "zstd"
+
+    Returns:
+        Number of nodes written
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+    with open_output(output_path, compression) as output:
+        return write_data_nodes(data_nodes, output, format)
@@ -2,24 +2,151 @@
 Helper functions for schema extraction and validation.
 """
 
+import gc
+import io
+import itertools
 import os
 import json
-import xml.etree.ElementTree as ET
-from typing import Dict, Any, Optional
-from jsonschema import validate as jsonschema_validate, ValidationError
+import mmap
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, TextIO, Union
 
 from ..models.schema import Schema
+from ..parsers.json_events import iter_json_events, JSONValueBuilder
+from .mapped import MappedFile, map_input
+from .binary import is_binary_schema, load_binary_schema, save_binary_schema
+from ..validators.compiled import CompiledValidator, SchemaViolation, compile_validator
+from ..validators.xml_validator import compile_xml_validator
 
 
-def detect_file_type(file_path: str) -> str:
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector while building large object graphs.
+    
+    Extraction allocates millions of long-lived objects and no reference
+    cycles, so collections triggered along the way only rescan the growing
+    result. The previous collector state is restored on exit.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def load_json(fp: TextIO) -> Any:
+    """
+    Parse a JSON document from a file object.
+    
+    Documents nested deeper than json.load can handle (it recurses once per
+    level) are parsed again with the iterative event parser.
+    
+    Args:
+        fp: Seekable text file object positioned at the document
+        
+    Returns:
+        The parsed document
+    """
+    start = fp.tell()
+    try:
+        return json.load(fp)
+    except RecursionError:
+        fp.seek(start)
+        builder = JSONValueBuilder()
+        for event, value in iter_json_events(fp):
+            builder.feed(event, value)
+        return builder.value
+
+
+def loads_json(text: str) -> Any:
+    """
+    Parse a JSON document from a string, however deeply nested.
+    
+    Args:
+        text: The JSON document
+        
+    Returns:
+        The parsed document
+    """
+    try:
+        return json.loads(text)
+    except RecursionError:
+        return load_json(io.StringIO(text))
+
+
+def _load_record(line: bytes) -> Any:
+    """Parse one JSON Lines record, however deeply nested."""
+    try:
+        return json.loads(line)
+    except RecursionError:
+        return loads_json(line.decode('utf-8'))
+
+
+def dump_json(obj: Any, fp: TextIO, indent: int = 2, ensure_ascii: bool = False) -> None:
+    """
+    Write `obj` to a file object as json.dump(obj, fp, indent=indent) would.
+    
+    Containers are written from an explicit stack instead of recursively, so
+    arbitrarily deep documents can be written.
+    
+    Args:
+        obj: JSON-serializable object
+        fp: Text file object to write to
+        indent: Number of spaces per nesting level
+        ensure_ascii: Escape non-ASCII characters
+    """
+    write = fp.write
+    stack = []  # [items iterator, is_dict, level, first item pending]
+    
+    def begin(value: Any, level: int) -> None:
+        if isinstance(value, dict):
+            if not value:
+                write("{}")
+                return
+            write("{")
+            stack.append([iter(value.items()), True, level + 1, True])
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                write("[]")
+                return
+            write("[")
+            stack.append([iter(value), False, level + 1, True])
+        else:
+            write(json.dumps(value, ensure_ascii=ensure_ascii))
+    
+    begin(obj, 0)
+    end = object()
+    while stack:
+        frame = stack[-1]
+        item = next(frame[0], end)
+        if item is end:
+            stack.pop()
+            write("\n" + " " * (indent * (frame[2] - 1)) + ("}" if frame[1] else "]"))
+            continue
+        
+        write(("\n" if frame[3] else ",\n") + " " * (indent * frame[2]))
+        frame[3] = False
+        if frame[1]:
+            key, item = item
+            if not isinstance(key, str):
+                key = json.dumps(key)
+            write(json.dumps(key, ensure_ascii=ensure_ascii) + ": ")
+        begin(item, frame[2])
+
+
+def detect_file_type(file_path: str, mapped: Optional[MappedFile] = None) -> str:
     """
     Detect the file type based on extension and content.
     
     Args:
         file_path: Path to the file
+        mapped: Mapping of the file to sniff, when the caller already holds one
         
     Returns:
-        File type: "xml", "json", or "unknown"
+        File type: "xml", "json", "jsonl" (JSON Lines), or "unknown"
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
@@ -31,96 +158,144 @@ def detect_file_type(file_path: str) -> str:
         return "xml"
     elif ext in ['.json', '.js']:
         return "json"
+    elif ext in ['.jsonl', '.ndjson']:
+        return "jsonl"
     
     # Try to detect by content
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read(1024).strip()
-        
-        if content.startswith('<?xml') or content.startswith('<'):
-            return "xml"
-        elif content.startswith('{') or content.startswith('['):
-            return "json"
+        with map_input(file_path, mapped) as source:
+            head = source.head(1024)
+            content = head.decode('utf-8', errors='ignore').strip()
+            
+            if content.startswith('<?xml') or content.startswith('<'):
+                return "xml"
+            elif content.startswith('{') or content.startswith('['):
+                start = len(head) - len(head.lstrip())
+                return "jsonl" if _looks_like_json_lines(source.buffer, start) else "json"
     except Exception:
         pass
     
     return "unknown"
 
 
-def validate_schema(file_path: str, schema: Schema) -> bool:
+def _looks_like_json_lines(data: Union[mmap.mmap, bytes], start: int) -> bool:
+    """
+    Whether a file's first line (from `start`) is a complete JSON value
+    followed by another line.
+    
+    The first line is read up to its newline, however long the record.
+    """
+    newline = data.find(b"\n", start)
+    if newline < 0 or not data[newline + 1:newline + 1025].split(b"\n", 1)[0].strip():
+        return False
+    try:
+        _load_record(data[start:newline])
+    except ValueError:
+        return False
+    return True
+
+
+def validate_schema(file_path: str, schema: Schema, streaming: bool = False) -> bool:
     """
     Validate a file against a schema.
     
     Args:
         file_path: Path to the file to validate
         schema: Schema object to validate against
+        streaming: Check JSON documents from parse events instead of
+            loading them (XML and JSON Lines files are always streamed)
         
     Returns:
         True if valid, False otherwise
     """
     try:
-        file_type = detect_file_type(file_path)
-        
-        if file_type == "xml":
-            return _validate_xml_against_schema(file_path, schema)
-        elif file_type == "json":
-            return _validate_json_against_schema(file_path, schema)
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+        errors = find_violations(file_path, schema, limit=1, streaming=streaming)
+        if errors:
+            print(f"Validation error: {errors[0]}")
+            return False
+        return True
     
     except Exception as e:
         print(f"Validation error: {e}")
         return False
 
 
-def _validate_xml_against_schema(file_path: str, schema: Schema) -> bool:
-    """Validate XML file against schema."""
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+def find_violations(file_path: str, schema: Schema, limit: Optional[int] = None,
+                    streaming: bool = False) -> List[SchemaViolation]:
+    """
+    Collect the violations of a file against a schema (auto-detects file type).
+    
+    Validators are compiled once per schema object and reused across calls.
+    JSON Lines records are rooted at "root[i]", like their data nodes.
+    
+    Args:
+        file_path: Path to the XML, JSON or JSON Lines file
+        schema: Schema object to validate against
+        limit: Maximum number of violations collected; validation stops
+            once it is reached
+        streaming: Check JSON documents from parse events instead of
+            loading them
         
-        # Basic validation - check if root element matches
-        if schema.root_element and root.tag != schema.root_element.name:
-            print(f"Root element mismatch: expected {schema.root_element.name}, got {root.tag}")
-            return False
+    Returns:
+        The violations, empty if the file is valid
         
-        # TODO: Implement more comprehensive XML validation
-        return True
-    
-    except Exception as e:
-        print(f"XML validation error: {e}")
-        return False
+    Raises:
+        ValueError: If the file type is unsupported
+    """
+    with MappedFile(file_path) as source:
+        file_type = detect_file_type(file_path, source)
+        
+        if file_type == "xml":
+            return compile_xml_validator(schema).errors(file_path, limit, mapped=source)
+        elif file_type == "json":
+            return _json_violations(source, compile_validator(schema), limit, streaming)
+        elif file_type == "jsonl":
+            return _jsonl_violations(source, compile_validator(schema), limit)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
 
 
-def _validate_json_against_schema(file_path: str, schema: Schema) -> bool:
-    """Validate JSON file against schema."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Convert schema to JSON Schema format
-        json_schema = schema.to_json_schema()
-        
-        # Validate using jsonschema library
-        jsonschema_validate(instance=data, schema=json_schema)
-        return True
+def _json_violations(source: MappedFile, validator: CompiledValidator, limit: Optional[int],
+                     streaming: bool) -> List[SchemaViolation]:
+    """Collect the violations of a JSON document, optionally without loading it."""
+    if not streaming:
+        return validator.errors(loads_json(source.text()), limit)
     
-    except ValidationError as e:
-        print(f"JSON validation error: {e}")
-        return False
-    except Exception as e:
-        print(f"JSON validation error: {e}")
-        return False
+    violations = validator.iter_event_errors(iter_json_events(source.text_reader()))
+    try:
+        return list(itertools.islice(violations, limit))
+    finally:
+        violations.close()
+
+
+def _jsonl_violations(source: MappedFile, validator: CompiledValidator,
+                      limit: Optional[int]) -> List[SchemaViolation]:
+    """Collect the violations of the records of a JSON Lines file."""
+    errors = []
+    index = 0
+    for _, line in source.iter_lines():
+        if line.isspace():
+            continue
+        record = _load_record(line)
+        if not validator.is_valid(record):
+            remaining = None if limit is None else limit - len(errors)
+            errors.extend(validator.errors(record, remaining, root_path=f"root[{index}]"))
+            if limit is not None and len(errors) >= limit:
+                break
+        index += 1
+    return errors
 
 
-def save_schema(schema: Schema, output_path: str, format: str = "json") -> None:
+def save_schema(schema: Schema, output_path: str, format: str = "json",
+                compression: Optional[str] = "zlib") -> None:
     """
     Save schema to a file.
     
     Args:
         schema: Schema object to save
         output_path: Path to save the schema
-        format: Output format ("json", "xsd", or "dict")
+        format: Output format ("json", "xsd", "dict" or "binary")
+        compression: Section compression of the binary format ("zlib" or None)
     """
     # Create directory if it doesn't exist
     output_dir = os.path.dirname(output_path)
@@ -129,7 +304,7 @@ def save_schema(schema: Schema, output_path: str, format: str = "json") -> None:
     
     if format.lower() == "json":
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(schema.to_dict(), f, indent=2, ensure_ascii=False)
+            dump_json(schema.to_dict(), f, indent=2, ensure_ascii=False)
     
     elif format.lower() == "xsd":
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -137,7 +312,10 @@ def save_schema(schema: Schema, output_path: str, format: str = "json") -> None:
     
     elif format.lower() == "dict":
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(schema.to_dict(), f, indent=2, ensure_ascii=False)
+            dump_json(schema.to_dict(), f, indent=2, ensure_ascii=False)
+    
+    elif format.lower() == "binary":
+        save_binary_schema(schema, output_path, compression)
     
     else:
         raise ValueError(f"Unsupported format: {format}")
@@ -151,13 +329,16 @@ def load_schema(file_path: str) -> Schema:
         file_path: Path to the schema file
         
     Returns:
-        Schema object
+        Schema object; the data nodes of a binary schema are read on first access
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Schema file not found: {file_path}")
     
+    if is_binary_schema(file_path):
+        return load_binary_schema(file_path)
+    
     with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+        data = load_json(f)
     
     return Schema.model_validate(data)
 
@@ -0,0 +1,193 @@
+"""
+Memory-mapped, read-only access to input files.
+
+A MappedFile maps a file once and serves content sniffing, whole-document
+parsing, incremental reads and line-aligned splitting from that mapping, so
+the bytes are read through the page cache instead of being copied into
+Python buffers first.
+"""
+
+import codecs
+import io
+import mmap
+import os
+from contextlib import nullcontext
+from typing import BinaryIO, ContextManager, Iterator, List, Optional, Tuple, Union
+
+
+class MappedFile:
+    """
+    Read-only memory mapping of a file.
+
+    Use as a context manager; the mapping is released on exit. Empty files,
+    which cannot be mapped, behave as an empty buffer.
+    """
+
+    def __init__(self, file_path: str):
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # The mapping stays valid after the descriptor is closed
+            self._map: Union[mmap.mmap, bytes] = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+            )
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._map = b""
+
+    @property
+    def buffer(self) -> Union[mmap.mmap, bytes]:
+        """The mapped bytes; slicing copies only the slice."""
+        return self._map
+
+    def head(self, length: int) -> bytes:
+        """Return the first `length` bytes."""
+        return self._map[:length]
+
+    def text(self) -> str:
+        """Decode the whole file as UTF-8 straight from the mapping."""
+        return str(self._map, 'utf-8')
+
+    def view(self) -> memoryview:
+        """
+        Return a zero-copy view of the mapping.
+
+        The view must be released (or used as a context manager) before the
+        file is closed.
+        """
+        return memoryview(self._map)
+
+    def reader(self) -> BinaryIO:
+        """Return a binary file object reading from the start of the mapping."""
+        if isinstance(self._map, mmap.mmap):
+            return _MappedReader(self._map)
+        return io.BytesIO(self._map)
+
+    def text_reader(self) -> "_MappedTextReader":
+        """Return a text file object decoding the mapping as UTF-8 as it is read."""
+        return _MappedTextReader(self._map)
+
+    def iter_lines(self, start: int = 0, end: int = -1) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yield (offset, line) for every line starting in [start, end).
+
+        Lines keep their terminating newline. `start` should be a line
+        boundary; an `end` of -1 means the end of the file.
+        """
+        data = self._map
+        find = data.find
+        end = self.size if end < 0 else min(end, self.size)
+        offset = start
+        while offset < end:
+            newline = find(b"\n", offset)
+            stop = self.size if newline < 0 else newline + 1
+            yield offset, data[offset:stop]
+            offset = stop
+
+    def line_ranges(self, parts: int, min_size: int = 0) -> List[Tuple[int, int]]:
+        """
+        Split the file into up to `parts` byte ranges that start at line boundaries.
+
+        Args:
+            parts: Number of ranges wanted
+            min_size: Minimum length of every range but the last
+
+        Returns:
+            Consecutive (start, end) pairs covering the whole file
+        """
+        size = self.size
+        if min_size:
+            parts = min(parts, size // min_size)
+        parts = max(1, parts)
+
+        find = self._map.find
+        bounds = [0]
+        for i in range(1, parts):
+            newline = find(b"\n", max(size * i // parts, bounds[-1]))
+            if newline < 0 or newline + 1 >= size:
+                break
+            if newline + 1 > bounds[-1]:
+                bounds.append(newline + 1)
+        bounds.append(size)
+        return list(zip(bounds, bounds[1:]))
+
+
+class _MappedReader(io.RawIOBase):
+    """Binary file object over a mapping with its own position."""
+
+    def __init__(self, data: mmap.mmap):
+        self._data = data
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = (0, self._pos, len(self._data))[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        start = self._pos
+        stop = len(self._data) if size is None or size < 0 else min(start + size, len(self._data))
+        self._pos = max(start, stop)
+        return self._data[start:stop]
+
+    def readinto(self, buffer) -> int:
+        chunk = self.read(len(buffer))
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class _MappedTextReader:
+    """Text file object decoding a mapping incrementally, for the event parser."""
+
+    def __init__(self, data: Union[mmap.mmap, bytes]):
+        self._data = data
+        self._pos = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def read(self, size: int = -1) -> str:
+        data = self._data
+        start = self._pos
+        if size is None or size < 0:
+            self._pos = len(data)
+            return self._decoder.decode(data[start:], final=True)
+
+        # Decoding n bytes never yields more than n characters; keep reading
+        # while multi-byte characters leave the result short
+        chunks = []
+        wanted = size
+        while wanted > 0 and self._pos < len(data):
+            stop = min(self._pos + wanted, len(data))
+            chunk = self._decoder.decode(data[self._pos:stop], final=stop == len(data))
+            self._pos = stop
+            chunks.append(chunk)
+            wanted -= len(chunk)
+        return "".join(chunks)
+
+
+def map_input(file_path: str, mapped: Optional[MappedFile] = None) -> ContextManager[MappedFile]:
+    """
+    Map `file_path` for the duration of a with block, or reuse `mapped`.
+
+    A mapping passed in by the caller is left open on exit.
+    """
+    return nullcontext(mapped) if mapped is not None else MappedFile(file_path)
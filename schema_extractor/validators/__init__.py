@@ -0,0 +1,8 @@
+"""
+Validation of documents against extracted schemas.
+"""
+
+from .compiled import CompiledValidator, SchemaViolation, compile_validator
+from .xml_validator import XMLValidator, compile_xml_validator
+
+__all__ = ["CompiledValidator", "SchemaViolation", "compile_validator", "XMLValidator", "compile_xml_validator"]
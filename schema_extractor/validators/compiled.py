@@ -0,0 +1,448 @@
+"""
+Validators compiled once from a Schema and reused for many documents.
+"""
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from numbers import Number
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+
+from ..models.schema import Schema
+
+# Compiled validators kept by compile_validator(), keyed by schema fingerprint
+VALIDATOR_CACHE_SIZE = 32
+
+_validator_cache: "OrderedDict[Tuple[bytes, str], Any]" = OrderedDict()
+
+
+class SchemaViolation:
+    """One way in which a document does not match a schema."""
+    __slots__ = ("path", "message")
+
+    def __init__(self, path: str, message: str):
+        self.path = path  # Location in the document, e.g. "root.items[2].id"
+        self.message = message
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, SchemaViolation) and (self.path, self.message) == (other.path, other.message)
+
+    def __hash__(self) -> int:
+        return hash((self.path, self.message))
+
+    def __repr__(self) -> str:
+        return f"SchemaViolation({self.path!r}, {self.message!r})"
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+
+class CompiledValidator:
+    """
+    Validates parsed JSON documents against the JSON Schema of a Schema.
+
+    The schema is translated once, either into a tree of checks walked
+    with an explicit stack ("native", the default) or into a jsonschema
+    validator instance ("jsonschema"). Both accept exactly the documents
+    that jsonschema accepts for Schema.to_json_schema(), and report the
+    same violations.
+    """
+
+    def __init__(self, schema: Schema, backend: str = "native"):
+        """
+        Args:
+            schema: Schema to validate against; changes made to it later
+                are not seen by the validator
+            backend: "native" or "jsonschema"
+        """
+        if backend not in ("native", "jsonschema"):
+            raise ValueError(f"Unsupported validator backend: {backend}")
+
+        self.backend = backend
+        self.json_schema = schema.to_json_schema()
+        # Parse event streams are always checked against the compiled tree
+        self._root = _compile(self.json_schema)
+        if backend == "jsonschema":
+            validator_class = validator_for(self.json_schema)
+            validator_class.check_schema(self.json_schema)
+            self._validator = validator_class(self.json_schema)
+
+    def is_valid(self, document: Any) -> bool:
+        """Return whether a document is valid, stopping at the first violation."""
+        if self.backend == "jsonschema":
+            return self._validator.is_valid(document)
+        return _is_valid(self._root, document)
+
+    def iter_errors(self, document: Any, root_path: str = "root") -> Iterator[SchemaViolation]:
+        """
+        Yield every violation in a document.
+
+        Args:
+            document: Parsed JSON document
+            root_path: Path of the document root, e.g. "root[3]" for a record
+
+        Yields:
+            SchemaViolation objects, each with the path of the offending value
+        """
+        if self.backend == "jsonschema":
+            for error in self._validator.iter_errors(document):
+                yield SchemaViolation(_format_path(error.absolute_path, root_path), error.message)
+            return
+        yield from _violations(self._root, document, root_path)
+
+    def iter_event_errors(self, events: Iterable[Tuple[str, Any]],
+                          root_path: str = "root") -> Iterator[SchemaViolation]:
+        """
+        Yield the violations of a document given as parse events, as they arrive.
+
+        Each value is checked as soon as its event is read, so only the open
+        containers are held and documents larger than memory can be
+        validated. Missing required properties are reported when their
+        object ends, and containers of the wrong type are shown as {...} or
+        [...] in the messages; otherwise the violations are those of
+        iter_errors(). Both backends check events with the compiled tree.
+
+        Args:
+            events: (event, value) tuples as produced by iter_json_events
+            root_path: Path of the document root
+
+        Yields:
+            SchemaViolation objects, each with the path of the offending value
+        """
+        yield from _event_violations(self._root, events, root_path)
+
+    def errors(self, document: Any, limit: Optional[int] = None, root_path: str = "root") -> List[SchemaViolation]:
+        """
+        Collect the violations in a document.
+
+        Valid documents are recognized by the fast check alone; the
+        violations are only collected for invalid ones.
+
+        Args:
+            document: Parsed JSON document
+            limit: Maximum number of violations collected
+            root_path: Path of the document root
+
+        Returns:
+            The violations, empty if the document is valid
+        """
+        if self.is_valid(document):
+            return []
+        errors = []
+        for error in self.iter_errors(document, root_path):
+            errors.append(error)
+            if limit is not None and len(errors) >= limit:
+                break
+        return errors
+
+    def validate(self, document: Any) -> None:
+        """
+        Raise jsonschema.ValidationError for the first violation in a document.
+
+        Args:
+            document: Parsed JSON document
+        """
+        if self.backend == "jsonschema":
+            self._validator.validate(document)
+            return
+        error = next(self.iter_errors(document), None)
+        if error is not None:
+            raise ValidationError(f"{error.message} (at {error.path})")
+
+
+def compile_validator(schema: Schema, backend: str = "native") -> CompiledValidator:
+    """
+    Return a validator for a schema, reusing the one compiled for an
+    identical element tree by an earlier call.
+
+    The most recently used VALIDATOR_CACHE_SIZE validators are kept.
+
+    Args:
+        schema: Schema to validate against
+        backend: "native" or "jsonschema"
+
+    Returns:
+        The compiled validator
+    """
+    return cached_validator(schema, backend, lambda: CompiledValidator(schema, backend))
+
+
+def cached_validator(schema: Schema, kind: str, build: Callable[[], Any]) -> Any:
+    """
+    Return the validator of a kind cached for a schema, building it with
+    `build` on a miss.
+
+    Validators are keyed by a fingerprint of the element tree, so a schema
+    changed in place gets a new validator. The most recently used
+    VALIDATOR_CACHE_SIZE validators are kept.
+    """
+    key = (_fingerprint(schema), kind)
+    validator = _validator_cache.get(key)
+    if validator is not None:
+        _validator_cache.move_to_end(key)
+        return validator
+
+    validator = build()
+    _validator_cache[key] = validator
+    _validator_cache.move_to_end(key)
+    while len(_validator_cache) > VALIDATOR_CACHE_SIZE:
+        _validator_cache.popitem(last=False)
+    return validator
+
+
+def _fingerprint(schema: Schema) -> bytes:
+    """
+    Digest the element tree of a schema, which is all that validators are
+    compiled from.
+
+    Elements are digested one at a time in preorder, each with its property
+    names, so deeply nested trees need no recursion.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    stack = [schema.root_element] if schema.root_element is not None else []
+    while stack:
+        element = stack.pop()
+        dumped = element._dump_shallow("json")
+        dumped["properties"] = list(element.properties)
+        dumped["array_type"] = element.array_type is not None
+        digest.update(json.dumps(dumped, sort_keys=True).encode('utf-8'))
+        if element.array_type is not None:
+            stack.append(element.array_type)
+        stack.extend(reversed(element.properties.values()))
+    return digest.digest()
+
+
+class _Node:
+    """Checks compiled from one JSON Schema (sub)schema."""
+    __slots__ = ("type_name", "type_check", "minimum", "maximum", "min_length", "max_length",
+                 "pattern", "properties", "required", "items")
+
+    def __init__(self):
+        self.type_name = None  # Quoted as in messages, e.g. "'integer', 'null'"
+        self.type_check = None
+        self.minimum = None
+        self.maximum = None
+        self.min_length = None
+        self.max_length = None
+        self.pattern = None
+        self.properties: Dict[str, "_Node"] = {}
+        self.required: List[str] = []
+        self.items: Optional["_Node"] = None
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, float) and value.is_integer()
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+# JSON Schema type checks, as jsonschema's default type checker defines them
+_TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "null": lambda value: value is None,
+}
+
+
+def _compile(json_schema: Dict[str, Any]) -> _Node:
+    """Compile the subset of JSON Schema produced by Schema.to_json_schema()."""
+    root = _Node()
+    stack = [(json_schema, root)]
+    while stack:
+        subschema, node = stack.pop()
+        type_name = subschema.get("type")
+        if isinstance(type_name, list):
+            # A nullable type, e.g. ["integer", "null"]
+            checks = [_TYPE_CHECKS[name] for name in type_name]
+            node.type_name = ", ".join(repr(name) for name in type_name)
+            node.type_check = lambda value, checks=checks: any(check(value) for check in checks)
+        elif type_name is not None:
+            node.type_name = repr(type_name)
+            node.type_check = _TYPE_CHECKS[type_name]
+        node.minimum = subschema.get("minimum")
+        node.maximum = subschema.get("maximum")
+        node.min_length = subschema.get("minLength")
+        node.max_length = subschema.get("maxLength")
+        if "pattern" in subschema:
+            node.pattern = re.compile(subschema["pattern"])
+        node.required = list(subschema.get("required", ()))
+
+        for name, property_schema in subschema.get("properties", {}).items():
+            child = node.properties[name] = _Node()
+            stack.append((property_schema, child))
+        if "items" in subschema:
+            node.items = _Node()
+            stack.append((subschema["items"], node.items))
+    return root
+
+
+def _is_valid(root: _Node, document: Any) -> bool:
+    """Check a document, stopping at the first violation."""
+    stack = [(root, document)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node, value = pop()
+
+        if node.type_check is not None and not node.type_check(value):
+            return False
+        if isinstance(value, str):
+            if (node.min_length is not None or node.max_length is not None or node.pattern is not None) \
+                    and next(_string_problems(node, value), None) is not None:
+                return False
+        elif node.minimum is not None or node.maximum is not None:
+            if _is_number(value) and next(_number_problems(node, value), None) is not None:
+                return False
+
+        if isinstance(value, dict):
+            for name in node.required:
+                if name not in value:
+                    return False
+            properties = node.properties
+            if properties:
+                for name, item in value.items():
+                    child = properties.get(name)
+                    if child is not None:
+                        push((child, item))
+        elif isinstance(value, list) and node.items is not None:
+            items = node.items
+            for item in value:
+                push((items, item))
+    return True
+
+
+def _violations(root: _Node, document: Any, root_path: str) -> Iterator[SchemaViolation]:
+    """Yield the violations of a document, depth first, in document order."""
+    stack = [(root, document, root_path)]
+    while stack:
+        node, value, path = stack.pop()
+
+        if node.type_check is not None and not node.type_check(value):
+            yield SchemaViolation(path, f"{value!r} is not of type {node.type_name}")
+        if isinstance(value, str):
+            for message in _string_problems(node, value):
+                yield SchemaViolation(path, message)
+        elif _is_number(value):
+            for message in _number_problems(node, value):
+                yield SchemaViolation(path, message)
+
+        if isinstance(value, dict):
+            for name in node.required:
+                if name not in value:
+                    yield SchemaViolation(path, f"{name!r} is a required property")
+            properties = node.properties
+            children = [(properties[name], item, f"{path}.{name}")
+                        for name, item in value.items() if name in properties]
+            stack.extend(reversed(children))
+        elif isinstance(value, list) and node.items is not None:
+            items = node.items
+            stack.extend((items, value[i], f"{path}[{i}]") for i in range(len(value) - 1, -1, -1))
+
+
+class _EventFrame:
+    """Open object or array on the event validation stack."""
+    __slots__ = ("node", "path", "key", "index", "missing")
+
+    def __init__(self, node: Optional[_Node], path: str, is_object: bool):
+        self.node = node  # None when the container is not constrained
+        self.path = path
+        self.key = None  # Current key of an object; always None in an array
+        self.index = 0  # Index of the next array item
+        # Required properties not seen yet, for objects only
+        self.missing = set(node.required) if is_object and node is not None and node.required else None
+
+
+# Stand-ins for containers whose type is checked at their start event
+_CONTAINER_SAMPLES = {"start_map": ({}, "{...}"), "start_array": ([], "[...]")}
+
+
+def _event_violations(root: _Node, events: Iterable[Tuple[str, Any]], root_path: str) -> Iterator[SchemaViolation]:
+    """Yield the violations of a document from its parse events."""
+    stack: List[_EventFrame] = []
+    for event, value in events:
+        if event == "map_key":
+            frame = stack[-1]
+            frame.key = value
+            if frame.missing:
+                frame.missing.discard(value)
+            continue
+
+        if event == "end_map" or event == "end_array":
+            frame = stack.pop()
+            if frame.missing:
+                node = frame.node
+                for name in node.required:
+                    if name in frame.missing:
+                        yield SchemaViolation(frame.path, f"{name!r} is a required property")
+            continue
+
+        # Every other event starts a value: find the node that constrains it
+        if not stack:
+            node = root
+            path = root_path
+        else:
+            parent = stack[-1]
+            parent_node = parent.node
+            if parent.key is not None:
+                node = parent_node.properties.get(parent.key) if parent_node is not None else None
+                path = f"{parent.path}.{parent.key}" if node is not None else None
+            else:
+                node = parent_node.items if parent_node is not None else None
+                path = f"{parent.path}[{parent.index}]" if node is not None else None
+                parent.index += 1
+
+        sample = _CONTAINER_SAMPLES.get(event)
+        if sample is not None:
+            if node is not None and node.type_check is not None and not node.type_check(sample[0]):
+                yield SchemaViolation(path, f"{sample[1]} is not of type {node.type_name}")
+            stack.append(_EventFrame(node, path, event == "start_map"))
+            continue
+
+        if node is None:
+            continue
+        if node.type_check is not None and not node.type_check(value):
+            yield SchemaViolation(path, f"{value!r} is not of type {node.type_name}")
+        if isinstance(value, str):
+            for message in _string_problems(node, value):
+                yield SchemaViolation(path, message)
+        elif _is_number(value):
+            for message in _number_problems(node, value):
+                yield SchemaViolation(path, message)
+
+
+def _string_problems(node: _Node, value: str) -> Iterator[str]:
+    if node.min_length is not None and len(value) < node.min_length:
+        yield f"{value!r} is too short"
+    if node.max_length is not None and len(value) > node.max_length:
+        yield f"{value!r} is too long"
+    if node.pattern is not None and not node.pattern.search(value):
+        yield f"{value!r} does not match {node.pattern.pattern!r}"
+
+
+def _number_problems(node: _Node, value: Any) -> Iterator[str]:
+    if node.minimum is not None and value < node.minimum:
+        yield f"{value!r} is less than the minimum of {node.minimum!r}"
+    if node.maximum is not None and value > node.maximum:
+        yield f"{value!r} is greater than the maximum of {node.maximum!r}"
+
+
+def _format_path(parts: Any, root_path: str = "root") -> str:
+    """Render a jsonschema error path like the data node paths, e.g. "root.items[2].id"."""
+    path = root_path
+    for part in parts:
+        path += f"[{part}]" if isinstance(part, int) else f".{part}"
+    return path
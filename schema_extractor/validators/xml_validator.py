@@ -0,0 +1,204 @@
+"""
+Streaming structural validation of XML files against extracted schemas.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+from lxml import etree
+
+from ..models.schema import Schema, SchemaElement, DataType
+from ..utils.mapped import MappedFile, map_input
+from .compiled import SchemaViolation, cached_validator
+
+# Values accepted for each inferred type, using the patterns XMLExtractor infers
+# types with; a float also accepts integers. Types missing here accept any value.
+_VALUE_PATTERNS: Dict[DataType, Pattern] = {
+    DataType.INTEGER: re.compile(r'^-?\d+$'),
+    DataType.FLOAT: re.compile(r'^-?\d+(\.\d+)?$'),
+    DataType.BOOLEAN: re.compile(r'^(true|false|yes|no|1|0)$', re.IGNORECASE),
+    DataType.DATE: re.compile(r'^\d{4}-\d{2}-\d{2}$'),
+    DataType.DATETIME: re.compile(r'^\d{4}-\d{2}-\d{2}[T\s]\d{2}:\d{2}:\d{2}'),
+}
+
+
+class XMLValidator:
+    """
+    Validates XML files against the element tree of an XML Schema.
+
+    Every element must be declared as a child of its parent, elements that
+    were never repeated may occur only once, required child elements and
+    attributes must be present, undeclared attributes are rejected, and
+    attribute values and typed text content must match their inferred
+    types. Files are read with iterparse and every element is cleared once
+    it ends, so memory is bounded by the nesting depth.
+    """
+
+    def __init__(self, schema: Schema):
+        """
+        Args:
+            schema: Schema extracted from XML to validate against; changes
+                made to it later are not seen by the validator
+        """
+        if schema.root_element is None:
+            raise ValueError("Schema has no root element")
+        self._root = _compile(schema.root_element)
+
+    def iter_errors(self, file_path: str, mapped: Optional[MappedFile] = None) -> Iterator[SchemaViolation]:
+        """
+        Yield every violation in an XML file, in document order.
+
+        Elements that are not declared are reported once; their content is
+        not validated further.
+
+        Args:
+            file_path: Path to the XML file
+            mapped: Mapping of the file to read from, when the caller
+                already holds one
+
+        Yields:
+            SchemaViolation objects, with paths like "catalog.book[2]@id"
+        """
+        root = self._root
+        # Open elements as (compiled node or None when undeclared, path, child tag counts)
+        stack: List[Tuple[Optional[_XMLNode], str, Dict[str, int]]] = []
+
+        with map_input(file_path, mapped) as source:
+            for event, element in etree.iterparse(source.reader(), events=("start", "end"), huge_tree=True):
+                if event == "start":
+                    tag = element.tag
+                    node = None
+                    if not stack:
+                        path = tag
+                        if tag == root.name:
+                            node = root
+                        else:
+                            yield SchemaViolation(path, f"{tag!r} is not the root element {root.name!r}")
+                    else:
+                        parent, parent_path, counts = stack[-1]
+                        path = f"{parent_path}.{tag}"
+                        if parent is not None:
+                            count = counts.get(tag, 0)
+                            counts[tag] = count + 1
+                            child = parent.children.get(tag)
+                            if child is None:
+                                yield SchemaViolation(path, f"unexpected element {tag!r}")
+                            else:
+                                node, repeated = child
+                                if repeated:
+                                    path = f"{path}[{count}]"
+                                elif count == 1:
+                                    yield SchemaViolation(path, f"element {tag!r} occurs more than once")
+
+                    if node is not None:
+                        yield from _attribute_problems(node, element.attrib, path)
+                    stack.append((node, path, {}))
+                    continue
+
+                node, path, counts = stack.pop()
+                if node is not None:
+                    text = element.text.strip() if element.text else ""
+                    if text and node.text_pattern is not None and not node.text_pattern.match(text):
+                        yield SchemaViolation(f"{path}#text", f"{text!r} is not of type {node.text_type.value!r}")
+                    for name in node.required_children:
+                        if name not in counts:
+                            yield SchemaViolation(path, f"{name!r} is a required element")
+
+                # Release the finished subtree and any processed siblings
+                element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None:  # The root's siblings are prolog comments and PIs
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    def errors(self, file_path: str, limit: Optional[int] = None,
+               mapped: Optional[MappedFile] = None) -> List[SchemaViolation]:
+        """
+        Collect the violations in an XML file.
+
+        Args:
+            file_path: Path to the XML file
+            limit: Maximum number of violations collected; parsing stops
+                once it is reached
+            mapped: Mapping of the file to read from
+
+        Returns:
+            The violations, empty if the file is valid
+        """
+        errors = []
+        violations = self.iter_errors(file_path, mapped)
+        try:
+            for error in violations:
+                errors.append(error)
+                if limit is not None and len(errors) >= limit:
+                    break
+        finally:
+            violations.close()
+        return errors
+
+    def is_valid(self, file_path: str, mapped: Optional[MappedFile] = None) -> bool:
+        """Return whether an XML file is valid, stopping at the first violation."""
+        return not self.errors(file_path, limit=1, mapped=mapped)
+
+
+def compile_xml_validator(schema: Schema) -> XMLValidator:
+    """Return the XMLValidator of a schema, reusing the one built for an identical element tree."""
+    return cached_validator(schema, "xml", lambda: XMLValidator(schema))
+
+
+class _XMLNode:
+    """Checks compiled from one schema element."""
+    __slots__ = ("name", "children", "required_children", "attributes", "required_attributes",
+                 "text_type", "text_pattern")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.children: Dict[str, Tuple["_XMLNode", bool]] = {}  # Tag -> (node, may repeat)
+        self.required_children: List[str] = []
+        self.attributes: Dict[str, Tuple[DataType, Optional[Pattern]]] = {}
+        self.required_attributes: List[str] = []
+        self.text_type: Optional[DataType] = None
+        self.text_pattern: Optional[Pattern] = None
+
+
+def _compile(root: SchemaElement) -> _XMLNode:
+    """Compile the element tree of an XML schema into per-element checks."""
+    compiled = _XMLNode(root.name)
+    stack = [(root, compiled)]
+    while stack:
+        element, node = stack.pop()
+
+        for name, attribute in element.attributes.items():
+            node.attributes[name] = (attribute.data_type, _VALUE_PATTERNS.get(attribute.data_type))
+            if attribute.required:
+                node.required_attributes.append(name)
+
+        for name, prop in element.properties.items():
+            # The "text" property holds typed text content, not a child element
+            if name == "text" and prop.description is None and prop.array_type is None:
+                node.text_type = prop.data_type
+                node.text_pattern = _VALUE_PATTERNS.get(prop.data_type)
+                continue
+
+            repeated = prop.data_type == DataType.ARRAY and prop.array_type is not None
+            child_element = prop.array_type if repeated else prop
+            child = _XMLNode(name)
+            node.children[name] = (child, repeated)
+            if prop.required:
+                node.required_children.append(name)
+            stack.append((child_element, child))
+    return compiled
+
+
+def _attribute_problems(node: _XMLNode, attributes: "etree._Attrib", path: str) -> Iterator[SchemaViolation]:
+    """Yield the violations in the attributes of an element."""
+    declared = node.attributes
+    for name, value in attributes.items():
+        entry = declared.get(name)
+        if entry is None:
+            yield SchemaViolation(f"{path}@{name}", f"unexpected attribute {name!r}")
+        elif entry[1] is not None and not entry[1].match(value):
+            yield SchemaViolation(f"{path}@{name}", f"{value!r} is not of type {entry[0].value!r}")
+    for name in node.required_attributes:
+        if name not in attributes:
+            yield SchemaViolation(path, f"{name!r} is a required attribute")
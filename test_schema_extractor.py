@@ -5,6 +5,7 @@ Simple test script for the Schema Extractor.
 
 import os
 import sys
+import json
 from pathlib import Path
 
 # Add the current directory to Python path
@@ -113,6 +114,1296 @@ def test_schema_output():
         return False
 
 
+def test_streaming_json_extraction():
+    """Test that streaming JSON extraction matches in-memory extraction."""
+    print("\nTesting streaming JSON extraction...")
+    
+    import io
+    from schema_extractor.models.schema import Schema
+    from schema_extractor.parsers import iter_json_events
+    
+    extractor = SchemaExtractor()
+    json_file = "examples/sample.json"
+    
+    schema = extractor.extract_json_schema(json_file)
+    streamed = extractor.extract_json_schema(json_file, streaming=True)
+    
+    assert streamed.root_element == schema.root_element
+    assert streamed.total_elements == schema.total_elements
+    assert streamed.total_data_nodes == schema.total_data_nodes
+    assert streamed.max_depth == schema.max_depth
+    assert streamed.data_nodes == []
+    print(f"✓ Streaming schema matches ({streamed.total_data_nodes} nodes counted)")
+    
+    # Tokens split across tiny buffers must parse the same way
+    with open(json_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    chunked = Schema(name="chunked", file_type="json")
+    extractor.json_extractor._extract_schema_from_events(
+        iter_json_events(io.StringIO(content), chunk_size=3), chunked
+    )
+    assert chunked.root_element == schema.root_element
+    escaped = json.dumps({"k\u00e9": ["a\\b\"c\u1234\U0001F600" * 3, "\n\t"]}, ensure_ascii=True)
+    for chunk_size in range(1, 20):
+        events = list(iter_json_events(io.StringIO(escaped), chunk_size=chunk_size))
+        assert events == list(iter_json_events(io.StringIO(escaped)))
+    print("✓ Chunk boundaries handled")
+    
+    # Malformed strings fail at once instead of buffering the rest of the file
+    for malformed in ('["ok", "bad\x01', '["ok", "bad\\q', '{"k\\u12zq'):
+        document = io.StringIO(malformed + "x" * 1000000 + '"]')
+        try:
+            list(iter_json_events(document, chunk_size=1024))
+            raise AssertionError(f"{malformed!r} accepted")
+        except json.JSONDecodeError as error:
+            try:
+                json.loads(document.getvalue())
+            except json.JSONDecodeError as expected:
+                assert (error.msg, error.pos) == (expected.msg, expected.pos)
+        assert document.tell() <= 2048
+    print("✓ Invalid escapes and control characters reported without reading ahead")
+    
+    return True
+
+
+def test_streaming_xml_extraction():
+    """Test that iterparse-based XML extraction matches in-memory extraction."""
+    print("\nTesting streaming XML extraction...")
+    
+    extractor = SchemaExtractor()
+    xml_file = "examples/sample.xml"
+    
+    schema = extractor.extract_xml_schema(xml_file)
+    streamed = extractor.extract_xml_schema(xml_file, streaming=True)
+    
+    assert streamed.root_element == schema.root_element
+    assert streamed.total_elements == schema.total_elements
+    assert streamed.total_attributes == schema.total_attributes
+    assert streamed.total_data_nodes == schema.total_data_nodes
+    assert streamed.max_depth == schema.max_depth
+    print(f"✓ Streaming schema matches ({streamed.total_data_nodes} nodes counted)")
+    
+    import tempfile
+    with tempfile.TemporaryDirectory() as work_dir:
+        prolog_file = os.path.join(work_dir, "prolog.xml")
+        with open(prolog_file, 'w') as f:
+            f.write('<?xml version="1.0"?>\n<!-- License header -->\n<?render mode="x"?>\n'
+                    '<catalog><item id="1"><name>A</name></item><item id="2"><name>B</name></item></catalog>\n')
+        schema = extractor.extract_xml_schema(prolog_file)
+        streamed = extractor.extract_xml_schema(prolog_file, streaming=True)
+        assert streamed.to_json_schema() == schema.to_json_schema()
+        assert list(extractor.iter_data_nodes(prolog_file, streaming=True)) == list(schema.data_nodes)
+        incremental = extractor.extract_incremental(prolog_file, os.path.join(work_dir, "prolog.checkpoint"))
+        assert incremental.root_element.name == "catalog"
+    print("✓ Comments and processing instructions before the root are skipped")
+    
+    return True
+
+
+def test_single_pass_extraction():
+    """Test that the fused traversal yields consistent schema and data nodes."""
+    print("\nTesting single-pass extraction...")
+    
+    extractor = SchemaExtractor()
+    json_file = "examples/sample.json"
+    
+    schema = extractor.extract_json_schema(json_file)
+    assert schema.total_data_nodes == len(schema.data_nodes)
+    assert schema.max_depth == max(node.depth for node in schema.data_nodes)
+    assert schema.data_nodes[0].path == "root"
+    
+    with open(json_file, 'r', encoding='utf-8') as f:
+        from_string = extractor.json_extractor.extract_from_string(f.read())
+    assert from_string.root_element == schema.root_element
+    assert from_string.max_depth == schema.max_depth
+    print(f"✓ {schema.total_data_nodes} data nodes, max depth {schema.max_depth}")
+    
+    return True
+
+
+def test_merged_array_inference():
+    """Test that every array item is folded into the item schema."""
+    print("\nTesting merged array inference...")
+    
+    import tempfile
+    from schema_extractor.models.schema import DataType
+    
+    records = [{"id": 1, "name": "a"}, {"id": 2.5, "name": "b"}, {"id": 3, "name": "c", "extra": True}]
+    extractor = SchemaExtractor()
+    schema = extractor.json_extractor.extract_from_string(json.dumps({"records": records}))
+    items = schema.root_element.properties["records"].array_type
+    
+    assert set(items.properties) == {"id", "name", "extra"}
+    assert items.properties["id"].data_type == DataType.FLOAT
+    assert items.properties["id"].required and not items.properties["extra"].required
+    assert items.properties["name"].examples == ["a", "b", "c"]
+    print("✓ Union of keys, widened types and required flags")
+    
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump({"records": records * 50}, f)
+    try:
+        sampler = SchemaExtractor(array_sample_size=10, sample_seed=1)
+        sampled = sampler.extract_json_schema(f.name)
+        streamed = sampler.extract_json_schema(f.name, streaming=True)
+        for result in (sampled, streamed):
+            assert result.root_element.properties["records"].occurrences == 150
+            assert result.root_element.properties["records"].array_type.data_type == DataType.OBJECT
+    finally:
+        os.unlink(f.name)
+    print("✓ Sampled extraction counts every item")
+    
+    xml = extractor.xml_extractor.extract_from_string(
+        "<r><b id='1'><t>x</t></b><b><t>y</t><n>2</n></b></r>"
+    )
+    books = xml.root_element.properties["b"]
+    assert books.data_type == DataType.ARRAY and books.occurrences == 2
+    assert set(books.array_type.properties) == {"t", "n"}
+    assert not books.array_type.attributes["id"].required
+    print("✓ Repeated XML elements merged")
+    
+    return True
+
+
+def test_lazy_data_nodes():
+    """Test that lazily generated data nodes match the extracted ones."""
+    print("\nTesting lazy data node iteration...")
+    
+    from schema_extractor.models.schema import DataType
+    
+    extractor = SchemaExtractor()
+    for test_file in ["examples/sample.json", "examples/sample.xml"]:
+        schema = extractor.extract_schema(test_file)
+        assert list(extractor.iter_data_nodes(test_file)) == schema.data_nodes
+        
+        streamed = list(extractor.iter_data_nodes(test_file, streaming=True))
+        assert [node.path for node in streamed] == [node.path for node in schema.data_nodes]
+        assert [node.value for node in streamed if node.is_leaf] == [node.value for node in schema.get_leaf_nodes()]
+        print(f"✓ {test_file}: {len(streamed)} nodes streamed")
+    
+    leaves = list(schema.iter_data_nodes(data_type=DataType.INTEGER, leaf_only=True, max_depth=2))
+    assert leaves and all(node.is_leaf and node.depth <= 2 for node in leaves)
+    print(f"✓ Combined filters matched {len(leaves)} nodes")
+    
+    return True
+
+
+def test_data_node_table():
+    """Test the columnar data node store."""
+    print("\nTesting columnar data node table...")
+    
+    from schema_extractor.models.schema import DataNodeTable, DataType, filter_data_nodes
+    
+    extractor = SchemaExtractor()
+    schema = extractor.extract_xml_schema("examples/sample.xml")
+    table = schema.data_nodes
+    assert isinstance(table, DataNodeTable)
+    
+    nodes = list(table)
+    assert table[0] == nodes[0] and table[-1] == nodes[-1] and table[1:3] == nodes[1:3]
+    assert DataNodeTable.from_nodes(nodes) == nodes
+    assert [table.path(i) for i in range(len(table))] == [node.path for node in nodes]
+    
+    json_schema = extractor.extract_json_schema("examples/sample.json")
+    json_nodes = list(json_schema.data_nodes)
+    assert [json_schema.data_nodes[i] for i in range(len(json_nodes))] == json_nodes
+    assert json_nodes == list(extractor.iter_data_nodes("examples/sample.json"))
+    assert schema.to_dict()["data_nodes"] == [node.model_dump() for node in nodes]
+    print(f"✓ {len(table)} nodes materialized, rendered and serialized")
+    
+    criteria = dict(data_type=DataType.STRING, path_pattern=r"library\.book", leaf_only=True, max_depth=3)
+    assert list(schema.iter_data_nodes(**criteria)) == list(filter_data_nodes(nodes, **criteria))
+    print("✓ Column filters match node filters")
+    
+    return True
+
+
+def test_trusted_construction():
+    """Test that unvalidated construction matches validated models."""
+    print("\nTesting trusted model construction...")
+    
+    from schema_extractor.models.schema import DataNode, DataType, SchemaAttribute, SchemaElement
+    
+    for model, fields in [
+        (DataNode, dict(path="a.b", name="b", value=1, data_type=DataType.INTEGER, depth=1, parent_path="a")),
+        (SchemaAttribute, dict(name="id", data_type=DataType.INTEGER, required=True, default_value="1")),
+        (SchemaElement, dict(name="item", data_type=DataType.STRING, description="Property: item", examples=["x"])),
+    ]:
+        trusted = model.trusted(**fields)
+        assert trusted == model(**fields)
+        assert list(trusted.model_dump()) == list(model.model_fields)
+    print("✓ Trusted models equal validated ones")
+    
+    schema = SchemaExtractor().extract_json_schema("examples/sample.json")
+    assert schema.root_element == SchemaElement.model_validate(schema.root_element.model_dump())
+    print("✓ Extracted schema survives validation unchanged")
+    
+    return True
+
+
+def _flatten(value):
+    """Flatten nested dicts and lists into a token list, without recursion."""
+    tokens = []
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            tokens.append(("{", len(value)))
+            for key, item in reversed(list(value.items())):
+                stack.extend([item, key])
+        elif isinstance(value, list):
+            tokens.append(("[", len(value)))
+            stack.extend(reversed(value))
+        else:
+            tokens.append(value)
+    return tokens
+
+
+def test_deep_nesting():
+    """Test documents nested deeper than the recursion limit."""
+    print("\nTesting deeply nested documents...")
+    
+    import tempfile
+    from benchmark_schema_extractor import generate_deep_json_sample, generate_deep_xml_sample
+    from schema_extractor.models.schema import Schema
+    from schema_extractor.utils.helpers import save_schema, load_schema
+    
+    extractor = SchemaExtractor()
+    depth = sys.getrecursionlimit() * 3
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_file = os.path.join(work_dir, "deep.json")
+        xml_file = os.path.join(work_dir, "deep.xml")
+        generate_deep_json_sample(json_file, depth)
+        generate_deep_xml_sample(xml_file, 2000)
+        
+        for test_file, expected_depth in [(json_file, depth), (xml_file, 1999)]:
+            schema = extractor.extract_schema(test_file)
+            streamed = extractor.extract_schema(test_file, streaming=True)
+            assert schema.max_depth == streamed.max_depth == expected_depth
+            assert schema.total_data_nodes == streamed.total_data_nodes
+            assert sum(1 for _ in extractor.iter_data_nodes(test_file, streaming=True)) == schema.total_data_nodes
+            
+            root = schema.to_dict()["root_element"]
+            loaded = Schema.model_validate({"name": "deep", "file_type": "json", "root_element": root})
+            assert _flatten(loaded.to_dict()["root_element"]) == _flatten(root)
+            print(f"✓ {os.path.basename(test_file)}: depth {schema.max_depth} extracted and round-tripped")
+        
+        # Indented JSON grows quadratically with depth, so save a shallower schema
+        generate_deep_json_sample(json_file, 400)
+        schema = extractor.extract_schema(json_file)
+        schema.data_nodes = []
+        schema_file = os.path.join(work_dir, "schema.json")
+        save_schema(schema, schema_file)
+        assert load_schema(schema_file).to_dict() == schema.to_dict()
+        print("✓ Deep schema saved and loaded")
+
+        # XSD is indented too, so go just past the recursion limit
+        xsd_depth = sys.getrecursionlimit() + 100
+        with open(json_file, 'w') as f:
+            f.write('{"a": ' * xsd_depth + '1' + '}' * xsd_depth)
+        xsd = extractor.extract_schema(json_file).to_xsd()
+        assert xsd.count("<xs:complexType>") == xsd.count("</xs:complexType>") == xsd_depth
+        print(f"✓ Schema of depth {xsd_depth} converted to XSD")
+
+        jsonl_file = os.path.join(work_dir, "deep.jsonl")
+        with open(jsonl_file, 'w') as f:
+            f.write('{"id": 1}\n' + '{"a": ' * depth + '1' + '}' * depth + '\n')
+        schema = extractor.extract_schema(jsonl_file)
+        assert schema.max_depth == depth
+        assert extractor.validate_file(jsonl_file, schema)
+        print(f"✓ JSON Lines record of depth {depth} validated against its schema")
+    
+    return True
+
+
+def test_batch_extraction():
+    """Test extracting many files over a process pool."""
+    print("\nTesting batch extraction...")
+    
+    import shutil
+    import tempfile
+    from schema_extractor.utils.batch import BatchStats, expand_inputs
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.makedirs(os.path.join(work_dir, "nested"))
+        for i in range(6):
+            shutil.copy("examples/sample.json", os.path.join(work_dir, f"doc{i}.json"))
+            shutil.copy("examples/sample.xml", os.path.join(work_dir, "nested", f"doc{i}.xml"))
+        broken_file = os.path.join(work_dir, "broken.json")
+        with open(broken_file, "w") as f:
+            f.write("{broken")
+        
+        file_paths = expand_inputs([work_dir])
+        assert len(file_paths) == 13
+        assert expand_inputs([os.path.join(work_dir, "**", "*.xml")]) == [p for p in file_paths if p.endswith(".xml")]
+        print(f"✓ Expanded directory and glob inputs to {len(file_paths)} files")
+        
+        expected = {
+            "json": extractor.extract_schema("examples/sample.json").root_element,
+            "xml": extractor.extract_schema("examples/sample.xml").root_element,
+        }
+        stats = BatchStats()
+        results = list(stats.count(extractor.extract_batch(file_paths, workers=2)))
+        assert sorted(r.file_path for r in results) == file_paths
+        for result in results:
+            if result.file_path == broken_file:
+                assert not result.ok and result.schema is None and "JSONDecodeError" in result.error
+            else:
+                assert result.ok and result.schema.root_element == expected[result.schema.file_type]
+                assert result.schema.total_data_nodes > 0 and len(result.schema.data_nodes) == 0
+        assert stats.files == 13 and stats.failed == 1
+        assert stats.bytes == sum(os.path.getsize(p) for p in file_paths)
+        print(f"✓ {stats.files} files extracted by 2 workers ({stats.files_per_second:.0f} files/s)")
+    
+    return True
+
+
+def test_schema_merging():
+    """Test the associative schema merge and its parallel reduction."""
+    print("\nTesting schema merging...")
+    
+    import tempfile
+    from itertools import permutations
+    from functools import reduce
+    from schema_extractor.extractors.json_extractor import JSONExtractor
+    from schema_extractor.extractors.merge import merge_schema_pair, merge_schemas
+    from schema_extractor.models.schema import DataType
+    from schema_extractor.utils.batch import expand_inputs, merge_schema_files
+    from schema_extractor.utils.binary import is_binary_schema
+    from schema_extractor.utils.helpers import save_schema
+    
+    extractor = JSONExtractor()
+    schemas = [extractor.extract_from_string(text) for text in [
+        '{"id": 1, "tags": ["a"], "user": {"name": "x", "age": 30}}',
+        '{"id": 2.5, "tags": [], "user": {"name": "y"}}',
+        '{"id": 3, "note": "z", "user": {"name": "x", "age": 41, "email": "e@x"}}',
+    ]]
+    before = [schema.to_dict() for schema in schemas]
+    
+    merged = merge_schemas(schemas)
+    root = merged.root_element
+    assert root.occurrences == 3
+    assert root.properties["id"].data_type == DataType.FLOAT and root.properties["id"].required
+    assert not root.properties["note"].required and not root.properties["tags"].required
+    assert root.properties["user"].properties["name"].required
+    assert not root.properties["user"].properties["age"].required
+    assert root.properties["user"].properties["name"].examples == ["x", "y"]
+    assert [schema.to_dict() for schema in schemas] == before
+    print("✓ Types widened, required flags and counts combined, inputs untouched")
+    
+    expected = merged.to_dict()
+    for order in permutations(schemas):
+        assert reduce(merge_schema_pair, order).to_dict() == expected
+        assert merge_schema_pair(order[0], merge_schema_pair(order[1], order[2])).to_dict() == expected
+    print("✓ Merge is associative and commutative")
+    
+    xml_schema = SchemaExtractor().extract_xml_schema("examples/sample.xml")
+    doubled = merge_schema_pair(xml_schema, xml_schema)
+    assert doubled.total_elements == xml_schema.total_elements
+    assert doubled.total_attributes == xml_schema.total_attributes
+    assert doubled.root_element.occurrences == 2
+    print("✓ Schema merged with itself keeps its totals")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        file_paths = []
+        for i in range(12):
+            file_path = os.path.join(work_dir, f"schema{i}.json")
+            save_schema(schemas[i % 3], file_path)
+            file_paths.append(file_path)
+        reduced = merge_schema_files(file_paths, workers=2, group_size=5)
+        assert reduced.to_dict() == merge_schemas(schemas * 4).to_dict()
+        assert reduced.root_element.occurrences == 12
+        print("✓ Parallel tree reduction matches the in-process merge")
+        
+        binary_file = os.path.join(work_dir, "schema12.bin")
+        save_schema(schemas[0], binary_file, "binary")
+        found = expand_inputs([work_dir], extensions=(".json",), include=is_binary_schema)
+        assert found == sorted(file_paths + [binary_file])
+        assert merge_schema_files(found, workers=2).root_element.occurrences == 13
+        print("✓ Binary schemas in directories recognized by their header")
+    
+    return True
+
+
+def test_jsonl_extraction():
+    """Test JSON Lines extraction, serially and split across processes."""
+    print("\nTesting JSON Lines extraction...")
+    
+    import tempfile
+    import schema_extractor.extractors.json_extractor as json_extractor
+    from schema_extractor.models.schema import DataType
+    from schema_extractor.utils.helpers import detect_file_type
+    from schema_extractor.utils.mapped import MappedFile
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        jsonl_file = os.path.join(work_dir, "events.jsonl")
+        with open(jsonl_file, "w") as f:
+            for i in range(300):
+                record = {"id": i, "user": {"name": f"u{i}"}}
+                if i % 3:
+                    record["score"] = i / 2 if i % 2 else i
+                f.write(json.dumps(record) + "\n")
+                if i == 150:
+                    f.write("\n")
+        log_file = os.path.join(work_dir, "events.log")
+        with open(jsonl_file) as src, open(log_file, "w") as dst:
+            dst.write(src.read())
+        
+        assert detect_file_type(jsonl_file) == detect_file_type(log_file) == "jsonl"
+        assert detect_file_type("examples/sample.json") == "json"
+        long_file = os.path.join(work_dir, "long_records")
+        with open(long_file, "w") as f:
+            f.write("\n" + json.dumps({"text": "x" * 5000}) + "\n" + json.dumps({"text": "y"}) + "\n")
+        assert detect_file_type(long_file) == "jsonl"
+        print("✓ JSON Lines detected by extension and content")
+        
+        schema = extractor.extract_schema(jsonl_file)
+        root = schema.root_element
+        assert schema.file_type == "jsonl" and root.occurrences == 300
+        assert root.properties["id"].required and root.properties["user"].properties["name"].required
+        assert not root.properties["score"].required
+        assert root.properties["score"].occurrences == 200
+        assert root.properties["score"].data_type == DataType.FLOAT
+        assert schema.total_data_nodes == 300 * 4 + 200
+        assert sum(1 for _ in extractor.iter_data_nodes(jsonl_file)) == schema.total_data_nodes + 1
+        print(f"✓ {root.occurrences} records folded into one root element")
+        
+        def flags(element):
+            return {name: (prop.data_type, prop.required, prop.occurrences, flags(prop))
+                    for name, prop in element.properties.items()}
+        
+        min_chunk = json_extractor.JSONL_MIN_CHUNK
+        json_extractor.JSONL_MIN_CHUNK = 1024
+        try:
+            with MappedFile(jsonl_file) as source:
+                assert len(source.line_ranges(8, json_extractor.JSONL_MIN_CHUNK)) == 8
+            parallel = extractor.extract_schema(jsonl_file, workers=2)
+        finally:
+            json_extractor.JSONL_MIN_CHUNK = min_chunk
+        assert flags(parallel.root_element) == flags(root)
+        assert parallel.root_element.occurrences == 300
+        assert (parallel.total_data_nodes, parallel.total_elements, parallel.max_depth) == \
+            (schema.total_data_nodes, schema.total_elements, schema.max_depth)
+        print("✓ Line-range split across 2 processes matches the serial schema")
+        
+        with open(jsonl_file, "a") as f:
+            f.write("{broken\n")
+        try:
+            extractor.extract_schema(jsonl_file)
+            assert False, "invalid record was accepted"
+        except ValueError as e:
+            assert "Invalid JSON record at byte" in str(e)
+        print("✓ Invalid records reported with their byte offset")
+    
+    return True
+
+
+def test_mapped_input():
+    """Test reading input files through a memory mapping."""
+    print("\nTesting memory-mapped input...")
+    
+    import tempfile
+    from schema_extractor.parsers import iter_json_events
+    from schema_extractor.utils.helpers import detect_file_type
+    from schema_extractor.utils.mapped import MappedFile
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        text_file = os.path.join(work_dir, "records.txt")
+        content = '{"name": "Zoë", "city": "Zürich"}\n{"name": "Åsa"}\n\n{"name": "€"}'
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        with MappedFile(text_file) as source:
+            assert source.text() == content
+            assert detect_file_type(text_file, source) == "jsonl"
+            
+            # Small reads split multi-byte characters across chunks
+            reader = source.text_reader()
+            chunks = iter(lambda: reader.read(3), "")
+            assert "".join(chunks) == content
+            
+            lines = list(source.iter_lines())
+            assert b"".join(line for _, line in lines) == content.encode('utf-8')
+            assert all(source.buffer[offset:offset + len(line)] == line for offset, line in lines)
+            ranges = source.line_ranges(4)
+            assert ranges[0][0] == 0 and ranges[-1][1] == source.size
+            assert all(source.buffer[start - 1:start] == b"\n" for start, _ in ranges[1:])
+        print("✓ Mapped text, lines and ranges match the file")
+        
+        json_file = os.path.join(work_dir, "names.json")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump({"names": ["Zoë", "Zürich", "Åsa", "€"]}, f, ensure_ascii=False)
+        with MappedFile(json_file) as source:
+            events = list(iter_json_events(source.text_reader(), chunk_size=5))
+        assert [value for event, value in events if event == "string"] == ["Zoë", "Zürich", "Åsa", "€"]
+        print("✓ Event parser reads the mapping in small chunks")
+        
+        empty_file = os.path.join(work_dir, "empty.json")
+        open(empty_file, 'w').close()
+        with MappedFile(empty_file) as source:
+            assert source.size == 0 and source.text() == "" and list(source.iter_lines()) == []
+        print("✓ Empty files map to an empty buffer")
+        
+        # Mapped extraction matches extraction from a string
+        extractor = SchemaExtractor()
+        for sample, from_string in [("examples/sample.json", extractor.json_extractor.extract_from_string),
+                                    ("examples/sample.xml", extractor.xml_extractor.extract_from_string)]:
+            if not os.path.exists(sample):
+                continue
+            with open(sample, 'r', encoding='utf-8') as f:
+                expected = from_string(f.read())
+            schema = extractor.extract_schema(sample)
+            assert schema.root_element.to_dict() == expected.root_element.to_dict()
+            print(f"✓ {os.path.basename(sample)} extracted from its mapping")
+    
+    return True
+
+
+def test_schema_cache():
+    """Test reusing schemas of unchanged files from the on-disk cache."""
+    print("\nTesting schema cache...")
+    
+    import tempfile
+    from schema_extractor import SchemaCache
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        cache_dir = os.path.join(work_dir, "cache")
+        json_file = os.path.join(work_dir, "data.json")
+        with open(json_file, 'w') as f:
+            json.dump({"id": 1, "tags": ["a", "b"]}, f)
+        
+        extractor = SchemaExtractor(cache=cache_dir)
+        first = extractor.extract_schema(json_file)
+        second = extractor.extract_schema(json_file)
+        assert (extractor.cache.misses, extractor.cache.hits) == (1, 1)
+        assert second is not first and second.to_dict() == first.to_dict()
+        assert list(second.data_nodes) == list(first.data_nodes)
+        print("✓ Unchanged file served from the cache")
+        
+        # Different extraction options get their own entry
+        extractor.extract_schema(json_file, streaming=True)
+        assert extractor.cache.stats()["entries"] == 2
+        
+        # Same size and mtime hide an edit unless hashes are compared
+        stat = os.stat(json_file)
+        with open(json_file, 'w') as f:
+            json.dump({"id": 2, "tags": ["c", "d"]}, f)
+        os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        assert extractor.cache.get(json_file, {"streaming": False, "array_sample_size": None, "sample_seed": None}) is not None
+        
+        hashed = SchemaExtractor(cache=SchemaCache(os.path.join(work_dir, "hashed"), verify_hash=True))
+        hashed.extract_schema(json_file)
+        with open(json_file, 'w') as f:
+            json.dump({"id": 3, "tags": ["e", "f"]}, f)
+        os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        hashed.extract_schema(json_file)
+        assert (hashed.cache.misses, hashed.cache.hits) == (2, 0)
+        
+        # A touched file with the same content still hits
+        os.utime(json_file)
+        hashed.extract_schema(json_file)
+        assert hashed.cache.hits == 1
+        
+        # Size changes invalidate without hashing
+        with open(json_file, 'w') as f:
+            json.dump({"id": 4, "name": "changed"}, f)
+        assert "name" in extractor.extract_schema(json_file).root_element.properties
+        print("✓ Modified files are re-extracted")
+        
+        # Least recently used entries are evicted first
+        lru = SchemaCache(os.path.join(work_dir, "lru"), max_entries=2)
+        lru_extractor = SchemaExtractor(cache=lru)
+        paths = []
+        for i in range(3):
+            paths.append(os.path.join(work_dir, f"file{i}.json"))
+            with open(paths[-1], 'w') as f:
+                json.dump({"value": i}, f)
+            lru_extractor.extract_schema(paths[-1])
+            os.utime(lru._entry_path(paths[-1], {"streaming": False, "array_sample_size": None, "sample_seed": None}),
+                     (i, i))
+        assert lru.stats()["entries"] == 2
+        lru_extractor.extract_schema(paths[0])
+        assert lru.misses == 4
+        lru_extractor.extract_schema(paths[2])
+        assert lru.hits == 1
+        print("✓ Cache bounded with LRU eviction")
+        
+        # Unreadable entries count as misses
+        for name in os.listdir(cache_dir):
+            with open(os.path.join(cache_dir, name), 'wb') as f:
+                f.write(b"corrupt")
+        extractor.extract_schema(json_file)
+        assert extractor.cache.misses == 4
+        print("✓ Corrupt entries are re-extracted")
+    
+    return True
+
+
+def test_incremental_extraction():
+    """Test resuming the extraction of append-only files from a checkpoint."""
+    print("\nTesting incremental extraction...")
+    
+    import tempfile
+    from schema_extractor.extractors.incremental import load_checkpoint
+    from schema_extractor.models.schema import DataType
+    
+    def flags(element):
+        return (element.data_type, element.required, element.occurrences,
+                {name: flags(prop) for name, prop in sorted(element.properties.items())},
+                flags(element.array_type) if element.array_type is not None else None)
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        jsonl_file = os.path.join(work_dir, "events.jsonl")
+        complete_file = os.path.join(work_dir, "complete.jsonl")
+        checkpoint = os.path.join(work_dir, "events.checkpoint")
+        lines = []
+        for i in range(90):
+            record = {"id": i, "tags": [{"name": "a"}] * (i % 3)}
+            if i % 4:
+                record["score"] = i / 2
+            lines.append(json.dumps(record) + "\n")
+        
+        for end in (30, 60, 90):
+            # The last record is still being written
+            with open(jsonl_file, 'w') as f:
+                f.writelines(lines[:end])
+                f.write('{"id": ')
+            with open(complete_file, 'w') as f:
+                f.writelines(lines[:end])
+            schema = extractor.extract_incremental(jsonl_file, checkpoint)
+            assert load_checkpoint(checkpoint).offset == sum(map(len, lines[:end]))
+            full = extractor.extract_schema(complete_file)
+            assert flags(schema.root_element) == flags(full.root_element)
+            assert schema.total_data_nodes == full.total_data_nodes
+        print("✓ JSON Lines tails folded into the checkpointed schema")
+        
+        # A truncated (rotated) file is read from the start again
+        with open(jsonl_file, 'w') as f:
+            f.writelines(lines[:5])
+        assert extractor.extract_incremental(jsonl_file, checkpoint).root_element.occurrences == 5
+        print("✓ Rewritten file re-extracted from the start")
+        
+        xml_file = os.path.join(work_dir, "log.xml")
+        complete_file = os.path.join(work_dir, "complete.xml")
+        checkpoint = os.path.join(work_dir, "log.checkpoint")
+        entries = [
+            '<event id="1"><level>info</level></event>\n',
+            '<note text="a > b"/>\n',
+            '<event id="2"><level>warn</level><detail><code>7</code></detail></event>\n',
+            '<note text="c"></note>\n',
+            '<event id="3"><level>error</level></event>\n',
+            '<heartbeat/>\n',
+        ]
+        head = '<?xml version="1.0"?>\n<log source="app">\n'
+        for end, closed in [(1, False), (2, True), (4, False), (6, True)]:
+            body = head + "".join(entries[:end])
+            with open(xml_file, 'w') as f:
+                f.write(body + ("</log>\n" if closed else "<event id="))
+            with open(complete_file, 'w') as f:
+                f.write(body + "</log>\n")
+            schema = extractor.extract_incremental(xml_file, checkpoint)
+            full = extractor.extract_schema(complete_file, streaming=True)
+            assert flags(schema.root_element) == flags(full.root_element)
+            assert (schema.total_data_nodes, schema.total_elements, schema.total_attributes, schema.max_depth) == \
+                (full.total_data_nodes, full.total_elements, full.total_attributes, full.max_depth)
+        assert schema.root_element.properties["event"].data_type == DataType.ARRAY
+        print("✓ XML children appended before the closing tag folded in")
+    
+    return True
+
+
+
+def test_compiled_validation():
+    """Test validators compiled once per schema against jsonschema."""
+    print("\nTesting compiled validation...")
+    
+    import random
+    import tempfile
+    from jsonschema import ValidationError
+    from schema_extractor.models.schema import DataType
+    from schema_extractor.validators import CompiledValidator, SchemaViolation, compile_validator
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_file = os.path.join(work_dir, "orders.json")
+        document = {"id": 7, "customer": {"name": "Ann", "vip": True},
+                    "items": [{"sku": "a1", "price": 2.5}, {"sku": "b2", "price": 4}]}
+        with open(json_file, 'w') as f:
+            json.dump(document, f)
+        schema = extractor.extract_schema(json_file)
+    
+    native = CompiledValidator(schema)
+    reference = CompiledValidator(schema, backend="jsonschema")
+    assert native.is_valid(document) and native.errors(document) == []
+    assert native.is_valid(dict(document, id=8.0)) and not native.is_valid(dict(document, id=True))
+    print("✓ Valid documents accepted with jsonschema's type rules")
+    
+    invalid = dict(document, id="7", customer={"vip": 1})
+    invalid["items"] = [{"sku": "a1", "price": 2.5}, {"sku": 3}]
+    errors = native.errors(invalid)
+    assert SchemaViolation("root.items[1].sku", "3 is not of type 'string'") in errors
+    assert SchemaViolation("root.customer", "'name' is a required property") in errors
+    assert len(native.errors(invalid, limit=1)) == 1
+    try:
+        native.validate(invalid)
+        raise AssertionError("validate() accepted an invalid document")
+    except ValidationError:
+        pass
+    print("✓ Violations collected with their paths")
+    
+    rng = random.Random(3)
+    values = [None, True, 0, 1.5, "x", [], {}, [1], {"sku": 1}]
+    for _ in range(300):
+        mutated = json.loads(json.dumps(document))
+        target = rng.choice([mutated, mutated["customer"], rng.choice(mutated["items"])])
+        key = rng.choice(sorted(target))
+        if rng.random() < 0.3:
+            del target[key]
+        else:
+            target[key] = rng.choice(values)
+        assert native.is_valid(mutated) == reference.is_valid(mutated)
+        assert set(native.iter_errors(mutated)) == set(reference.iter_errors(mutated))
+    print("✓ Native and jsonschema backends agree on mutated documents")
+    
+    from schema_extractor.extractors.merge import merge_schemas
+    from schema_extractor.utils.binary import load_binary_schema, save_binary_schema
+    with tempfile.TemporaryDirectory() as work_dir:
+        jsonl_file = os.path.join(work_dir, "events.jsonl")
+        with open(jsonl_file, 'w') as f:
+            f.write('{"a": 1, "o": {"x": 1}}\n{"a": null, "o": null, "l": [1, null]}\n{"a": 2, "l": [null, 3]}\n')
+        json_file = os.path.join(work_dir, "nulls.json")
+        with open(json_file, 'w') as f:
+            json.dump([{"a": None, "s": "x"}, {"a": 1.5, "s": None}], f)
+        binary_file = os.path.join(work_dir, "events.sxsb")
+        
+        for source in (jsonl_file, json_file):
+            for streaming in (False, True):
+                nullable = extractor.extract_schema(source, streaming=streaming)
+                assert extractor.validate_file(source, nullable), (source, streaming)
+                assert extractor.validate_file(source, nullable, streaming=True), (source, streaming)
+        nullable = extractor.extract_schema(jsonl_file)
+        assert nullable.to_json_schema()["properties"]["a"]["type"] == ["integer", "null"]
+        assert nullable.to_json_schema()["properties"]["l"]["items"]["type"] == ["integer", "null"]
+        for backend in ("native", "jsonschema"):
+            assert CompiledValidator(nullable, backend).errors({"a": "1", "o": None}) == [
+                SchemaViolation("root.a", "'1' is not of type 'integer', 'null'")
+            ]
+        
+        save_binary_schema(nullable, binary_file)
+        assert load_binary_schema(binary_file).to_json_schema() == nullable.to_json_schema()
+        parts = []
+        for record in ('{"a": 1}', '{"a": null}'):
+            with open(jsonl_file, 'w') as f:
+                f.write(record + "\n")
+            parts.append(extractor.extract_schema(jsonl_file))
+        assert merge_schemas(parts).to_json_schema()["properties"]["a"]["type"] == ["integer", "null"]
+    print("✓ Nullable values round-trip through extraction, saving, merging and validation")
+    
+    assert compile_validator(schema) is compile_validator(schema)
+    assert compile_validator(schema, backend="jsonschema").backend == "jsonschema"
+    assert compile_validator(schema.model_copy(update={"data_nodes": []})) is compile_validator(schema)
+    changed = schema.model_copy(deep=True)
+    changed.root_element.properties["id"].data_type = DataType.STRING
+    assert compile_validator(changed).is_valid(dict(document, id="7"))
+    changed.root_element.properties["id"].data_type = DataType.BOOLEAN
+    assert not compile_validator(changed).is_valid(dict(document, id="7"))
+    print("✓ Compiled validators reused per element tree, rebuilt after changes")
+    
+    return True
+
+
+def test_xml_validation():
+    """Test streaming structural validation of XML files."""
+    print("\nTesting XML validation...")
+    
+    import tempfile
+    from schema_extractor.validators import SchemaViolation, XMLValidator
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        def write(name, content):
+            file_path = os.path.join(work_dir, name)
+            with open(file_path, 'w') as f:
+                f.write(content)
+            return file_path
+        
+        good_file = write("good.xml", '<catalog version="2">'
+                          '<book id="1"><title>A</title><price>3.5</price></book>'
+                          '<book id="2" lang="en"><title>B</title><price>4</price></book>'
+                          '<meta><year>2020</year></meta></catalog>')
+        schema = extractor.extract_schema(good_file)
+        assert XMLValidator(schema).errors(good_file) == []
+        assert XMLValidator(extractor.extract_schema(good_file, streaming=True)).is_valid(good_file)
+        assert extractor.validate_file(good_file, schema)
+        print("✓ Source file valid against its own schema")
+        
+        bad_file = write("bad.xml", '<catalog version="x">'
+                         '<book id="a" extra="1"><price>cheap</price></book>'
+                         '<meta><year>2020</year><year>2021</year><notes/></meta></catalog>')
+        errors = XMLValidator(schema).errors(bad_file)
+        assert errors == [
+            SchemaViolation("catalog@version", "'x' is not of type 'integer'"),
+            SchemaViolation("catalog.book[0]@id", "'a' is not of type 'integer'"),
+            SchemaViolation("catalog.book[0]@extra", "unexpected attribute 'extra'"),
+            SchemaViolation("catalog.book[0].price#text", "'cheap' is not of type 'float'"),
+            SchemaViolation("catalog.book[0]", "'title' is a required element"),
+            SchemaViolation("catalog.meta.year", "element 'year' occurs more than once"),
+            SchemaViolation("catalog.meta.notes", "unexpected element 'notes'"),
+        ], errors
+        assert len(XMLValidator(schema).errors(bad_file, limit=2)) == 2
+        assert not extractor.validate_file(bad_file, schema)
+        print("✓ Elements, attributes, cardinalities and value types checked")
+        
+        other_root = write("other.xml", "<inventory/>")
+        assert XMLValidator(schema).errors(other_root) == [
+            SchemaViolation("inventory", "'inventory' is not the root element 'catalog'")
+        ]
+        print("✓ Root element mismatch reported")
+        
+        prolog_file = write("prolog.xml", '<?xml version="1.0"?>\n<!-- License header -->\n<?render mode="x"?>\n'
+                            '<catalog version="2"><book id="1"><title>A</title><price>3.5</price></book>'
+                            '<book id="2"><title>B</title><price>4</price></book>'
+                            '<meta><year>2021</year></meta></catalog>\n')
+        assert XMLValidator(schema).errors(prolog_file) == []
+        assert extractor.validate_file(prolog_file, extractor.extract_schema(prolog_file))
+        print("✓ Comments and processing instructions before the root accepted")
+
+        for content in ('<a><b>hi</b><b>7</b></a>', '<a><b>7</b><b>hi</b></a>',
+                        '<r><a><b>hi</b></a><a><b>12</b></a></r>', '<r><a><b>12</b></a><a><b>hi</b></a></r>'):
+            mixed_file = write("mixed.xml", content)
+            for streaming in (False, True):
+                mixed_schema = extractor.extract_schema(mixed_file, streaming=streaming)
+                assert XMLValidator(mixed_schema).errors(mixed_file) == [], content
+        print("✓ Text typed the same whichever order strings and numbers occur in")
+
+    return True
+
+
+def test_streaming_json_validation():
+    """Test validating JSON from parse events against a compiled schema."""
+    print("\nTesting streaming JSON validation...")
+    
+    import io
+    import random
+    import tempfile
+    from schema_extractor.parsers.json_events import iter_json_events
+    from schema_extractor.validators import CompiledValidator, SchemaViolation
+    
+    def stream(document):
+        return iter_json_events(io.StringIO(json.dumps(document)))
+    
+    def shown(violations):
+        # Streamed containers of the wrong type are shown as {...} or [...]
+        result = set()
+        for violation in violations:
+            value, separator, expected = violation.message.partition(" is not of type ")
+            if separator and value[:1] in "{[":
+                value = "{...}" if value[0] == "{" else "[...]"
+            result.add((violation.path, value + separator + expected))
+        return result
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_file = os.path.join(work_dir, "orders.json")
+        document = {"id": 7, "customer": {"name": "Ann", "tags": ["a", "b"]},
+                    "items": [{"sku": "a1", "price": 2.5}, {"sku": "b2", "price": 4}]}
+        with open(json_file, 'w') as f:
+            json.dump(document, f)
+        schema = extractor.extract_schema(json_file)
+        validator = CompiledValidator(schema)
+        assert list(validator.iter_event_errors(stream(document))) == []
+        assert extractor.validate_file(json_file, schema, streaming=True)
+        print("✓ Valid document accepted from parse events")
+        
+        invalid = {"id": "7", "customer": [], "items": [{"sku": 3, "price": 1}, {"price": "x"}]}
+        assert list(validator.iter_event_errors(stream(invalid))) == [
+            SchemaViolation("root.id", "'7' is not of type 'integer'"),
+            SchemaViolation("root.customer", "[...] is not of type 'object'"),
+            SchemaViolation("root.items[0].sku", "3 is not of type 'string'"),
+            SchemaViolation("root.items[1].price", "'x' is not of type 'number'"),
+            SchemaViolation("root.items[1]", "'sku' is a required property"),
+        ]
+        with open(json_file, 'w') as f:
+            json.dump(invalid, f)
+        assert not extractor.validate_file(json_file, schema, streaming=True)
+        print("✓ Violations reported with paths as values arrive")
+        
+        rng = random.Random(5)
+        values = [None, True, 0, 1.5, "x", [], {}, [1], {"sku": 1}]
+        for _ in range(300):
+            mutated = json.loads(json.dumps(document))
+            target = rng.choice([mutated, mutated["customer"], rng.choice(mutated["items"])])
+            key = rng.choice(sorted(target))
+            if rng.random() < 0.3:
+                del target[key]
+            else:
+                target[key] = json.loads(json.dumps(rng.choice(values)))
+            assert shown(validator.iter_event_errors(stream(mutated))) == shown(validator.iter_errors(mutated))
+        print("✓ Same violations as validating the loaded document")
+    
+    return True
+
+
+def test_batch_validation():
+    """Test validating many files against one schema over a process pool."""
+    print("\nTesting batch validation...")
+    
+    import tempfile
+    from schema_extractor.utils.batch import BatchStats, validate_batch
+    from schema_extractor.utils.helpers import find_violations
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        file_paths = []
+        for i in range(12):
+            file_path = os.path.join(work_dir, f"doc{i}.json")
+            with open(file_path, 'w') as f:
+                json.dump({"id": "bad" if i % 5 == 0 else i, "name": f"n{i}"}, f)
+            file_paths.append(file_path)
+        broken = os.path.join(work_dir, "broken.json")
+        with open(broken, 'w') as f:
+            f.write("{")
+        records = os.path.join(work_dir, "records.jsonl")
+        with open(records, 'w') as f:
+            f.write('{"id": 1, "name": "a"}\n\n{"id": 2}\n')
+        schema = extractor.extract_schema(file_paths[1])
+        
+        assert [str(v) for v in find_violations(records, schema)] == ["root[1]: 'name' is a required property"]
+        print("✓ JSON Lines violations rooted at their record")
+        
+        for workers in (1, 2):
+            stats = BatchStats()
+            results = {result.file_path: result
+                       for result in stats.count(validate_batch(file_paths + [broken], schema, workers=workers))}
+            assert len(results) == 13 and stats.failed == 4
+            assert {path for path, result in results.items() if not result.ok} == \
+                {file_paths[0], file_paths[5], file_paths[10], broken}
+            record = results[file_paths[5]].to_record()
+            assert record["file"] == file_paths[5] and record["valid"] is False and record["duration"] >= 0
+            assert record["errors"] == [{"path": "root.id", "message": "'bad' is not of type 'integer'"}]
+            assert results[broken].to_record()["errors"][0]["message"].startswith("JSONDecodeError")
+            assert results[file_paths[1]].to_record()["errors"] == []
+        print("✓ Files validated serially and over a pool with per-file reports")
+    
+    return True
+
+
+def test_binary_format():
+    """Test saving and lazily loading schemas in the binary format."""
+    print("\nTesting binary schema format...")
+    
+    import tempfile
+    from schema_extractor.utils.helpers import save_schema, load_schema
+    
+    extractor = SchemaExtractor()
+    with tempfile.TemporaryDirectory() as work_dir:
+        for source in ("examples/sample.json", "examples/sample.xml"):
+            schema = extractor.extract_schema(source)
+            for compression in ("zlib", None):
+                binary_file = os.path.join(work_dir, "schema.bin")
+                save_schema(schema, binary_file, "binary", compression)
+                loaded = load_schema(binary_file)
+                assert len(loaded.data_nodes) == len(schema.data_nodes)
+                assert "values" not in loaded.data_nodes.__dict__
+                assert loaded.model_dump() == schema.model_dump()
+                assert "values" in loaded.data_nodes.__dict__
+        print("✓ JSON and XML schemas round-trip, with and without compression")
+        
+        # Container values are rebuilt from their child rows
+        schema = extractor.extract_schema("examples/sample.json")
+        save_schema(schema, binary_file, "binary")
+        loaded = load_schema(binary_file)
+        assert loaded.data_nodes[0].value == schema.data_nodes[0].value
+        assert isinstance(loaded.data_nodes[0].value, dict)
+        print("✓ Container values rebuilt from their children")
+        
+        loaded = load_schema(binary_file)
+        results = list(extractor.validate_batch(["examples/sample.json"], loaded, workers=1))
+        assert results[0].ok and "values" not in loaded.data_nodes.__dict__
+        print("✓ Batch validation leaves lazy data nodes unread")
+        
+        loaded = load_schema(binary_file)
+        save_schema(schema, binary_file, "binary", None)
+        try:
+            loaded.data_nodes[0]
+            raise AssertionError("Data nodes read from a rewritten file")
+        except ValueError:
+            pass
+        print("✓ Lazy data nodes refuse a changed file")
+
+        loaded = load_schema(binary_file)
+        save_schema(loaded, binary_file, "binary")
+        assert load_schema(binary_file).model_dump() == schema.model_dump()
+        assert not [name for name in os.listdir(work_dir) if name.endswith(".tmp")]
+        print("✓ Schema converted onto its own file")
+
+    return True
+
+
+def test_data_node_export():
+    """Test streaming data node export to JSON, JSON Lines and CSV."""
+    print("\nTesting data node export...")
+    
+    import csv
+    import gzip
+    import tempfile
+    from schema_extractor.utils.export import export_data_nodes, compression_for
+    
+    extractor = SchemaExtractor()
+    expected = [node.path for node in extractor.iter_data_nodes("examples/sample.json")]
+    with tempfile.TemporaryDirectory() as work_dir:
+        json_file = os.path.join(work_dir, "nodes.json")
+        count = export_data_nodes(extractor.iter_data_nodes("examples/sample.json"), json_file, "json")
+        with open(json_file, encoding="utf-8") as f:
+            records = json.load(f)
+        assert count == len(records) == len(expected)
+        assert [record["path"] for record in records] == expected
+        print(f"✓ JSON array of {count} nodes")
+        
+        jsonl_file = os.path.join(work_dir, "nodes.jsonl.gz")
+        assert compression_for(jsonl_file) == "gzip"
+        export_data_nodes(extractor.iter_data_nodes("examples/sample.json"), jsonl_file, "jsonl", "gzip")
+        with gzip.open(jsonl_file, "rt", encoding="utf-8") as f:
+            assert [json.loads(line) for line in f] == records
+        print("✓ Gzipped JSON Lines match the JSON array")
+        
+        csv_file = os.path.join(work_dir, "nodes.csv")
+        export_data_nodes(extractor.iter_data_nodes("examples/sample.xml"), csv_file, "csv")
+        with open(csv_file, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0][0] == "Path" and len(rows) - 1 == len(list(extractor.iter_data_nodes("examples/sample.xml")))
+        print(f"✓ CSV with {len(rows) - 1} rows")
+        
+        empty_file = os.path.join(work_dir, "empty.json")
+        export_data_nodes(iter(()), empty_file, "json")
+        with open(empty_file, encoding="utf-8") as f:
+            assert json.load(f) == []
+        print("✓ Empty exports are valid JSON")
+    
+    return True
+
+
+def test_arrow_export():
+    """Test Arrow IPC and Parquet export of data nodes."""
+    print("\nTesting Arrow and Parquet export...")
+    
+    try:
+        import pyarrow
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("✓ pyarrow not installed, skipped")
+        return True
+    
+    import tempfile
+    from schema_extractor.utils.arrow import export_arrow, record_batches
+    
+    extractor = SchemaExtractor()
+    schema = extractor.extract_schema("examples/sample.json")
+    from_table = pyarrow.Table.from_batches(list(record_batches(schema.data_nodes, batch_size=10)))
+    from_nodes = pyarrow.Table.from_batches(list(record_batches(extractor.iter_data_nodes("examples/sample.json"))))
+    assert from_table.equals(from_nodes)
+    assert from_table.column("path").to_pylist() == [node.path for node in schema.data_nodes]
+    print(f"✓ {from_table.num_rows} rows built from table columns match the node stream")
+    
+    rows = {row["path"]: row for row in from_table.to_pylist()}
+    assert rows["company.founded"]["value_integer"] == 2010
+    assert rows["company.name"]["value_string"] == "TechCorp Inc."
+    assert all(row["value_string"] is None for row in rows.values() if row["data_type"] in ("object", "array"))
+    print("✓ Values split into typed columns")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        parquet_file = os.path.join(work_dir, "nodes.parquet")
+        count = export_arrow(schema.data_nodes, parquet_file, "parquet")
+        assert pq.read_table(parquet_file).equals(from_table) and count == from_table.num_rows
+        
+        arrow_file = os.path.join(work_dir, "nodes.arrow")
+        xml_schema = extractor.extract_schema("examples/sample.xml")
+        export_arrow(xml_schema.data_nodes, arrow_file, "arrow", "zstd")
+        table = pyarrow.ipc.open_file(arrow_file).read_all()
+        assert table.num_rows == len(xml_schema.data_nodes)
+        assert 1997 in table.column("value_integer").to_pylist()
+        print("✓ Parquet and Arrow IPC files read back")
+        
+        leaves = pyarrow.Table.from_batches(list(record_batches(xml_schema.data_nodes, leaf_only=True)))
+        assert leaves.num_rows == len(xml_schema.get_leaf_nodes())
+        print("✓ Filters applied on the table columns")
+    
+    return True
+
+
+def test_data_node_index():
+    """Test indexed data node queries on a schema."""
+    print("\nTesting data node index...")
+    
+    import pickle
+    from schema_extractor.models.schema import DataType, Schema, filter_data_nodes
+    
+    extractor = SchemaExtractor()
+    for source in ("examples/sample.json", "examples/sample.xml"):
+        schema = extractor.extract_schema(source)
+        nodes = list(schema.data_nodes)
+        listed = Schema(name="listed", file_type=schema.file_type, data_nodes=nodes)
+        for criteria in ({"path_pattern": r"company\.employees\[1\]"}, {"path_pattern": "library.book.title"},
+                         {"path_pattern": "x?company"}, {"path_pattern": "(library|company)"},
+                         {"data_type": DataType.INTEGER, "leaf_only": True},
+                         {"data_type": DataType.STRING, "path_pattern": "company.*", "max_depth": 3},
+                         {"leaf_only": True, "max_depth": 2}):
+            expected = list(filter_data_nodes(nodes, **criteria))
+            assert list(schema.iter_data_nodes(**criteria)) == expected, criteria
+            assert list(listed.iter_data_nodes(**criteria)) == expected, criteria
+        assert schema.get_leaf_nodes() == [node for node in nodes if node.is_leaf]
+    print("✓ Indexed queries match a linear scan, for tables and node lists")
+    
+    index = schema.data_node_index()
+    assert schema.data_node_index() is index
+    assert [index.paths[row] for row in index.prefix_rows("library.book@")] == \
+        [node.path for node in nodes if node.path.startswith("library.book@")]
+    print("✓ Index is built once and answers prefix lookups")
+    
+    listed.data_nodes = nodes[:10]
+    assert listed.get_leaf_nodes() == [node for node in nodes[:10] if node.is_leaf]
+    assert pickle.loads(pickle.dumps(schema))._data_node_index is None
+    print("✓ Index follows replaced data nodes and is not pickled")
+    
+    return True
+
+
+def test_node_query():
+    """Test node queries pushed down into the extractors."""
+    print("\nTesting node queries...")
+    
+    from schema_extractor import NodeQuery
+    from schema_extractor.models.schema import DataType
+    
+    extractor = SchemaExtractor()
+    queries = (
+        {"path_pattern": r"company\.employees\[1\]", "leaf_only": True},
+        {"data_type": DataType.INTEGER, "value_filters": [">=100", "<2000"]},
+        {"min_depth": 2, "max_depth": 3, "value_filters": ["~^[A-Z]"], "offset": 2, "limit": 5},
+        {"path_pattern": "library.book@", "value_filters": ["!=null"]},
+        {"leaf_only": True, "limit": 0},
+    )
+    for source in ("examples/sample.json", "examples/sample.xml"):
+        for streaming in (False, True):
+            nodes = list(extractor.iter_data_nodes(source, streaming=streaming))
+            for criteria in queries:
+                pushed = list(extractor.iter_data_nodes(source, streaming=streaming, query=NodeQuery(**criteria)))
+                assert pushed == list(NodeQuery(**criteria).apply(nodes)), (source, streaming, criteria)
+    print("✓ Pushed-down queries match filtering the full node stream")
+    
+    import tempfile
+    with tempfile.TemporaryDirectory() as work_dir:
+        root_key_file = os.path.join(work_dir, "root_key.json")
+        with open(root_key_file, "w") as f:
+            json.dump({"root": {"x": 1, "y": {"z": 2}}, "x": [{"root": 3}]}, f)
+        paths = [node.path for node in extractor.extract_schema(root_key_file).data_nodes]
+        assert paths == ["root", "root", "root.x", "root.y", "root.y.z", "x", "x[0]", "x[0].root"]
+        for streaming in (False, True):
+            assert [node.path for node in extractor.iter_data_nodes(root_key_file, streaming=streaming)] == paths
+            query = NodeQuery(path_pattern=r"root\.y\.z")
+            assert [node.path for node in extractor.iter_data_nodes(root_key_file, streaming=streaming,
+                                                                    query=query)] == ["root.y.z"]
+    print("✓ A top-level key named root is not pruned or mistaken for the document root")
+    
+    nodes = list(extractor.iter_data_nodes("examples/sample.json"))
+    query = NodeQuery(value_filters=["=2010"])
+    assert [node.path for node in extractor.iter_data_nodes("examples/sample.json", query=query)] == ["company.founded"]
+    assert query.exhaustive and query.scanned == len(nodes)
+    query = NodeQuery(path_pattern=r"company\.name")
+    assert len(list(extractor.iter_data_nodes("examples/sample.json", query=query))) == 1
+    assert not query.exhaustive and query.scanned < len(nodes)
+    print(f"✓ Value filters match, and unmatched subtrees are skipped ({query.scanned} nodes checked)")
+    
+    query = NodeQuery(leaf_only=True, limit=2)
+    assert len(list(extractor.iter_data_nodes("examples/sample.json", streaming=True, query=query))) == 2
+    assert not query.exhaustive
+    try:
+        NodeQuery(value_filters=[">abc"])
+        raise AssertionError("Ordering against text accepted")
+    except ValueError:
+        pass
+    print("✓ Limits stop the stream and invalid filters are rejected")
+    
+    return True
+
+def test_value_sketches():
+    """Test hashed unique values and approximate value summaries."""
+    print("\nTesting value sketches...")
+    
+    from schema_extractor.utils.sketches import HyperLogLog, HeavyHitters, summarize_values
+    
+    extractor = SchemaExtractor()
+    for source in ("examples/sample.json", "examples/sample.xml", "examples/sports_categories.json"):
+        schema = extractor.extract_schema(source)
+        expected = {}
+        for node in schema.data_nodes:
+            if node.is_leaf and node.value is not None:
+                values = expected.setdefault(node.path, [])
+                if node.value not in values:
+                    values.append(node.value)
+        assert schema.get_unique_values() == expected, source
+    print("✓ get_unique_values matches a pairwise comparison")
+    
+    sketch = HyperLogLog()
+    for i in range(100000):
+        sketch.add(f"value-{i}")
+    assert abs(sketch.estimate() - 100000) < 5000
+    small = HyperLogLog()
+    for i in range(50):
+        small.add(i)
+    assert small.estimate() == 50
+    print(f"✓ HyperLogLog estimates 100000 distinct values as {sketch.estimate()}")
+    
+    import pickle
+    import subprocess
+    from schema_extractor.utils.sketches import ValueSketch
+    build = ("import pickle, sys\n"
+             "from schema_extractor.utils.sketches import ValueSketch\n"
+             "sketch = ValueSketch()\n"
+             "for i in range(20000):\n"
+             "    sketch.add(f'user-{i}')\n"
+             "sys.stdout.buffer.write(pickle.dumps(sketch))\n")
+    remote = pickle.loads(subprocess.run([sys.executable, "-c", build], check=True, capture_output=True,
+                                         env=dict(os.environ, PYTHONHASHSEED="7")).stdout)
+    local = ValueSketch()
+    for i in range(20000):
+        local.add(f"user-{i}")
+    local.merge(remote)
+    assert local.count == 40000 and abs(local.distinct_count() - 20000) < 1000
+    negatives = ValueSketch()
+    for value in (-1, -2, 1, 1.0, True):
+        negatives.add(value)
+    assert negatives.distinct_count() == 3
+    print(f"✓ Sketches from another process merge ({local.distinct_count()} distinct), -1 and -2 differ")
+    
+    frequent = HeavyHitters(capacity=10)
+    for i in range(10000):
+        frequent.add("common" if i % 3 == 0 else i)
+    assert frequent.top(1)[0][0] == "common"
+    print("✓ Heavy hitters keep a value occurring in a third of the stream")
+    
+    schema = extractor.extract_schema("examples/sports_categories.json")
+    sketches = schema.summarize_values()
+    assert not any("[0]" in field for field in sketches)
+    unique = schema.get_unique_values()
+    ids = [values[0] for path, values in unique.items() if path.endswith("].id")]
+    assert sketches["root[].id"].count == len(ids)
+    assert abs(sketches["root[].id"].distinct_count() - len(set(ids))) <= 1  # Estimates may collide
+    assert sketches["root[].disabled"].top() == [(False, len(ids))]
+    streamed = summarize_values(extractor.iter_data_nodes("examples/sports_categories.json", streaming=True))
+    assert {field: sketch.count for field, sketch in streamed.items()} == \
+        {field: sketch.count for field, sketch in sketches.items()}
+    merged = summarize_values(schema.data_nodes)
+    for field, other in streamed.items():
+        merged[field].merge(other)
+        assert merged[field].count == 2 * other.count
+        assert merged[field].distinct_count() == other.distinct_count()
+    print(f"✓ Array items share a sketch ({len(sketches)} fields) and sketches merge")
+    
+    return True
+
 def main():
     """Run all tests."""
     print("Schema Extractor Test Suite")
@@ -122,7 +1413,31 @@ def main():
         test_xml_extraction,
         test_json_extraction,
         test_auto_detection,
-        test_schema_output
+        test_schema_output,
+        test_streaming_json_extraction,
+        test_streaming_xml_extraction,
+        test_single_pass_extraction,
+        test_merged_array_inference,
+        test_lazy_data_nodes,
+        test_data_node_table,
+        test_trusted_construction,
+        test_deep_nesting,
+        test_batch_extraction,
+        test_schema_merging,
+        test_jsonl_extraction,
+        test_mapped_input,
+        test_schema_cache,
+        test_incremental_extraction,
+        test_compiled_validation,
+        test_xml_validation,
+        test_streaming_json_validation,
+        test_batch_validation,
+        test_binary_format,
+        test_data_node_export,
+        test_arrow_export,
+        test_data_node_index,
+        test_node_query,
+        test_value_sketches
     ]
     
     passed = 0